@@ -1 +1,3 @@
-from .version import __version__  # noqa
\ No newline at end of file
+from .version import __version__  # noqa
+
+default_app_config = "pylucid.apps.PyLucidConfig"
@@ -18,6 +18,10 @@ from django.utils.translation import ugettext_lazy as _
 
 from cms.models import Page
 
+# PyLucid
+from pylucid import json_stream
+from pylucid.models import RequestStatistic
+
 
 logger = logging.getLogger(__name__)
 
@@ -31,8 +35,83 @@ def export_as_json(modeladmin, request, queryset):
     serializers.serialize("json", queryset, stream=response, indent=4)
     return response
 
+
+def make_stream_export_action(name, description, fmt, compress=False):
+    """
+    Export as streamed JSON or JSON Lines, without building the
+    complete output in memory, see: pylucid.json_stream
+    """
+    def export_stream(modeladmin, request, queryset):
+        return json_stream.streaming_response(queryset, fmt=fmt, compress=compress)
+
+    export_stream.__name__ = name
+    export_stream.short_description = description
+    return export_stream
+
+
+export_as_json_stream = make_stream_export_action(
+    "export_as_json_stream", _("Export selected as streamed JSON"), fmt=json_stream.FORMAT_JSON
+)
+export_as_jsonl_stream = make_stream_export_action(
+    "export_as_jsonl_stream", _("Export selected as JSON Lines"), fmt=json_stream.FORMAT_JSONL
+)
+export_as_jsonl_gzip_stream = make_stream_export_action(
+    "export_as_jsonl_gzip_stream", _("Export selected as JSON Lines (gzip)"), fmt=json_stream.FORMAT_JSONL, compress=True
+)
+
 # Make export actions available site-wide
 admin.site.add_action(export_as_json, 'export_selected_as_json')
+admin.site.add_action(export_as_json_stream, 'export_selected_as_json_stream')
+admin.site.add_action(export_as_jsonl_stream, 'export_selected_as_jsonl_stream')
+admin.site.add_action(export_as_jsonl_gzip_stream, 'export_selected_as_jsonl_gzip_stream')
+
+
+@admin.register(RequestStatistic)
+class RequestStatisticAdmin(admin.ModelAdmin):
+    """
+    The values are collected by pylucid.middlewares.request_stats.RequestStatsMiddleware
+    """
+    def _format_time(self, value):
+        if value is None:
+            return "-"
+        return "%.1f ms" % (value * 1000)
+
+    def avg_time(self, obj):
+        return self._format_time(obj.avg_time)
+    avg_time.short_description = _("avg. time")
+
+    def max_time_ms(self, obj):
+        return self._format_time(obj.max_time)
+    max_time_ms.short_description = _("max. time")
+    max_time_ms.admin_order_field = "max_time"
+
+    def avg_db(self, obj):
+        if obj.avg_db_queries is None:
+            return "-"
+        return "%.1f queries / %s" % (obj.avg_db_queries, self._format_time(obj.avg_db_time))
+    avg_db.short_description = _("avg. database")
+
+    def avg_template_time(self, obj):
+        return self._format_time(obj.avg_template_time)
+    avg_template_time.short_description = _("avg. template")
+
+    def cache_info(self, obj):
+        return "%i / %i" % (obj.cache_hits, obj.cache_misses)
+    cache_info.short_description = _("cache hit/miss")
+
+    list_display = (
+        "period_end", "name", "pid", "requests", "sampled",
+        "avg_time", "max_time_ms", "avg_db", "avg_template_time", "cache_info",
+    )
+    list_filter = ("name", "pid")
+    date_hierarchy = "period_end"
+    search_fields = ("name",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def get_readonly_fields(self, request, obj=None):
+        return [field.name for field in self.model._meta.fields]
 
 
 # from djangocms_text_ckeditor.models import Text
@@ -8,8 +8,15 @@
     :license: GNU GPL v3 or above, see LICENSE for more details.
 """
 
+import collections
+import multiprocessing
+import os
 import re
+import signal
 import subprocess
+import sys
+import threading
+import time
 from pathlib import Path
 
 # https://github.com/jedie/bootstrap_env
@@ -20,6 +27,183 @@ from bootstrap_env.utils.cookiecutter_utils import verbose_cookiecutter
 import pylucid
 from pylucid.admin_shell.normal_shell import VERSION_PREFIXES, PyLucidNormalShell
 from pylucid.pylucid_boot import VerboseSubprocess
+from pylucid.utils import human_duration
+
+
+# Base directory of the resolver caches: Every *.in file gets its own cache directory,
+# because the parallel 'pip-compile' runs can't share one cache.
+PIP_TOOLS_CACHE_PATH = Path(os.environ.get("PIP_TOOLS_CACHE_DIR", Path.home() / ".cache" / "pip-tools"))
+
+PIP_COMPILE_ARGS = ("pip-compile", "--verbose", "--upgrade")
+
+PIN_RE = re.compile(r"^([A-Za-z0-9_.\-\[\]]+)==([^\s;#]+)")
+
+CompileResult = collections.namedtuple("CompileResult", "requirement_in, duration, error, changed_pins")
+
+
+def get_pins(content):
+    """
+    Returns the pinned versions from a requirements file content.
+
+    >>> get_pins("# comment\\nDjango==1.11.18  # via django-cms\\n-e git+https://x.org/foo.git#egg=foo\\n")
+    {'django': '1.11.18'}
+    """
+    pins = {}
+    for line in content.splitlines():
+        match = PIN_RE.match(line)
+        if match:
+            pins[match.group(1).lower()] = match.group(2)
+    return pins
+
+
+def diff_pins(old_pins, new_pins):
+    """
+    >>> diff_pins({"a": "1", "b": "1", "c": "1"}, {"a": "1", "b": "2", "d": "1"})
+    ['b 1 -> 2', 'c 1 -> (removed)', 'd (new) -> 1']
+    """
+    changed = []
+    for name in sorted(set(old_pins) | set(new_pins)):
+        old_version = old_pins.get(name, "(new)")
+        new_version = new_pins.get(name, "(removed)")
+        if old_version != new_version:
+            changed.append("%s %s -> %s" % (name, old_version, new_version))
+    return changed
+
+
+def get_cache_path(requirement_in):
+    """
+    >>> get_cache_path("developer_installation.in") == PIP_TOOLS_CACHE_PATH / "developer_installation"
+    True
+    """
+    return Path(PIP_TOOLS_CACHE_PATH, Path(requirement_in).stem)
+
+
+def get_process_count(arg, default):
+    """
+    Returns the count of processes from the command argument.
+
+    >>> get_process_count("", default=3)
+    3
+    >>> get_process_count(" 2 ", default=3)
+    2
+    >>> get_process_count("foo", default=3)
+    Traceback (most recent call last):
+    ...
+    ValueError: Process count must be a positive number, not: 'foo'
+    >>> get_process_count("0", default=3)
+    Traceback (most recent call last):
+    ...
+    ValueError: Process count must be a positive number, not: '0'
+    """
+    arg = arg.strip()
+    if not arg:
+        return default
+
+    try:
+        processes = int(arg)
+    except ValueError:
+        processes = 0
+
+    if processes < 1:
+        raise ValueError("Process count must be a positive number, not: %r" % arg)
+    return processes
+
+
+def kill_process(proc):
+    """
+    Kill the complete process group: child processes would hold the pipe open.
+    There is no process group kill on Windows: kill only the process.
+    """
+    killpg = getattr(os, "killpg", None)
+    if killpg is None:
+        proc.kill()
+        return
+
+    try:
+        killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass # process has just terminated
+
+
+def compile_requirement(task):
+    """
+    Run 'pip-compile' for one *.in file.
+    Called in a worker process from PyLucidDeveloperShell.do_upgrade_requirements()
+    """
+    requirements_path, requirement_in, timeout = task
+    requirement_out = requirement_in.replace(".in", ".txt")
+    req_out = Path(requirements_path, requirement_out)
+    prefix = "[%s] " % requirement_in
+
+    old_pins = get_pins(req_out.read_text()) if req_out.is_file() else {}
+
+    # We run pip-compile in ./requirements/ and add only the filenames as arguments
+    # So pip-compile add no path to comments ;)
+    cache_path = get_cache_path(requirement_in)
+    cache_path.mkdir(parents=True, exist_ok=True)
+    args = PIP_COMPILE_ARGS + (
+        "--cache-dir", str(cache_path),
+        "-o", requirement_out, requirement_in,
+    )
+    print("%sCall: %r" % (prefix, " ".join(args)), flush=True)
+
+    env = os.environ.copy()
+    env["PYTHONUNBUFFERED"] = "1"
+
+    start_time = time.time()
+    proc = subprocess.Popen(
+        args, cwd=requirements_path, env=env,
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True,
+        start_new_session=True,
+    )
+    # The timeout must work, even if pip-compile hangs without any output.
+    watchdog = threading.Timer(timeout, kill_process, args=(proc,))
+    watchdog.start()
+    try:
+        for line in proc.stdout:
+            print(prefix + line, end="", flush=True)
+        exit_code = proc.wait()
+    finally:
+        watchdog.cancel()
+    duration = time.time() - start_time
+
+    error = None
+    if exit_code:
+        if duration >= timeout:
+            error = "timeout after %s" % human_duration(timeout)
+        else:
+            error = "exit code %r" % exit_code
+    elif not requirement_in.startswith("test_"):
+        requirement_out_content = req_out.read_text()
+        for version_prefix in VERSION_PREFIXES:
+            if version_prefix not in requirement_out_content:
+                error = "%r not found!" % version_prefix
+                break
+
+    changed_pins = []
+    if error is None:
+        changed_pins = diff_pins(old_pins, get_pins(req_out.read_text()))
+    else:
+        print("%sERROR: %s" % (prefix, error), flush=True)
+
+    return CompileResult(requirement_in, duration, error, changed_pins)
+
+
+def print_compile_summary(results):
+    print("")
+    print("_"*79)
+    print("%-35s %10s  %s" % ("requirements", "duration", "changed pins"))
+    print("-"*79)
+    for result in results:
+        if result.error:
+            changes = ["ERROR: %s" % result.error]
+        else:
+            changes = result.changed_pins or ["-"]
+
+        print("%-35s %10s  %s" % (result.requirement_in, human_duration(result.duration), changes[0]))
+        for change in changes[1:]:
+            print("%-35s %10s  %s" % ("", "", change))
+    print("-"*79)
 
 
 class PyLucidDeveloperShell(PyLucidNormalShell):
@@ -32,8 +216,13 @@ class PyLucidDeveloperShell(PyLucidNormalShell):
         1. Convert via 'pip-compile' *.in requirements files to *.txt
         2. Append 'piprot' informations to *.txt requirements.
 
+        All *.in files are compiled at the same time in a process pool.
+        The output lines are prefixed with the requirements file name.
+        Optional argument: count of processes (default: one per *.in file)
+
         Direct start with:
             $ pylucid_admin upgrade_requirements
+        (exit code 1, if a *.in file failed)
         """
         requirement_filepath = self.path_helper.req_filepath # .../pylucid/requirements/developer_installation.txt
 
@@ -41,60 +230,59 @@ class PyLucidDeveloperShell(PyLucidNormalShell):
 
         requirements_path = requirement_filepath.parent
 
-        count = 0
-        for requirement_in in requirements_path.glob("*.in"):
-            count +=1
-            requirement_in = Path(requirement_in).name
-
-            if requirement_in.startswith("basic_"):
-                continue
-
-            requirement_out = requirement_in.replace(".in", ".txt")
-
-            self.stdout.write("_"*79 + "\n")
-
-            # We run pip-compile in ./requirements/ and add only the filenames as arguments
-            # So pip-compile add no path to comments ;)
-
-            return_code = VerboseSubprocess(
-                "pip-compile", "--verbose", "--upgrade", "-o", requirement_out, requirement_in,
-                cwd=str(requirements_path),
-                timeout=timeout
-            ).verbose_call(check=True)
-
-            if not requirement_in.startswith("test_"):
-                req_out = Path(requirements_path, requirement_out)
-                with req_out.open("r") as f:
-                    requirement_out_content = f.read()
-
-                for version_prefix in VERSION_PREFIXES:
-                    if not version_prefix in requirement_out_content:
-                        raise RuntimeError("ERROR: %r not found!" % version_prefix)
-
-            #
-            # Skip piprot until https://github.com/sesh/piprot/issues/73 fixed
-            #
-            #
-            # self.stdout.write("_"*79 + "\n")
-            # output = [
-            #     "\n#\n# list of out of date packages made with piprot:\n#\n"
-            # ]
-            # sp=VerboseSubprocess("piprot", "--outdated", requirement_out, cwd=str(requirements_path))
-            # for line in sp.iter_output():
-            #     print(line, end="", flush=True)
-            #     output.append("# %s" % line)
-            #
-            # self.stdout.write("\nUpdate file %r\n" % requirement_out)
-            # filepath = Path(requirements_path, requirement_out).resolve()
-            # assert filepath.is_file(), "File not exists: %r" % filepath
-            # with open(filepath, "a") as f:
-            #     f.writelines(output)
-
-        if count==0:
+        requirement_in_names = sorted(
+            requirement_in.name
+            for requirement_in in requirements_path.glob("*.in")
+            if not requirement_in.name.startswith("basic_")
+        )
+        if not requirement_in_names:
             print("ERROR: no *.in files found in: '%s'" % requirements_path)
-        else:
-            print("processed %i *.in files" % count)
-
+            return
+
+        try:
+            processes = get_process_count(arg, default=len(requirement_in_names))
+        except ValueError as err:
+            print("ERROR: %s" % err)
+            return
+
+        tasks = [
+            (str(requirements_path), requirement_in, timeout)
+            for requirement_in in requirement_in_names
+        ]
+        start_time = time.time()
+        with multiprocessing.Pool(processes=min(processes, len(tasks))) as pool:
+            results = pool.map(compile_requirement, tasks, chunksize=1)
+        duration = time.time() - start_time
+
+        print_compile_summary(results)
+        print("processed %i *.in files in %s" % (len(results), human_duration(duration)))
+
+        failed = [result for result in results if result.error]
+        if failed:
+            print("ERROR: %i of %i *.in files failed!" % (len(failed), len(results)))
+            if len(sys.argv) > 1:
+                # Direct start via: $ pylucid_admin upgrade_requirements
+                sys.exit(1)
+            return # Keep the interactive shell running
+
+        #
+        # Skip piprot until https://github.com/sesh/piprot/issues/73 fixed
+        #
+        #
+        # self.stdout.write("_"*79 + "\n")
+        # output = [
+        #     "\n#\n# list of out of date packages made with piprot:\n#\n"
+        # ]
+        # sp=VerboseSubprocess("piprot", "--outdated", requirement_out, cwd=str(requirements_path))
+        # for line in sp.iter_output():
+        #     print(line, end="", flush=True)
+        #     output.append("# %s" % line)
+        #
+        # self.stdout.write("\nUpdate file %r\n" % requirement_out)
+        # filepath = Path(requirements_path, requirement_out).resolve()
+        # assert filepath.is_file(), "File not exists: %r" % filepath
+        # with open(filepath, "a") as f:
+        #     f.writelines(output)
 
     def do_change_editable_address(self, arg):
         """
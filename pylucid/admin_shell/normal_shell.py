@@ -14,7 +14,7 @@ import sys
 import time
 from pathlib import Path
 
-from pylucid_installer.pylucid_installer import create_instance
+from pylucid_installer.pylucid_installer import LINK_MODES, create_instance, create_instances
 
 # PyLucid
 from pylucid.pylucid_boot import Cmd2, VerboseSubprocess
@@ -53,6 +53,15 @@ MANAGE_COMMANDS = (  # TODO: Create list dynamicly
     "image_info",
     "replace_broken",
     "collectstatic",
+    "export_static_pages",
+    "pylucid_compress",
+    "middleware_timing",
+    "pylucid_import",
+    "pylucid_compile_templates",
+    "pylucid_logging_overhead",
+    "pylucid_context_processors",
+    "pylucid_import_time",
+    "pylucid_sitemap",
 )
 
 
@@ -101,6 +110,51 @@ class PyLucidNormalShell(Cmd2):
 
         create_instance(dest=destination, name=name, remove=False, exist_ok=False)
 
+    def do_create_page_instances(self, arg):
+        """
+        Create many PyLucid page instances from a manifest file in parallel.
+        Arguments:
+            - manifest: JSON file with a list of {"dest": "...", "name": "..."}
+            - link mode (optional): How unmodified files are created.
+              "reflink" (default), "hardlink" or "copy"
+
+        Direct start with:
+            $ pylucid_admin create_page_instances [manifest] [link mode]
+
+        Note: With "hardlink" all changes to a not modified file (e.g.: templates)
+        will change the file in all instances and in the PyLucid installation!
+        """
+        args = arg.split()
+        if not args or len(args) > 2:
+            print("ERROR: Manifest file path is needed!")
+            return
+
+        link_mode = args[1] if len(args) == 2 else "reflink"
+        if link_mode not in LINK_MODES:
+            print("ERROR: Unknown link mode %r, choose one of: %s" % (link_mode, ", ".join(LINK_MODES)))
+            return
+
+        start_time = time.time()
+        count = 0
+        errors = 0
+        try:
+            for result in create_instances(args[0], link_mode=link_mode):
+                count += 1
+                if result.error:
+                    errors += 1
+                    print(result.output)
+                    print("ERROR: %s: %s" % (result.dest, result.error))
+                else:
+                    print("Page instance %r created here: '%s' (%.2f sec.)" % (result.name, result.dest, result.duration))
+        except RuntimeError as err:
+            print(err)
+            return
+
+        print("%i page instances created in %.1f sec., %i errors." % (count - errors, time.time() - start_time, errors))
+
+    def complete_create_page_instances(self, text, line, begidx, endidx):
+        return self._complete_path(text, line, begidx, endidx)
+
     def test_project_manage(self, *args, timeout=1000, check=False):
         cwd = self.path_helper.base.parent  # e.g.: PyLucid-env/src/pylucid/pylucid_page_instance
         assert cwd.is_dir(), "ERROR: Path not exists: %r" % cwd
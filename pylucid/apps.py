@@ -0,0 +1,23 @@
+# coding: utf-8
+
+"""
+    PyLucid app config
+    ~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from django.apps import AppConfig
+
+
+class PyLucidConfig(AppConfig):
+    name = "pylucid"
+    verbose_name = "PyLucid"
+
+    def ready(self):
+        # Connect the signal receivers:
+        import pylucid.signals  # noqa
+
+        # Register the system checks:
+        import pylucid.checks  # noqa
@@ -5,21 +5,16 @@
     ~~~~~~~~~~~~~~~~~~~~~
 """
 
-import logging
 import sys
 import warnings
 
 from django.utils.translation import ugettext_lazy as _
 
-from debug_toolbar.settings import CONFIG_DEFAULTS as DEBUG_TOOLBAR_CONFIG
-from django_processinfo import app_settings as PROCESSINFO
-
 # https://github.com/jedie/django-tools
-from django_tools.settings_utils import FnMatchIps
-from django_tools.unittest_utils.logging_utils import CutPathnameLogRecordFactory, FilterAndLogWarnings
+from django_tools.unittest_utils.logging_utils import FilterAndLogWarnings
 
-# https://github.com/jedie/django-cms-tools
-from django_cms_tools.plugin_anchor_menu import constants as plugin_anchor_menu_constants
+# PyLucid
+from pylucid.settings_utils import HostMatcher, LazyModule, get_caches, get_logging
 
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = False
@@ -27,7 +22,7 @@ DEBUG = False
 SITE_ID=1
 
 # Required for the debug toolbar to be displayed:
-INTERNAL_IPS = FnMatchIps(["localhost", "127.0.0.1", "::1", "172.*.*.*", "192.168.*.*", "10.0.*.*"])
+INTERNAL_IPS = HostMatcher(["localhost", "127.0.0.1", "::1", "172.*.*.*", "192.168.*.*", "10.0.*.*"])
 
 ALLOWED_HOSTS = INTERNAL_IPS
 
@@ -98,8 +93,11 @@ ROOT_URLCONF = 'pylucid_page_instance.urls'
 WSGI_APPLICATION = 'pylucid_page_instance.wsgi.application'
 
 MIDDLEWARE = (
-    "django_processinfo.middlewares.ProcessInfoMiddleware",
-    'django.middleware.cache.UpdateCacheMiddleware',
+    # Sampled request timings, see: pylucid.request_stats
+    "pylucid.middlewares.request_stats.RequestStatsMiddleware",
+
+    # Full page cache for anonymous users, see: pylucid.page_cache
+    'pylucid.middlewares.page_cache.UpdatePageCacheMiddleware',
 
     # https://github.com/jazzband/django-debug-toolbar/
     'debug_toolbar.middleware.DebugToolbarMiddleware',
@@ -120,9 +118,25 @@ MIDDLEWARE = (
     'cms.middleware.toolbar.ToolbarMiddleware',
     'cms.middleware.language.LanguageCookieMiddleware',
 
-    'django.middleware.cache.FetchFromCacheMiddleware',
+    'pylucid.middlewares.page_cache.FetchFromPageCacheMiddleware',
 )
 
+# Compile URLs, load templates, discover plugins and fill the caches
+# before the WSGI workers are forked, see: pylucid.warmup
+PYLUCID_WSGI_WARMUP = True
+
+# Refuse to start the WSGI application, if a template can't be compiled:
+PYLUCID_WARMUP_STRICT = False
+
+# Timeout in seconds for the full page cache.
+# Cache entries are invalidated on django CMS changes, see: pylucid.signals
+PYLUCID_PAGE_CACHE_TIMEOUT = 6 * 60 * 60
+
+# Measure only a part of all requests and save the aggregated
+# values every X seconds, see: pylucid.middlewares.request_stats
+PYLUCID_REQUEST_STATS_SAMPLE_RATE = 0.1 # 0 == off
+PYLUCID_REQUEST_STATS_FLUSH_INTERVAL = 60
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -135,22 +149,32 @@ TEMPLATES = [
             ],
             'context_processors': [
                 'django.contrib.auth.context_processors.auth',
-                'django.contrib.messages.context_processors.messages',
-                'django.template.context_processors.i18n',
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
-                'django.template.context_processors.media',
                 'django.template.context_processors.csrf',
-                'django.template.context_processors.tz',
                 'sekizai.context_processors.sekizai',
-                'django.template.context_processors.static',
                 'cms.context_processors.cms_settings',
-                'pylucid.context_processors.pylucid',
+                'pylucid.lazy_context.lazy_processors', # see: PYLUCID_LAZY_CONTEXT_PROCESSORS
+                'pylucid.lazy_context.constant_processors', # see: PYLUCID_CONSTANT_CONTEXT_PROCESSORS
             ],
         },
     },
 ]
 
+# Called only if a template uses one of there values, see: pylucid.lazy_context
+PYLUCID_LAZY_CONTEXT_PROCESSORS = (
+    'django.contrib.messages.context_processors.messages',
+    'django.template.context_processors.i18n',
+    'django.template.context_processors.tz',
+)
+
+# Called only once per process, see: pylucid.lazy_context
+PYLUCID_CONSTANT_CONTEXT_PROCESSORS = (
+    'django.template.context_processors.media',
+    'django.template.context_processors.static',
+    'pylucid.context_processors.pylucid',
+)
+
 
 # Database
 # https://docs.djangoproject.com/en/1.11/ref/settings/#databases
@@ -159,27 +183,14 @@ TEMPLATES = [
 DATABASES = {}
 
 
-# https://docs.djangoproject.com/en/1.11/topics/cache/#database-caching
-if sys.argv[0].endswith("test") or "pytest" in sys.argv or "test" in sys.argv:
-    print("Use 'LocMemCache' CACHES in tests, because of:")
-    print("https://github.com/divio/django-cms/issues/5079")
-    CACHES = {
-        'default': {
-            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-            'LOCATION': 'unique-snowflake',
-        }
-    }
-else:
-    #
-    # The cache tables must be created first, e.g.:
-    #   $ manage.py createcachetable
-    #
-    CACHES = {
-        'default': {
-            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
-            'LOCATION': 'pylucid_cache_table',
-        },
-    }
+# https://docs.djangoproject.com/en/1.11/topics/cache/
+# Select a other profile in your page instance settings, see: pylucid.settings_utils.build_caches()
+#
+# The cache tables for the "database" profile must be created first, e.g.:
+#   $ manage.py createcachetable
+#
+# In tests, 'LocMemCache' is always used.
+CACHES = get_caches(profile="database")
 
 # Hack needed, until https://github.com/divio/django-cms/issues/5079 is fixed:
 if "createcachetable" in sys.argv:
@@ -192,6 +203,15 @@ if "createcachetable" in sys.argv:
 #COMPRESS_ENABLED=False
 COMPRESS_ENABLED=True
 
+# Use the offline manifest created by './manage.py pylucid_compress'
+# for the sekizai css/js blocks, see: pylucid.compress
+PYLUCID_COMPRESS_OFFLINE=False
+
+# Sitemap files created by './manage.py pylucid_sitemap', see: pylucid.sitemap
+# PYLUCID_SITEMAP_ROOT = "/path/to/sitemaps/" # default: MEDIA_ROOT/sitemaps/
+PYLUCID_SITEMAP_CHUNK_SIZE = 5000 # pages per file (max. 50000 URLs per file!)
+PYLUCID_SITEMAP_PROTOCOL = "https"
+
 
 STATICFILES_FINDERS = (
     'django.contrib.staticfiles.finders.FileSystemFinder',
@@ -273,8 +293,15 @@ MEDIA_URL = '/media/'
 
 
 
-# don't load jquery from ajax.googleapis.com, just use django's version:
-DEBUG_TOOLBAR_CONFIG["JQUERY_URL"] = STATIC_URL + "admin/js/vendor/jquery/jquery.min.js"
+# The debug toolbar merge this with his defaults.
+DEBUG_TOOLBAR_CONFIG = {
+    # don't load jquery from ajax.googleapis.com, just use django's version:
+    "JQUERY_URL": STATIC_URL + "admin/js/vendor/jquery/jquery.min.js",
+}
+
+# https://github.com/jedie/django-processinfo
+# Imported only if the app is installed (It's not in production, see: settings_utils.production_apps)
+PROCESSINFO = LazyModule("django_processinfo.app_settings")
 
 
 # Basic Django CMS settings
@@ -302,8 +329,9 @@ CMS_PLACEHOLDER_CONF = {
         'name': _("Content"),
         'plugins': [
             CKEDITOR,
-            plugin_anchor_menu_constants.ANCHOR_PLUGIN_NAME,
-            plugin_anchor_menu_constants.DROP_DOWN_ANCHOR_MENU_PLUGIN_NAME,
+            # see: django_cms_tools.plugin_anchor_menu.constants
+            "AnchorPlugin",
+            "DropDownAnchorMenuPlugin",
         ],
     },
 }
@@ -334,12 +362,12 @@ CMS_MARKUP_OPTIONS = (
 CMS_MARKUP_RENDER_ALWAYS = True
 CMS_MARKDOWN_EXTENSIONS = ()
 
+# Render cache for the markup plugin, see: pylucid.markup_cache
+PYLUCID_MARKUP_CACHE_MODE = "cache" # or "trust"
+PYLUCID_MARKUP_CACHE_SIZE = 500 # entries in the per process LRU cache
 
-#_____________________________________________________________________________
 
-# Adds 'cut_path' attribute on log record. So '%(cut_path)s' can be used in log formatter.
-# django_tools.unittest_utils.logging_utils.CutPathnameLogRecordFactory
-logging.setLogRecordFactory(CutPathnameLogRecordFactory(max_length=50))
+#_____________________________________________________________________________
 
 # Filter warnings and pipe them to logging system:
 # django_tools.unittest_utils.logging_utils.FilterAndLogWarnings
@@ -351,45 +379,5 @@ warnings.simplefilter("always") # Turns on all warnings
 
 
 # https://docs.python.org/3/library/logging.html#logging-levels
-LOGGING = {
-    'version': 1,
-    'disable_existing_loggers': True,
-    'formatters': {
-        'verbose': {
-            'format': '%(levelname)8s %(cut_path)s:%(lineno)-3s %(message)s'
-        },
-    },
-    'handlers': {
-        'console': {
-            'class': 'logging.StreamHandler',
-            'formatter': 'verbose',
-        }
-    },
-    'loggers': {
-        '': {
-            'handlers': ['console'],
-            'level': 'DEBUG',
-            'propagate': False,
-        },
-        'django': {
-            'handlers': ['console'],
-            'level': 'INFO',
-            'propagate': False,
-        },
-        'django_tools': {
-            'handlers': ['console'],
-            'level': 'DEBUG',
-            'propagate': False,
-        },
-        'django_cms_tools': {
-            'handlers': ['console'],
-            'level': 'DEBUG',
-            'propagate': False,
-        },
-        'pylucid': {
-            'handlers': ['console'],
-            'level': 'DEBUG',
-            'propagate': False,
-        },
-    },
-}
+# "development" or "production", see: pylucid.settings_utils.get_logging()
+LOGGING = get_logging("development")
@@ -0,0 +1,151 @@
+# coding: utf-8
+
+"""
+    PyLucid bulk import
+    ~~~~~~~~~~~~~~~~~~~
+
+    Load the JSON/JSON Lines files from the export admin actions
+    (see: pylucid.json_stream) with batched inserts.
+
+    './manage.py loaddata' saves every object on his own. This importer
+    collects the objects per model and inserts them in batches.
+    The transaction will be committed every 'transaction_size' objects.
+
+    Note:
+        * No model save() and no signals: The objects are stored 'raw'
+          like loaddata does it. The page and menu caches are invalidated
+          after the import.
+        * Existing objects are not updated: The import aborts
+          with a IntegrityError on a existing primary key.
+        * Multi-table inherited models (e.g.: all CMS plugins)
+          only stores the fields of the child table. The parent objects
+          (e.g.: 'cms.cmsplugin') must be imported, too.
+        * The tree fields of treebeard models (e.g.: Page, CMSPlugin)
+          are repaired once after the import and not on every insert.
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import collections
+import itertools
+import logging
+
+from django.core.management.color import no_style
+from django.core.serializers.python import Deserializer
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+# https://github.com/django-treebeard/django-treebeard
+from treebeard.mp_tree import MP_Node
+
+
+log = logging.getLogger(__name__)
+
+
+BATCH_SIZE = 500
+TRANSACTION_SIZE = 10000
+
+
+class BulkImporter:
+    def __init__(self, using=DEFAULT_DB_ALIAS, batch_size=BATCH_SIZE, transaction_size=TRANSACTION_SIZE, fix_tree=True):
+        self.using = using
+        self.connection = connections[using]
+        self.batch_size = batch_size
+        self.transaction_size = transaction_size
+        self.fix_tree = fix_tree
+
+        self.models = set()
+        self._pending = collections.OrderedDict() # model -> list of instances
+        self._pending_m2m = collections.OrderedDict() # through model -> list of instances
+
+    def _add(self, deserialized):
+        obj = deserialized.object
+        model = type(obj)
+        self.models.add(model)
+        self._pending.setdefault(model, []).append(obj)
+
+        for field_name, values in deserialized.m2m_data.items():
+            field = model._meta.get_field(field_name)
+            through = field.remote_field.through
+            source_name = field.m2m_field_name()
+            target_name = field.m2m_reverse_field_name()
+            self.models.add(through)
+            self._pending_m2m.setdefault(through, []).extend([
+                through(**{"%s_id" % source_name: obj.pk, "%s_id" % target_name: value})
+                for value in values
+            ])
+
+    def _insert(self, model, objs):
+        """
+        Insert the fields of the model table without calling pre_save(),
+        so e.g.: 'auto_now' fields keep the imported values.
+        This is what Model.save_base(raw=True) does, but in batches.
+        (QuerySet.bulk_create() can't be used: It calls pre_save()
+        and refuses multi-table inherited models)
+        """
+        fields = model._meta.local_concrete_fields
+        batch_size = max(1, min(self.batch_size, self.connection.ops.bulk_batch_size(fields, objs)))
+        for start in range(0, len(objs), batch_size):
+            model._base_manager._insert(objs[start:start + batch_size], fields=fields, raw=True, using=self.using)
+
+    def _flush(self):
+        for model, objs in self._pending.items():
+            self._insert(model, objs)
+        for through, objs in self._pending_m2m.items():
+            through._base_manager.using(self.using).bulk_create(objs, batch_size=self.batch_size)
+        self._pending.clear()
+        self._pending_m2m.clear()
+
+    def load(self, objects):
+        """
+        Import the python dicts (e.g.: from pylucid.json_stream.read_objects)
+        Returns the count of imported objects.
+        """
+        deserialized_objects = Deserializer(objects, using=self.using)
+        total = 0
+        while True:
+            count = 0
+            with transaction.atomic(using=self.using):
+                with self.connection.constraint_checks_disabled():
+                    for deserialized in itertools.islice(deserialized_objects, self.transaction_size):
+                        self._add(deserialized)
+                        count += 1
+                    self._flush()
+
+                table_names = [model._meta.db_table for model in self.models]
+                self.connection.check_constraints(table_names=table_names)
+
+            total += count
+            log.debug("%i objects imported", total)
+            if count < self.transaction_size:
+                return total
+
+    def finish(self):
+        """
+        Must be called after all load() calls.
+        """
+        if self.fix_tree:
+            for model in self.models:
+                if issubclass(model, MP_Node) and not model._meta.proxy:
+                    log.info("Fix tree of %s", model._meta.label)
+                    model.fix_tree()
+
+        # The primary keys are inserted explicit:
+        sequence_sql = self.connection.ops.sequence_reset_sql(no_style(), self.models)
+        if sequence_sql:
+            with self.connection.cursor() as cursor:
+                for line in sequence_sql:
+                    cursor.execute(line)
+
+        invalidate_caches()
+
+
+def invalidate_caches():
+    from django.contrib.sites.models import Site
+
+    # PyLucid
+    from pylucid import menu, page_cache
+
+    for site_id in Site.objects.values_list("pk", flat=True):
+        page_cache.invalidate_site(site_id)
+        menu.invalidate_site(site_id)
@@ -0,0 +1,154 @@
+# coding: utf-8
+
+"""
+    PyLucid cache backends
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import logging
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.utils.module_loading import import_string
+
+
+log = logging.getLogger(__name__)
+
+
+# Used to distinguish "not in cache" from a cached None value:
+_MISSING = object()
+
+
+class TwoLevelCache(BaseCache):
+    """
+    A read-through cache with two tiers:
+
+     * "LOCAL": a fast cache in the worker process (e.g.: LocMemCache)
+     * "SHARED": a cache shared by all workers (e.g.: FileBasedCache, Redis, memcached)
+
+    Hits in the local tier never leave the process. Misses are read from
+    the shared tier and stored in the local tier for 'LOCAL_TIMEOUT' seconds.
+    Writes and deletes go to both tiers.
+
+    Note: A delete/update made by one worker is visible in other workers
+    after 'LOCAL_TIMEOUT' seconds at the latest.
+
+    settings, e.g.:
+
+        CACHES = {
+            "default": {
+                "BACKEND": "pylucid.cache_backends.TwoLevelCache",
+                "OPTIONS": {
+                    "LOCAL_TIMEOUT": 10,
+                    "LOCAL": {
+                        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                        "LOCATION": "pylucid-local",
+                    },
+                    "SHARED": {
+                        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                        "LOCATION": "/var/tmp/pylucid_cache",
+                    },
+                },
+            },
+        }
+
+    Use pylucid.settings_utils.get_caches() to create this.
+    """
+    def __init__(self, location, params):
+        params = params.copy()
+        options = params.get("OPTIONS", {}).copy()
+
+        local_params = options.pop("LOCAL")
+        shared_params = options.pop("SHARED")
+        self.local_timeout = options.pop("LOCAL_TIMEOUT", 10)
+
+        params["OPTIONS"] = options
+        super().__init__(params)
+
+        self._local = self._create_cache(local_params, params)
+        self._shared = self._create_cache(shared_params, params)
+
+    def _create_cache(self, tier_params, params):
+        tier_params = tier_params.copy()
+
+        # Use the same key building in both tiers:
+        for key in ("KEY_PREFIX", "VERSION", "KEY_FUNCTION"):
+            if key in params:
+                tier_params.setdefault(key, params[key])
+
+        backend = tier_params.pop("BACKEND")
+        location = tier_params.pop("LOCATION", "")
+        backend_cls = import_string(backend)
+        return backend_cls(location, tier_params)
+
+    def _get_local_timeout(self, timeout):
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        if timeout is None:
+            return self.local_timeout
+        return min(timeout, self.local_timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self._shared.add(key, value, timeout, version)
+        if added:
+            self._local.set(key, value, self._get_local_timeout(timeout), version)
+        return added
+
+    def get(self, key, default=None, version=None):
+        value = self._local.get(key, _MISSING, version)
+        if value is not _MISSING:
+            return value
+
+        value = self._shared.get(key, _MISSING, version)
+        if value is _MISSING:
+            return default
+
+        self._local.set(key, value, self.local_timeout, version)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._shared.set(key, value, timeout, version)
+        self._local.set(key, value, self._get_local_timeout(timeout), version)
+
+    def delete(self, key, version=None):
+        self._shared.delete(key, version)
+        self._local.delete(key, version)
+
+    def get_many(self, keys, version=None):
+        data = self._local.get_many(keys, version)
+
+        missing = [key for key in keys if key not in data]
+        if missing:
+            shared_data = self._shared.get_many(missing, version)
+            if shared_data:
+                self._local.set_many(shared_data, self.local_timeout, version)
+                data.update(shared_data)
+
+        return data
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        self._shared.set_many(data, timeout, version)
+        self._local.set_many(data, self._get_local_timeout(timeout), version)
+        return []
+
+    def delete_many(self, keys, version=None):
+        self._shared.delete_many(keys, version)
+        self._local.delete_many(keys, version)
+
+    def has_key(self, key, version=None):
+        return self._local.has_key(key, version) or self._shared.has_key(key, version)
+
+    def incr(self, key, delta=1, version=None):
+        # Counters must be consistent between processes: use only the shared tier
+        self._local.delete(key, version)
+        return self._shared.incr(key, delta, version)
+
+    def clear(self):
+        self._shared.clear()
+        self._local.clear()
+
+    def close(self, **kwargs):
+        self._shared.close(**kwargs)
+        self._local.close(**kwargs)
@@ -0,0 +1,44 @@
+# coding: utf-8
+
+"""
+    PyLucid system checks
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    Registered in pylucid.apps.PyLucidConfig.ready()
+
+    Management commands like 'migrate', 'collectstatic' or 'pylucid_compress'
+    must still run: Errors are only reported as deployment checks,
+    e.g.: './manage.py check --deploy'
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from django.conf import settings
+from django.core import checks
+from django.core.exceptions import ImproperlyConfigured
+
+
+@checks.register(deploy=True)
+def check_compress_manifest(app_configs, **kwargs):
+    """
+    The offline manifest of 'pylucid_compress' must contain all CMS_TEMPLATES,
+    if settings.PYLUCID_COMPRESS_OFFLINE is True
+
+    The WSGI warm up refuses to start without it, see: pylucid.warmup.warm_up()
+    """
+    if not getattr(settings, "PYLUCID_COMPRESS_OFFLINE", False):
+        return []
+
+    # PyLucid
+    from pylucid.compress import check_manifest
+
+    try:
+        check_manifest()
+    except ImproperlyConfigured as err:
+        return [checks.Error(
+            str(err),
+            hint="The WSGI application doesn't start without a complete manifest.",
+            id="pylucid.E001",
+        )]
+    return []
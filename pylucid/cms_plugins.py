@@ -0,0 +1,33 @@
+# coding: utf-8
+
+"""
+    PyLucid CMS plugins
+    ~~~~~~~~~~~~~~~~~~~
+
+    Replace the 'cmsplugin_markup' plugin with a subclass that renders
+    the markup via the render cache, see: pylucid.markup_cache
+
+    The class name must be the same, because it's the 'plugin_type'
+    stored in the database.
+
+    Nothing will be registered, if the 'markup' app group
+    is not enabled, see: settings_utils.select_app_groups()
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from django.apps import apps
+
+from cms.plugin_pool import plugin_pool
+
+
+if apps.is_installed("cmsplugin_markup"):
+    # https://github.com/jedie/cmsplugin-markup
+    from cmsplugin_markup import cms_plugins as markup_cms_plugins
+
+    class MarkupPlugin(markup_cms_plugins.MarkupPlugin):
+        render_template = "pylucid/cmsplugin_markup/markup.html"
+
+    plugin_pool.unregister_plugin(markup_cms_plugins.MarkupPlugin)
+    plugin_pool.register_plugin(MarkupPlugin)
@@ -0,0 +1,178 @@
+# coding: utf-8
+
+"""
+    PyLucid offline compress
+    ~~~~~~~~~~~~~~~~~~~~~~~~
+
+    django-compressor can't compress sekizai blocks offline, because
+    the block content is collected while rendering the page.
+
+    The management command 'pylucid_compress' renders all pages, collects
+    the sekizai "css"/"js" blocks, compresses them with django-compressor
+    and writes gzip/brotli files next to the bundles, e.g. for nginx:
+
+        gzip_static on;
+        brotli_static on;
+
+    The result of every block is stored in a manifest file.
+    With settings.PYLUCID_COMPRESS_OFFLINE = True the sekizai
+    postprocessor only looks into the manifest, without touching
+    the compressor machinery on the request path. Blocks that are
+    not in the manifest (e.g. from a new plugin) are compressed online
+    with a warning. './manage.py check --deploy' reports a missing manifest
+    and the WSGI warm up refuses to start without it.
+
+    usage in templates:
+
+        {% render_block "css" postprocessor "pylucid.compress.sekizai_compress" %}
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from compressor.conf import settings as compressor_settings
+from compressor.contrib.sekizai import compress as compressor_compress
+from compressor.exceptions import OfflineGenerationError
+
+try:
+    import brotli # https://pypi.org/project/Brotli/
+except ImportError:
+    brotli = None
+
+
+log = logging.getLogger(__name__)
+
+
+MANIFEST_NAME = "pylucid_compress_manifest.json"
+
+# Set by the 'pylucid_compress' command to collect the blocks while rendering:
+_collector = None
+
+_manifest = None
+
+
+def get_manifest_path():
+    return Path(compressor_settings.COMPRESS_ROOT, compressor_settings.COMPRESS_OUTPUT_DIR, MANIFEST_NAME)
+
+
+def get_manifest():
+    global _manifest
+    if _manifest is None:
+        manifest_path = get_manifest_path()
+        try:
+            with manifest_path.open("r") as f:
+                _manifest = json.load(f)
+        except FileNotFoundError:
+            raise OfflineGenerationError(
+                "Offline manifest '%s' not found. Please run: './manage.py pylucid_compress'" % manifest_path
+            )
+    return _manifest
+
+
+def save_manifest(manifest):
+    global _manifest
+    manifest_path = get_manifest_path()
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    with manifest_path.open("w") as f:
+        json.dump(manifest, f, indent=4, sort_keys=True)
+    _manifest = manifest
+
+
+def get_block_key(data, name):
+    """
+    >>> get_block_key(' <link href="/static/foo.css"> ', "css")
+    'css:47e1abe322690cc5aab2cf1cfdecef05070a96e0'
+    """
+    return "%s:%s" % (name, hashlib.sha1(data.strip().encode("utf-8")).hexdigest())
+
+
+def sekizai_compress(context, data, name):
+    """
+    A sekizai postprocessor for django-compressor with offline support.
+    """
+    if _collector is not None:
+        output = compressor_compress(context, data, name)
+        _collector[get_block_key(data, name)] = output
+        return output
+
+    if not getattr(settings, "PYLUCID_COMPRESS_OFFLINE", False):
+        return compressor_compress(context, data, name)
+
+    key = get_block_key(data, name)
+    try:
+        return get_manifest()["blocks"][key]
+    except OfflineGenerationError as err:
+        log.warning("%s - Compress block %r online.", err, key)
+    except KeyError:
+        # e.g.: A new plugin pushes css/js
+        log.warning("Block %r not in offline manifest, compress it online. Please run: './manage.py pylucid_compress'", key)
+    return compressor_compress(context, data, name)
+
+
+def check_manifest():
+    """
+    Raise ImproperlyConfigured if a template from settings.CMS_TEMPLATES is missing in the manifest.
+    Used in the system check pylucid.checks.check_compress_manifest
+    and in the WSGI warm up, see: pylucid.warmup.warm_up()
+    """
+    try:
+        manifest = get_manifest()
+    except OfflineGenerationError as err:
+        raise ImproperlyConfigured(err)
+
+    for template_name, verbose_name in settings.CMS_TEMPLATES:
+        if template_name not in manifest["templates"]:
+            raise ImproperlyConfigured(
+                "Template %r not in offline manifest. Please run: './manage.py pylucid_compress'" % template_name
+            )
+
+
+URL_RE = re.compile(r'(?:href|src)="([^"?]+)')
+
+
+def get_bundle_paths(output):
+    """
+    Returns the file paths of all compressed files in the given compressor output.
+    """
+    paths = []
+    for url in URL_RE.findall(output):
+        if url.startswith(compressor_settings.COMPRESS_URL):
+            rel_path = url[len(compressor_settings.COMPRESS_URL):]
+            paths.append(Path(compressor_settings.COMPRESS_ROOT, rel_path))
+    return paths
+
+
+def write_precompressed(file_path):
+    """
+    Create '.gz' and '.br' siblings of the given file.
+    Returns the list of created files.
+    """
+    with file_path.open("rb") as f:
+        content = f.read()
+
+    created = []
+
+    gz_path = Path("%s.gz" % file_path)
+    with gz_path.open("wb") as f:
+        f.write(gzip.compress(content, compresslevel=9))
+    created.append(gz_path)
+
+    if brotli is None:
+        log.warning("'brotli' not installed: Skip creating '.br' files.")
+    else:
+        br_path = Path("%s.br" % file_path)
+        with br_path.open("wb") as f:
+            f.write(brotli.compress(content, quality=11))
+        created.append(br_path)
+
+    return created
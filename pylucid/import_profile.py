@@ -0,0 +1,160 @@
+# coding: utf-8
+
+"""
+    PyLucid import profile
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Measure the import time of a page instance in a new Python process
+    via 'python -X importtime' (Python 3.7+) and display the imports
+    as a tree with self and cumulative time.
+
+    Used in: ./manage.py pylucid_import_time
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import os
+import re
+import subprocess
+import sys
+
+
+IMPORT_TIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)")
+
+
+class ImportNode:
+    def __init__(self, name, self_us, cumulative_us, children=None):
+        self.name = name
+        self.self_us = self_us
+        self.cumulative_us = cumulative_us
+        self.children = children or []
+
+    def __repr__(self):
+        return "<ImportNode %s self=%ius cumulative=%ius>" % (self.name, self.self_us, self.cumulative_us)
+
+    def walk(self):
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+
+def parse_import_time(lines):
+    """
+    Parse the stderr output of 'python -X importtime'.
+    Returns the top level imports as ImportNode instances.
+
+    The imported modules are printed after there own imports,
+    the nesting level is the indentation of the name.
+
+    >>> roots = parse_import_time([
+    ...     "import time: self [us] | cumulative | imported package",
+    ...     "import time:        90 |         90 |     _sre",
+    ...     "import time:       748 |        838 |   re",
+    ...     "import time:       408 |       1246 | json",
+    ...     "import time:        10 |         10 | os",
+    ... ])
+    >>> roots
+    [<ImportNode json self=408us cumulative=1246us>, <ImportNode os self=10us cumulative=10us>]
+    >>> roots[0].children
+    [<ImportNode re self=748us cumulative=838us>]
+    >>> [node.name for node in roots[0].walk()]
+    ['json', 're', '_sre']
+    """
+    pending = {} # indentation -> nodes without parent
+    for line in lines:
+        match = IMPORT_TIME_RE.match(line)
+        if match is None:
+            continue
+
+        self_us, cumulative_us, indent, name = match.groups()
+        indent = len(indent)
+
+        children = []
+        for child_indent in sorted(pending):
+            if child_indent > indent:
+                children += pending.pop(child_indent)
+
+        node = ImportNode(name, int(self_us), int(cumulative_us), children)
+        pending.setdefault(indent, []).append(node)
+
+    if not pending:
+        return []
+    return pending[min(pending)]
+
+
+def format_tree(roots, min_ms=1.0, max_depth=None):
+    """
+    Returns the text lines of the import tree.
+    Imports with a cumulative time less than 'min_ms' are skipped.
+
+    >>> roots = [ImportNode("json", 408, 13471, [ImportNode("re", 7480, 9772)])]
+    >>> print("\\n".join(format_tree(roots)))
+      self ms    cum. ms  module
+          0.4       13.5  json
+          7.5        9.8    re
+    >>> print("\\n".join(format_tree(roots, max_depth=1)))
+      self ms    cum. ms  module
+          0.4       13.5  json
+    """
+    lines = ["%9s  %9s  %s" % ("self ms", "cum. ms", "module")]
+
+    def add(nodes, depth):
+        if max_depth is not None and depth >= max_depth:
+            return
+        for node in sorted(nodes, key=lambda node: node.cumulative_us, reverse=True):
+            if node.cumulative_us / 1000 < min_ms:
+                continue
+            lines.append("%9.1f  %9.1f  %s%s" % (
+                node.self_us / 1000, node.cumulative_us / 1000, "  " * depth, node.name
+            ))
+            add(node.children, depth + 1)
+
+    add(roots, 0)
+    return lines
+
+
+def top_self_time(roots, count=10):
+    """
+    Returns the modules with the biggest self import time.
+
+    >>> roots = [ImportNode("json", 408, 13471, [ImportNode("re", 7480, 9772)])]
+    >>> top_self_time(roots, count=1)
+    [<ImportNode re self=7480us cumulative=9772us>]
+    """
+    nodes = [node for root in roots for node in root.walk()]
+    return sorted(nodes, key=lambda node: node.self_us, reverse=True)[:count]
+
+
+def profile_imports(modules, settings_module=None, django_setup=True, python=sys.executable):
+    """
+    Import the modules in a new Python process and returns the import tree.
+
+    :param modules: module names to import (e.g.: the WSGI module of the page instance)
+    :param settings_module: DJANGO_SETTINGS_MODULE for the new process
+    :param django_setup: call django.setup() before the modules are imported
+    """
+    if sys.version_info < (3, 7):
+        raise RuntimeError("'python -X importtime' needs Python 3.7 or newer!")
+
+    code = ["import %s" % module for module in modules]
+    if django_setup:
+        code.insert(0, "import django;django.setup()")
+
+    env = os.environ.copy()
+    if settings_module is not None:
+        env["DJANGO_SETTINGS_MODULE"] = settings_module
+
+    proc = subprocess.run(
+        [python, "-X", "importtime", "-c", ";".join(code)],
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    if proc.returncode:
+        raise RuntimeError("Import failed:\n%s" % "\n".join(
+            line for line in proc.stderr.splitlines() if not IMPORT_TIME_RE.match(line)
+        ))
+
+    return parse_import_time(proc.stderr.splitlines())
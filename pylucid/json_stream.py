@@ -0,0 +1,183 @@
+# coding: utf-8
+
+"""
+    PyLucid JSON stream
+    ~~~~~~~~~~~~~~~~~~~
+
+    Serialize big querysets chunk by chunk into JSON or JSON Lines
+    without building the complete output in memory.
+
+    The JSON output is the same as from django's "json" serializer,
+    so it can be loaded with './manage.py loaddata', too.
+    JSON Lines contains one object per line.
+
+    Used in the admin actions from pylucid.admin
+    and for the import in pylucid.bulk_import
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import gzip
+import json
+import logging
+import zlib
+from pathlib import Path
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.serializers.python import Serializer as PythonSerializer
+from django.http import StreamingHttpResponse
+from django.utils.encoding import force_text
+
+
+log = logging.getLogger(__name__)
+
+
+FORMAT_JSON = "json"
+FORMAT_JSONL = "jsonl"
+FORMATS = (FORMAT_JSON, FORMAT_JSONL)
+
+CHUNK_SIZE = 1000
+
+
+class PrefetchSerializer(PythonSerializer):
+    """
+    django's serializer fetch the many-to-many values of every object
+    with a extra query. Use the prefetched objects instead.
+    """
+    def handle_m2m_field(self, obj, field):
+        if field.remote_field.through._meta.auto_created:
+            self._current[field.name] = [
+                force_text(related._get_pk_val(), strings_only=True)
+                for related in getattr(obj, field.name).all()
+            ]
+
+
+def iter_chunks(queryset, chunk_size=CHUNK_SIZE):
+    """
+    Yields lists of model instances ordered by primary key.
+    Every chunk is one query (plus one query per many-to-many field).
+    """
+    opts = queryset.model._meta
+    m2m_names = [field.name for field in opts.many_to_many if field.remote_field.through._meta.auto_created]
+
+    queryset = queryset.order_by("pk")
+    last_pk = None
+    while True:
+        chunk_qs = queryset
+        if last_pk is not None:
+            chunk_qs = chunk_qs.filter(pk__gt=last_pk)
+        chunk_qs = chunk_qs[:chunk_size]
+
+        if m2m_names:
+            # prefetch_related() doesn't work together with iterator()
+            chunk = list(chunk_qs.prefetch_related(*m2m_names))
+        else:
+            chunk = list(chunk_qs.iterator())
+
+        if not chunk:
+            return
+
+        yield chunk
+        if len(chunk) < chunk_size:
+            return
+
+        last_pk = chunk[-1].pk
+
+
+def iter_objects(queryset, chunk_size=CHUNK_SIZE):
+    """
+    Yields the serialized python dicts: {"model": ..., "pk": ..., "fields": {...}}
+    """
+    serializer = PrefetchSerializer()
+    for chunk in iter_chunks(queryset, chunk_size):
+        for obj in serializer.serialize(chunk):
+            yield obj
+
+
+def serialize(queryset, fmt=FORMAT_JSON, chunk_size=CHUNK_SIZE):
+    """
+    Yields the JSON or JSON Lines output as strings.
+    """
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+
+    if fmt == FORMAT_JSONL:
+        for obj in iter_objects(queryset, chunk_size):
+            yield encoder.encode(obj) + "\n"
+    elif fmt == FORMAT_JSON:
+        separator = "[\n"
+        for obj in iter_objects(queryset, chunk_size):
+            yield separator + encoder.encode(obj)
+            separator = ",\n"
+        if separator == "[\n":
+            yield "[]\n"
+        else:
+            yield "\n]\n"
+    else:
+        raise ValueError("Unknown format %r, choose one of: %s" % (fmt, ", ".join(FORMATS)))
+
+
+def gzip_stream(chunks, compresslevel=6):
+    """
+    Compress a stream of strings into a gzip stream of bytes.
+
+    >>> import gzip
+    >>> gzip.decompress(b"".join(gzip_stream(["foo", "bar"])))
+    b'foobar'
+    """
+    compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def streaming_response(queryset, fmt=FORMAT_JSON, compress=False, chunk_size=CHUNK_SIZE):
+    """
+    Returns a StreamingHttpResponse with the serialized queryset as file download.
+    """
+    opts = queryset.model._meta
+    filename = "%s.%s.%s" % (opts.app_label, opts.model_name, fmt)
+
+    content = serialize(queryset, fmt=fmt, chunk_size=chunk_size)
+    if compress:
+        content = gzip_stream(content)
+        filename += ".gz"
+        content_type = "application/gzip"
+    elif fmt == FORMAT_JSONL:
+        content_type = "application/x-ndjson; charset=utf-8"
+    else:
+        content_type = "application/json; charset=utf-8"
+
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response["Content-Disposition"] = 'attachment; filename="%s"' % filename
+    return response
+
+
+def read_objects(file_path):
+    """
+    Yields the python dicts from a JSON or JSON Lines file.
+    Files with '.gz' extension will be decompressed.
+    """
+    file_path = Path(file_path)
+    if file_path.suffix == ".gz":
+        f = gzip.open(str(file_path), "rt", encoding="utf-8")
+    else:
+        f = file_path.open("r", encoding="utf-8")
+
+    with f:
+        first_char = f.read(1)
+        while first_char.isspace():
+            first_char = f.read(1)
+        f.seek(0)
+
+        if first_char == "[":
+            # A JSON list must be loaded completely
+            for obj in json.load(f):
+                yield obj
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
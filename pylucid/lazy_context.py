@@ -0,0 +1,270 @@
+# coding: utf-8
+
+"""
+    PyLucid lazy context processors
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Django calls every context processor on every render of a RequestContext.
+
+    lazy_processors()
+        Calls the processors from settings.PYLUCID_LAZY_CONTEXT_PROCESSORS
+        only if a template really uses one of there values.
+        The values are django.utils.functional.SimpleLazyObject instances.
+        Don't use it for processors with values that are accessed by type
+        or identity or that must be callable (e.g.: 'CMS_TEMPLATE').
+        The context keys are taken from PROCESSOR_KEYS.
+
+    constant_processors()
+        Calls the processors from settings.PYLUCID_CONSTANT_CONTEXT_PROCESSORS
+        only once. Only usable for processors that don't use the request.
+
+    settings, e.g.:
+
+        TEMPLATES = [{
+            ...
+            'OPTIONS': {
+                'context_processors': [
+                    ...
+                    'pylucid.lazy_context.lazy_processors',
+                    'pylucid.lazy_context.constant_processors',
+                ],
+            },
+        }]
+        PYLUCID_LAZY_CONTEXT_PROCESSORS = (
+            'django.contrib.messages.context_processors.messages',
+            ...
+        )
+        PYLUCID_CONSTANT_CONTEXT_PROCESSORS = (
+            'django.template.context_processors.static',
+            ...
+        )
+
+    Display which processors every CMS template uses with:
+
+        ./manage.py pylucid_context_processors
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import collections
+import functools
+import logging
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.template.base import FilterExpression, Node, NodeList, Variable
+from django.template.defaulttags import CsrfTokenNode
+from django.utils.functional import SimpleLazyObject
+from django.utils.module_loading import import_string
+
+# PyLucid
+from pylucid.template_compile import compile_templates, get_cms_template_names
+
+
+log = logging.getLogger(__name__)
+
+
+# context processor -> context keys
+PROCESSOR_KEYS = {
+    "django.contrib.auth.context_processors.auth": ("user", "perms"),
+    "django.contrib.messages.context_processors.messages": ("messages", "DEFAULT_MESSAGE_LEVELS"),
+    "django.template.context_processors.i18n": ("LANGUAGES", "LANGUAGE_CODE", "LANGUAGE_BIDI"),
+    "django.template.context_processors.debug": ("debug", "sql_queries"),
+    "django.template.context_processors.request": ("request",),
+    "django.template.context_processors.media": ("MEDIA_URL",),
+    "django.template.context_processors.csrf": ("csrf_token",),
+    "django.template.context_processors.tz": ("TIME_ZONE",),
+    "django.template.context_processors.static": ("STATIC_URL",),
+    "sekizai.context_processors.sekizai": ("SEKIZAI_CONTENT_HOLDER",),
+    "cms.context_processors.cms_settings": (
+        "cms_menu_renderer", "cms_content_renderer", "CMS_MEDIA_URL", "CMS_TEMPLATE"
+    ),
+    "pylucid.context_processors.pylucid": ("pylucid_version", "powered_by"),
+    "pylucid.lazy_context.lazy_processors": (),
+    "pylucid.lazy_context.constant_processors": (),
+}
+
+# Processors that are needed by template tags and not (only) by variables:
+IMPLICIT_PROCESSORS = (
+    "django.template.context_processors.request",
+    "sekizai.context_processors.sekizai",
+    "cms.context_processors.cms_settings",
+)
+
+
+def get_processor_keys(processor_path):
+    try:
+        return PROCESSOR_KEYS[processor_path]
+    except KeyError:
+        raise ImproperlyConfigured("Context keys of %r unknown, please add them to %s.PROCESSOR_KEYS" % (
+            processor_path, __name__
+        ))
+
+
+@functools.lru_cache()
+def get_lazy_processors():
+    return [
+        (import_string(path), get_processor_keys(path))
+        for path in getattr(settings, "PYLUCID_LAZY_CONTEXT_PROCESSORS", ())
+    ]
+
+
+class _LazyResult:
+    def __init__(self, processor, request):
+        self.processor = processor
+        self.request = request
+        self.result = None
+
+    def get(self, key):
+        """
+        Returns None if the processor doesn't return the key,
+        e.g.: 'debug' processor if settings.DEBUG is False
+        """
+        if self.result is None:
+            self.result = self.processor(self.request)
+        return self.result.get(key)
+
+
+def lazy_processors(request):
+    """
+    A django context processor
+    """
+    context = {}
+    for processor, keys in get_lazy_processors():
+        result = _LazyResult(processor, request)
+        for key in keys:
+            context[key] = SimpleLazyObject(functools.partial(result.get, key))
+    return context
+
+
+_constant_context = None
+
+
+def constant_processors(request):
+    """
+    A django context processor
+    """
+    global _constant_context
+    if _constant_context is None:
+        context = {}
+        for path in getattr(settings, "PYLUCID_CONSTANT_CONTEXT_PROCESSORS", ()):
+            context.update(import_string(path)(request))
+        _constant_context = context
+    return _constant_context
+
+
+def clear_cache(**kwargs):
+    global _constant_context
+    _constant_context = None
+    get_lazy_processors.cache_clear()
+
+
+setting_changed.connect(clear_cache, dispatch_uid="pylucid_lazy_context_setting_changed")
+
+
+#_____________________________________________________________________________
+# Report
+
+
+def _iter_variable_names(value):
+    if isinstance(value, FilterExpression):
+        yield from _iter_variable_names(value.var)
+        for func, args in value.filters:
+            for is_lookup, arg in args:
+                if is_lookup:
+                    yield from _iter_variable_names(arg)
+    elif isinstance(value, Variable):
+        if value.lookups is not None:
+            yield value.lookups[0]
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _iter_variable_names(item)
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _iter_variable_names(item)
+    elif hasattr(value, "var"):
+        # e.g.: classytags values
+        yield from _iter_variable_names(value.var)
+
+
+def get_variable_names(template):
+    """
+    Returns the first part of all variables that are used in the template.
+    {% csrf_token %} uses the 'csrf_token' variable.
+
+    >>> from django.template import Engine
+    >>> template = Engine().from_string(
+    ...     '{{ user.username }}{% if LANGUAGE_BIDI %}{{ foo|default:bar }}{% endif %}'
+    ...     '{% for item in items %}{{ item }}{% endfor %}{% csrf_token %}'
+    ... )
+    >>> sorted(get_variable_names(template))
+    ['LANGUAGE_BIDI', 'bar', 'csrf_token', 'foo', 'item', 'items', 'user']
+    """
+    names = set()
+    for node in template.nodelist.get_nodes_by_type(Node):
+        if isinstance(node, CsrfTokenNode):
+            names.add("csrf_token")
+        for attr, value in vars(node).items():
+            if attr == "conditions_nodelists":
+                # {% if %} node
+                for condition, nodelist in value:
+                    if condition is not None:
+                        names.update(_iter_condition_names(condition))
+            elif not isinstance(value, (Node, NodeList, str)):
+                names.update(_iter_variable_names(value))
+    return names
+
+
+def _iter_condition_names(condition):
+    # django.template.smartif: literals have 'value', operators 'first' and 'second'
+    value = getattr(condition, "value", None)
+    if value is not None:
+        yield from _iter_variable_names(value)
+    for attr in ("first", "second"):
+        operand = getattr(condition, attr, None)
+        if operand is not None:
+            yield from _iter_condition_names(operand)
+
+
+def get_context_processors():
+    processors = []
+    for engine in settings.TEMPLATES:
+        processors += engine.get("OPTIONS", {}).get("context_processors", [])
+    processors += getattr(settings, "PYLUCID_LAZY_CONTEXT_PROCESSORS", ())
+    processors += getattr(settings, "PYLUCID_CONSTANT_CONTEXT_PROCESSORS", ())
+    return processors
+
+
+ProcessorUsage = collections.namedtuple("ProcessorUsage", "processor, keys, implicit")
+
+
+def get_processor_report(template_names=None):
+    """
+    Returns a OrderedDict with: CMS template name -> list of ProcessorUsage
+    All templates that are included/extended are analysed, too.
+    """
+    if template_names is None:
+        template_names = get_cms_template_names()
+
+    from django.template.loader import get_template
+
+    report = collections.OrderedDict()
+    for template_name in template_names:
+        names = set()
+        for result in compile_templates([template_name]):
+            if result.error is not None:
+                log.error("Skip %r: %s", result.name, result.error)
+                continue
+            names.update(get_variable_names(get_template(result.name).template))
+
+        usages = []
+        for processor in get_context_processors():
+            keys = PROCESSOR_KEYS.get(processor, ())
+            used_keys = sorted(key for key in keys if key in names)
+            implicit = processor in IMPLICIT_PROCESSORS
+            if used_keys or implicit:
+                usages.append(ProcessorUsage(processor, used_keys, implicit))
+        report[template_name] = usages
+    return report
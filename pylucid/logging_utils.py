@@ -0,0 +1,303 @@
+# coding: utf-8
+
+"""
+    PyLucid logging utils
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    Logging helpers for the "production" profile of
+    pylucid.settings_utils.get_logging():
+
+        * QueueStreamHandler - The request thread only puts the record
+          into a queue. Formatting and writing is done in a background thread.
+        * CutPathFormatter - Adds 'cut_path' only if a record will be emitted
+          (replacement for a log record factory that enrich every record)
+        * JsonFormatter - One JSON object per line
+        * WarningCounter - Log repeated warnings only once, but count them
+
+    Note: Don't import django stuff here, because it's used in settings!
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import atexit
+import collections
+import copy
+import datetime
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+import weakref
+from logging.handlers import QueueHandler
+
+
+def cut_path(pathname, max_length=50):
+    """
+    >>> cut_path("/foo/bar.py")
+    '/foo/bar.py'
+    >>> cut_path("/a/very/long/path/to/the/module/pylucid/foo.py", max_length=20)
+    '...le/pylucid/foo.py'
+    """
+    if len(pathname) <= max_length:
+        return pathname
+    return "...%s" % pathname[-(max_length - 3):]
+
+
+class CutPathFormatter(logging.Formatter):
+    """
+    '%(cut_path)s' can be used in the log format.
+    """
+    def __init__(self, fmt=None, datefmt=None, style="%", max_length=50):
+        super().__init__(fmt=fmt, datefmt=datefmt, style=style)
+        self.max_length = max_length
+
+    def format(self, record):
+        record.cut_path = cut_path(record.pathname, self.max_length)
+        return super().format(record)
+
+
+class JsonFormatter(CutPathFormatter):
+    """
+    >>> record = logging.LogRecord("pylucid", logging.INFO, "/foo/bar.py", 12, "Hello %s", ("World",), None)
+    >>> record.created = 0
+    >>> JsonFormatter().format(record)
+    '{"time": "1970-01-01T00:00:00+00:00", "level": "INFO", "logger": "pylucid", "path": "/foo/bar.py", "line": 12, "message": "Hello World"}'
+    """
+    def format(self, record):
+        data = collections.OrderedDict((
+            ("time", datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat()),
+            ("level", record.levelname),
+            ("logger", record.name),
+            ("path", cut_path(record.pathname, self.max_length)),
+            ("line", record.lineno),
+            ("message", record.getMessage()),
+        ))
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text: # e.g.: prepared by QueueStreamHandler
+            data["exception"] = record.exc_text
+        if record.stack_info:
+            data["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(data)
+
+
+_queue_handlers = weakref.WeakSet()
+
+
+def _stop_listeners():
+    for handler in list(_queue_handlers):
+        handler.stop()
+
+
+atexit.register(_stop_listeners)
+
+
+_STOP = object() # queue sentinel
+
+_exception_formatter = logging.Formatter()
+
+
+class QueueStreamHandler(QueueHandler):
+    """
+    Non-blocking replacement for logging.StreamHandler
+
+    The logging thread only puts the record into the queue.
+    The listener thread formats the records and writes them in
+    batches with one flush per batch.
+    If the queue is full, the record will be dropped and counted.
+    The count of dropped records is logged on stop().
+
+    The listener thread doesn't exist in a forked child process
+    (e.g.: the WSGI workers): It's started again with the first
+    record in the child process.
+    """
+    def __init__(self, stream=None, queue_size=10000, batch_size=100):
+        super().__init__(queue.Queue(queue_size))
+        self.stream = sys.stderr if stream is None else stream
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.dropped = 0
+        self._reported_dropped = 0
+        self._thread = None
+        self._pid = None
+        self._restart_lock = threading.Lock()
+        self.start()
+        _queue_handlers.add(self)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="pylucid_logging", daemon=True)
+        self._thread.start()
+        self._pid = os.getpid()
+
+    def restart_after_fork(self):
+        with self._restart_lock:
+            if self._pid == os.getpid():
+                return # started by a other thread
+
+            # The locks of the queue may be held by a thread of the parent process
+            self.queue = queue.Queue(self.queue_size)
+            self.dropped = self._reported_dropped = 0 # counted in the parent process
+            self.start()
+
+    def prepare(self, record):
+        """
+        Merge message and arguments and format the exception like
+        QueueHandler.prepare(), because the arguments and the traceback
+        may change until the listener thread handles the record.
+        Only the formatter call is done in the listener thread.
+        """
+        record = copy.copy(record) # Other handlers get the original record
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = (self.formatter or _exception_formatter).formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        if self._pid != os.getpid():
+            self.restart_after_fork()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _write(self, records):
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.format(record))
+            except Exception:
+                self.handleError(record)
+        if lines:
+            try:
+                self.stream.write("\n".join(lines) + "\n")
+                self.stream.flush()
+            except Exception:
+                self.handleError(records[-1])
+
+    def _run(self):
+        while True:
+            records = [self.queue.get()]
+            while len(records) < self.batch_size:
+                try:
+                    records.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = any(record is _STOP for record in records)
+            self._write([record for record in records if record is not _STOP])
+            if stop:
+                return
+
+    def stop(self):
+        """
+        Write all queued records and stop the listener thread.
+        """
+        if self._thread is None:
+            return
+
+        if self._pid == os.getpid():
+            self.queue.put(_STOP) # Wait for a free slot, if the queue is full
+            self._thread.join()
+        self._thread = None
+
+        dropped = self.dropped - self._reported_dropped
+        if dropped:
+            record = logging.LogRecord(
+                __name__, logging.WARNING, __file__, 0,
+                "%i log records dropped, because the queue was full (queue size: %i)",
+                (dropped, self.queue_size), None,
+            )
+            self._reported_dropped = self.dropped
+            self._write([self.prepare(record)])
+
+    def close(self):
+        self.stop()
+        super().close()
+
+
+def _is_power_of_ten(count):
+    """
+    >>> [count for count in range(1, 1001) if _is_power_of_ten(count)]
+    [10, 100, 1000]
+    """
+    if count < 10:
+        return False
+    while count % 10 == 0:
+        count //= 10
+    return count == 1
+
+
+class WarningCounter:
+    """
+    Replacement for warnings.showwarning:
+    Log the first occurrence of a warning and count the repeats.
+    Repeats are logged again after 10, 100, 1000... occurrences.
+    Warnings of external packages are logged only with the file path.
+
+    >>> counter = WarningCounter()
+    >>> for i in range(3):
+    ...     counter("Foo", DeprecationWarning, "/src/foo.py", 12)
+    >>> counter.counts
+    Counter({('DeprecationWarning', '/src/foo.py', 12): 3})
+    """
+    def __init__(self, logger_name=__name__, external_package_paths=("/dist-packages/", "/site-packages/")):
+        self.logger = logging.getLogger(logger_name)
+        self.external_package_paths = external_package_paths
+        self.counts = collections.Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, message, category, filename, lineno, file=None, line=None):
+        external = any(path_part in filename for path_part in self.external_package_paths)
+        if external:
+            key = (None, filename, None)
+        else:
+            key = (category.__name__, filename, lineno)
+
+        with self._lock:
+            self.counts[key] += 1
+            count = self.counts[key]
+
+        if count > 1 and not _is_power_of_ten(count):
+            return
+
+        if external:
+            msg = "There are warnings in: %s" % filename
+        else:
+            msg = "%s:%s" % (category.__name__, message)
+        if count > 1:
+            msg += " (repeated %i times)" % count
+
+        record = self.logger.makeRecord(
+            name=self.logger.name, level=logging.WARNING, fn=filename, lno=lineno or 0,
+            msg=msg, args=None, exc_info=None,
+        )
+        self.logger.handle(record)
+
+
+def measure_overhead(handler, count=10000, level=logging.DEBUG):
+    """
+    Returns the seconds per log.info() call in the calling thread
+    and the total seconds until all records are written.
+    The handler will be closed.
+    """
+    log = logging.getLogger("%s.measure_overhead" % __name__)
+    log.propagate = False
+    log.setLevel(level)
+    log.addHandler(handler)
+    try:
+        start_time = time.perf_counter()
+        for no in range(count):
+            log.info("Message %i from %s", no, handler)
+        call_duration = time.perf_counter() - start_time
+    finally:
+        log.removeHandler(handler)
+        handler.close()
+    total_duration = time.perf_counter() - start_time
+    return call_duration / count, total_duration
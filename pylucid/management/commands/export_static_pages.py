@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+import os
+
+from django.contrib.sites.models import Site
+from django.core.management import BaseCommand
+
+# PyLucid
+from pylucid.static_export import export_pages
+from pylucid.utils import human_duration
+
+
+class Command(BaseCommand):
+    """
+    see: pylucid.static_export
+    """
+    help = "Render all published CMS pages into static HTML files (only changed pages)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("output_path",
+            help="Destination directory for the HTML files")
+        parser.add_argument("--all", action="store_true", dest="force", default=False,
+            help="Export all pages, not only the changed ones.")
+        parser.add_argument("--processes", type=int, default=os.cpu_count(),
+            help="Number of worker processes (default: %(default)s)")
+        parser.add_argument("--host", default=None,
+            help="HTTP host used for the requests (default: domain of the current site)")
+
+    def handle(self, **options):
+        site = Site.objects.get_current()
+        host = options["host"] or site.domain
+
+        self.stdout.write("Export pages from %r to: %s" % (host, options["output_path"]))
+
+        count = 0
+        errors = 0
+        for result in export_pages(
+                site=site,
+                output_path=options["output_path"],
+                host=host,
+                processes=options["processes"],
+                force=options["force"],
+            ):
+            count += 1
+            if result.status_code == 200:
+                self.stdout.write("%s %s (%s)" % (
+                    result.job.language, result.job.url, human_duration(result.duration)
+                ))
+            else:
+                errors += 1
+                self.stderr.write("ERROR: %s returned status code %s" % (result.job.url, result.status_code))
+
+        self.stdout.write("%i pages rendered, %i errors." % (count, errors))
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.core.management import BaseCommand
+from django.test import Client
+from django.test.utils import override_settings
+
+# PyLucid
+from pylucid.middlewares import timing
+from pylucid.settings_utils import add_middleware_timing
+
+
+class Command(BaseCommand):
+    """
+    see: pylucid.middlewares.timing
+    """
+    help = "Send requests and display the time every middleware adds (p50/p99)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("urls", nargs="*", default=["/"],
+            help="URLs to request (default: %(default)s)")
+        parser.add_argument("--count", type=int, default=100,
+            help="Number of requests per URL (default: %(default)s)")
+        parser.add_argument("--host", default=None,
+            help="HTTP host used for the requests (default: domain of the current site)")
+
+    def handle(self, **options):
+        host = options["host"] or Site.objects.get_current().domain
+
+        # Insert the markers or renumber existing markers:
+        middleware = add_middleware_timing(settings.MIDDLEWARE)
+
+        with override_settings(MIDDLEWARE=middleware):
+            timing.reset()
+            client = Client(HTTP_HOST=host)
+            for url in options["urls"]:
+                self.stdout.write("Request %r %i times..." % (url, options["count"]))
+                for no in range(options["count"]):
+                    client.get(url)
+
+            report = timing.get_report()
+
+        self.stdout.write("")
+        self.stdout.write("%-70s %6s %10s %10s" % ("middleware", "count", "p50", "p99"))
+        self.stdout.write("-" * 99)
+        for name, count, p50, p99 in report:
+            if count:
+                self.stdout.write("%-70s %6i %8.2fms %8.2fms" % (name, count, p50 * 1000, p99 * 1000))
+            else:
+                self.stdout.write("%-70s %6i %10s %10s" % (name, count, "-", "-"))
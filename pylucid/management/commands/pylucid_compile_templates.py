@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+
+from django.core.management import BaseCommand, CommandError
+
+# PyLucid
+from pylucid.template_compile import compile_templates
+from pylucid.utils import human_duration
+
+
+class Command(BaseCommand):
+    """
+    see: pylucid.template_compile
+    """
+    help = "Compile all templates from settings.CMS_TEMPLATES and their extends/include templates"
+
+    def add_arguments(self, parser):
+        parser.add_argument("templates", nargs="*",
+            help="Template names to compile (default: all from settings.CMS_TEMPLATES)")
+
+    def handle(self, **options):
+        results = compile_templates(options["templates"] or None)
+
+        errors = []
+        for result in results:
+            if result.error is None:
+                if options["verbosity"] >= 1:
+                    self.stdout.write("%10s  %s" % (human_duration(result.duration), result.name))
+            else:
+                msg = "%s: %s" % (result.name, result.error)
+                if result.used_by is not None:
+                    msg += " (used in %s)" % result.used_by
+                self.stderr.write("     ERROR  %s" % msg)
+                errors.append(msg)
+
+        total = sum(result.duration for result in results)
+        self.stdout.write("%i templates compiled in %s" % (len(results), human_duration(total)))
+
+        if errors:
+            raise CommandError("%i broken templates:\n%s" % (len(errors), "\n".join(errors)))
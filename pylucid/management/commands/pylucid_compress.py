@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.core.management import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+
+from cms.models import Page
+
+# PyLucid
+from pylucid import compress
+from pylucid.static_export import get_export_jobs
+
+
+class Command(BaseCommand):
+    """
+    see: pylucid.compress
+    """
+    help = "Compress all sekizai css/js blocks offline and create gzip/brotli files"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default=None,
+            help="HTTP host used for the requests (default: domain of the current site)")
+
+    def handle(self, **options):
+        site = Site.objects.get_current()
+        client = Client(HTTP_HOST=options["host"] or site.domain)
+
+        jobs = get_export_jobs(site)
+        pages = Page.objects.filter(pk__in=set([job.page_id for job in jobs]))
+        page_templates = dict([(page.pk, page.get_template()) for page in pages])
+
+        templates = dict([(template_name, set()) for template_name, verbose_name in settings.CMS_TEMPLATES])
+        blocks = {}
+
+        # Render without caches and offline mode, to collect all blocks:
+        with override_settings(CMS_PAGE_CACHE=False, PYLUCID_COMPRESS_OFFLINE=False):
+            for job in jobs:
+                compress._collector = {}
+                try:
+                    # The query string bypass the pylucid page cache
+                    response = client.get(job.url, {"pylucid_compress": 1})
+                    collected = compress._collector
+                finally:
+                    compress._collector = None
+
+                if response.status_code != 200:
+                    raise CommandError("Page %r returned status code %s" % (job.url, response.status_code))
+
+                self.stdout.write("%s: %i blocks" % (job.url, len(collected)))
+                blocks.update(collected)
+
+                template_name = page_templates[job.page_id]
+                templates.setdefault(template_name, set()).update(collected.keys())
+
+        for template_name, keys in sorted(templates.items()):
+            if not keys:
+                self.stderr.write("WARNING: No page uses template %r" % template_name)
+
+        for key, output in sorted(blocks.items()):
+            for file_path in compress.get_bundle_paths(output):
+                for created in compress.write_precompressed(file_path):
+                    self.stdout.write("Create '%s'" % created)
+
+        compress.save_manifest({
+            "templates": dict([(name, sorted(keys)) for name, keys in templates.items()]),
+            "blocks": blocks,
+        })
+        self.stdout.write("%i blocks from %i pages saved in '%s'" % (
+            len(blocks), len(jobs), compress.get_manifest_path()
+        ))
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+
+from django.core.management import BaseCommand
+
+# PyLucid
+from pylucid.lazy_context import get_processor_report
+
+
+class Command(BaseCommand):
+    """
+    see: pylucid.lazy_context
+    """
+    help = "Display which context processors are used by the CMS templates (and there extends/include templates)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("templates", nargs="*",
+            help="Template names to analyse (default: all from settings.CMS_TEMPLATES)")
+
+    def handle(self, **options):
+        report = get_processor_report(options["templates"] or None)
+        for template_name, usages in report.items():
+            self.stdout.write("\n%s" % template_name)
+            for usage in usages:
+                info = ", ".join(usage.keys)
+                if usage.implicit:
+                    info = " ".join(part for part in (info, "(used by template tags)") if part)
+                self.stdout.write("    %-55s %s" % (usage.processor, info))
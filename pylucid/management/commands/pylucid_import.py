@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+import time
+
+from django.core.management import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+# PyLucid
+from pylucid.bulk_import import BATCH_SIZE, TRANSACTION_SIZE, BulkImporter
+from pylucid.json_stream import read_objects
+from pylucid.utils import human_duration
+
+
+class Command(BaseCommand):
+    """
+    see: pylucid.bulk_import
+    """
+    help = "Fast import of JSON/JSON Lines files from the export admin actions (parents before children!)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("files", nargs="+",
+            help="JSON, JSON Lines or gzipped files. Imported in the given order.")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+            help="Objects per INSERT statement (default: %(default)s)")
+        parser.add_argument("--transaction-size", type=int, default=TRANSACTION_SIZE,
+            help="Objects per transaction (default: %(default)s)")
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS,
+            help="Database to import into (default: %(default)r)")
+        parser.add_argument("--no-fix-tree", action="store_false", dest="fix_tree", default=True,
+            help="Don't repair the treebeard tree fields after the import.")
+
+    def handle(self, **options):
+        importer = BulkImporter(
+            using=options["database"],
+            batch_size=options["batch_size"],
+            transaction_size=options["transaction_size"],
+            fix_tree=options["fix_tree"],
+        )
+
+        total_count = 0
+        total_start = time.time()
+        for file_path in options["files"]:
+            self.stdout.write("Import %s..." % file_path)
+            start_time = time.time()
+            count = importer.load(read_objects(file_path))
+            duration = time.time() - start_time
+            total_count += count
+            self.stdout.write("%i objects in %s (%.0f rows/sec)" % (
+                count, human_duration(duration), count / duration if duration else 0
+            ))
+
+        importer.finish()
+
+        duration = time.time() - total_start
+        self.stdout.write("Total: %i objects in %s (%.0f rows/sec)" % (
+            total_count, human_duration(duration), total_count / duration if duration else 0
+        ))
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+# PyLucid
+from pylucid.import_profile import format_tree, profile_imports, top_self_time
+
+
+class Command(BaseCommand):
+    """
+    see: pylucid.import_profile
+    """
+    help = "Display the import times of a fresh page instance process as tree"
+
+    def add_arguments(self, parser):
+        parser.add_argument("modules", nargs="*",
+            help="Modules to import after django.setup() (default: the module of settings.WSGI_APPLICATION)")
+        parser.add_argument("--min-ms", type=float, default=1.0,
+            help="Hide imports with a cumulative time less than this (default: %(default)s)")
+        parser.add_argument("--depth", type=int, default=None,
+            help="Max. depth of the import tree (default: unlimited)")
+        parser.add_argument("--top", type=int, default=20,
+            help="Count of modules in the 'self time' list (default: %(default)s)")
+
+    def handle(self, **options):
+        modules = options["modules"]
+        if not modules:
+            modules = [settings.WSGI_APPLICATION.rsplit(".", 1)[0]]
+
+        try:
+            roots = profile_imports(modules, settings_module=settings.SETTINGS_MODULE)
+        except RuntimeError as err:
+            raise CommandError(err)
+
+        for line in format_tree(roots, min_ms=options["min_ms"], max_depth=options["depth"]):
+            self.stdout.write(line)
+
+        self.stdout.write("\nTop %i modules by self time:" % options["top"])
+        for node in top_self_time(roots, count=options["top"]):
+            self.stdout.write("%9.1f ms  %s" % (node.self_us / 1000, node.name))
+
+        total_ms = sum(root.cumulative_us for root in roots) / 1000
+        self.stdout.write("\nTotal import time: %.1f ms" % total_ms)
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+
+import logging
+import tempfile
+
+from django.core.management import BaseCommand
+
+# PyLucid
+from pylucid.logging_utils import CutPathFormatter, JsonFormatter, QueueStreamHandler, measure_overhead
+from pylucid.settings_utils import LOGGING_FORMAT
+from pylucid.utils import human_duration
+
+
+class Command(BaseCommand):
+    """
+    see: pylucid.logging_utils
+    """
+    help = "Compare the time of a logging call with a synchronous and a queue based handler"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=10000,
+            help="Count of logging calls (default: %(default)s)")
+
+    def handle(self, **options):
+        count = options["count"]
+        self.stdout.write("Write %i records to a temporary file:\n" % count)
+        self.stdout.write("%-40s %10s %10s %8s" % ("handler", "per call", "total", "dropped"))
+
+        for formatter_class in (CutPathFormatter, JsonFormatter):
+            for handler_class in (logging.StreamHandler, QueueStreamHandler):
+                with tempfile.TemporaryFile("w") as stream:
+                    handler = handler_class(stream)
+                    handler.setFormatter(formatter_class(LOGGING_FORMAT))
+                    per_call, total = measure_overhead(handler, count=count)
+                self.stdout.write("%-40s %10s %10s %8i" % (
+                    "%s + %s" % (handler_class.__name__, formatter_class.__name__),
+                    "%.1f \xb5s" % (per_call * 1000000), human_duration(total), getattr(handler, "dropped", 0),
+                ))
+
+        # e.g.: log.info() with the "production" profile:
+        per_call, total = measure_overhead(QueueStreamHandler(), count=count, level=logging.WARNING)
+        self.stdout.write("%-40s %10s %10s" % (
+            "below the logger level", "%.1f \xb5s" % (per_call * 1000000), human_duration(total),
+        ))
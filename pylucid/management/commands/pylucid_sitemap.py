@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+
+from django.contrib.sites.models import Site
+from django.core.management import BaseCommand
+
+# PyLucid
+from pylucid.sitemap import CHUNK_NAME, get_sitemap_root, update_sitemap
+from pylucid.utils import human_duration
+
+
+class Command(BaseCommand):
+    """
+    see: pylucid.sitemap
+    """
+    help = "Create/update the sitemap index and sitemap files (only changed chunks)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", dest="force", default=False,
+            help="Write all sitemap files, not only the changed ones.")
+
+    def handle(self, **options):
+        site = Site.objects.get_current()
+        self.stdout.write("Update sitemap of %r in: %s" % (site.domain, get_sitemap_root(site)))
+
+        result = update_sitemap(site, force=options["force"])
+
+        for chunk_no in result.written:
+            self.stdout.write("%s written" % (CHUNK_NAME % chunk_no))
+        for chunk_no in result.removed:
+            self.stdout.write("%s removed" % (CHUNK_NAME % chunk_no))
+
+        self.stdout.write("%i URLs: %i files written, %i unchanged, %i removed (%s)" % (
+            result.url_count, len(result.written), result.unchanged, len(result.removed),
+            human_duration(result.duration)
+        ))
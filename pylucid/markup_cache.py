@@ -0,0 +1,190 @@
+# coding: utf-8
+
+"""
+    PyLucid markup render cache
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    With settings.CMS_MARKUP_RENDER_ALWAYS = True every 'cmsplugin_markup'
+    plugin will be rendered on every request. e.g.: ReST with docutils
+    is very slow on long pages.
+
+    The rendered html is cached by a hash over markup engine version and
+    the markup text. So a changed text or a updated markup engine results
+    in a new cache key and no invalidation is needed.
+    The results are stored in a small in process LRU cache and in
+    the django cache for all other processes.
+
+    settings.PYLUCID_MARKUP_CACHE_MODE:
+
+        "cache" - Use the render cache (default)
+        "trust" - Use the stored 'body_html' of the plugin, if the plugin
+                  was saved after the current markup engine version
+                  was seen the first time. Use the render cache otherwise.
+
+    Markups with 'is_dynamic' (output depends on the context)
+    are never cached.
+
+    The cache will be used by the markup plugin in: pylucid.cms_plugins
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import functools
+import hashlib
+import logging
+from importlib import import_module
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+
+# https://github.com/jedie/cmsplugin-markup
+from cmsplugin_markup.utils import get_markup_object, markup_parser
+
+# PyLucid
+from pylucid.utils import LRUCache
+
+
+log = logging.getLogger(__name__)
+
+
+MARKUP_CACHE_PREFIX = "pylucid.markup"
+
+MODE_CACHE = "cache"
+MODE_TRUST = "trust"
+
+# markup identifier -> module with the markup engine version
+ENGINE_MODULES = {
+    "creole": "creole",
+    "markdown": "markdown",
+    "textile": "textile",
+    "restructuredtext": "docutils",
+}
+
+
+def get_mode():
+    return getattr(settings, "PYLUCID_MARKUP_CACHE_MODE", MODE_CACHE)
+
+
+def get_cache():
+    return caches[getattr(settings, "PYLUCID_MARKUP_CACHE_ALIAS", "default")]
+
+
+def get_timeout():
+    return getattr(settings, "PYLUCID_MARKUP_CACHE_TIMEOUT", 7 * 24 * 60 * 60)
+
+
+_local_cache = LRUCache(maxsize=getattr(settings, "PYLUCID_MARKUP_CACHE_SIZE", 500))
+
+
+@functools.lru_cache()
+def get_engine_version(markup):
+    """
+    >>> get_engine_version("html")
+    ''
+    """
+    try:
+        module_name = ENGINE_MODULES[markup]
+    except KeyError:
+        return ""
+
+    try:
+        module = import_module(module_name)
+    except ImportError:
+        return ""
+
+    version = getattr(module, "__version__", None) or getattr(module, "version", "")
+    return str(version)
+
+
+@functools.lru_cache()
+def is_context_dependent(markup):
+    return get_markup_object(markup).is_dynamic
+
+
+def get_content_key(body, markup):
+    """
+    >>> get_content_key("foo", "html")
+    'pylucid.markup.html.dbdd6490be985744f0d3582ec70e6822a76847b3'
+    """
+    data = "%s\0%s\0%s" % (markup, get_engine_version(markup), body)
+    return "%s.%s.%s" % (MARKUP_CACHE_PREFIX, markup, hashlib.sha1(data.encode("utf-8")).hexdigest())
+
+
+def render_markup(body, markup):
+    """
+    Returns a tuple of (html, scripts, stylesheets) from the cache or render it.
+    """
+    key = get_content_key(body, markup)
+    result = _local_cache.get(key)
+    if result is not None:
+        return result
+
+    cache = get_cache()
+    result = cache.get(key)
+    if result is None:
+        log.debug("Render %r markup: %r", markup, key)
+        content, parser = markup_parser(body, markup)
+        result = (content, parser.get_scripts(), parser.get_stylesheets())
+        cache.set(key, result, get_timeout())
+
+    _local_cache.set(key, result)
+    return result
+
+
+_engine_seen = {}
+
+
+def get_engine_seen(markup):
+    """
+    Returns the datetime when the current version of the markup engine was seen the first time.
+    """
+    version = get_engine_version(markup)
+    try:
+        return _engine_seen[(markup, version)]
+    except KeyError:
+        pass
+
+    cache = get_cache()
+    key = "%s.engine_seen.%s.%s" % (MARKUP_CACHE_PREFIX, markup, version)
+    cache.add(key, timezone.now(), None)
+    seen = cache.get(key)
+    if seen is None:
+        # e.g.: DummyCache
+        return timezone.now()
+
+    _engine_seen[(markup, version)] = seen
+    return seen
+
+
+def is_body_html_current(instance):
+    """
+    Was the stored 'body_html' rendered with the current markup engine?
+    """
+    return instance.changed_date >= get_engine_seen(instance.markup)
+
+
+def _add_to_context(context, scripts, stylesheets):
+    context["markup_scripts"] = context.get("markup_scripts", []) + scripts
+    context["markup_stylesheets"] = context.get("markup_stylesheets", []) + stylesheets
+
+
+def render_plugin(instance, context):
+    """
+    Replacement for cmsplugin_markup.models.MarkupField.render()
+    """
+    if not instance.dynamic:
+        return instance.render(context)
+
+    if is_context_dependent(instance.markup):
+        return instance.render(context)
+
+    if get_mode() == MODE_TRUST and is_body_html_current(instance):
+        _add_to_context(context, instance.body_scripts.split("\n"), instance.body_stylesheets.split("\n"))
+        return mark_safe(instance.body_html)
+
+    content, scripts, stylesheets = render_markup(instance.body, instance.markup)
+    _add_to_context(context, scripts, stylesheets)
+    return mark_safe(content)
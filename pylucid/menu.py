@@ -0,0 +1,413 @@
+# coding: utf-8
+
+"""
+    PyLucid menu
+    ~~~~~~~~~~~~
+
+    A pre-computed page tree for the menu rendering.
+
+    The tree of all pages for one site and language will be build once,
+    stored in a compact array backed structure in the cache and
+    invalidated on django CMS changes (see: pylucid.signals).
+
+    The menu will be rendered in a single pass with a flat item list,
+    see: pylucid.templatetags.pylucid_menu_tags
+
+    Note:
+        * Only the django CMS pages are in the tree.
+          Menus from apphooks and navigation extenders are not supported.
+        * Page permissions (settings.CMS_PERMISSION) are not supported.
+        * In the django CMS edit mode the tree will be build from the draft
+          pages on every request.
+
+    If a site needs one of the unsupported features, the template tag
+    falls back to django CMS '{% show_menu %}', see: needs_cms_menu()
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import logging
+import uuid
+from array import array
+
+from django.conf import settings
+from django.contrib.sites.shortcuts import get_current_site
+from django.core.urlresolvers import reverse
+from django.utils import translation
+
+from cms.models import Page, Title
+from cms.utils.i18n import get_fallback_languages, hide_untranslated
+
+# PyLucid
+from pylucid.page_cache import get_cache
+
+
+log = logging.getLogger(__name__)
+
+
+MENU_CACHE_PREFIX = "pylucid.menu"
+MENU_CACHE_TIMEOUT = 24 * 60 * 60
+
+
+class MenuItem:
+    """
+    One entry in the rendered menu.
+
+    'open' is True, if the item is the first in a new (sub) menu
+    'close' is the number of (sub) menus that ends after this item
+    """
+    __slots__ = ("page_id", "url", "title", "level", "selected", "ancestor", "has_children", "open", "close")
+
+    def __init__(self, page_id, url, title, level, selected, ancestor):
+        self.page_id = page_id
+        self.url = url
+        self.title = title
+        self.level = level
+        self.selected = selected
+        self.ancestor = ancestor
+        self.has_children = False
+        self.open = False
+        self.close = 0
+
+    @property
+    def close_range(self):
+        # Useful in templates: {% for x in item.close_range %}</ul>{% endfor %}
+        return range(self.close)
+
+    def __repr__(self):
+        return "<MenuItem %r %r level=%i>" % (self.page_id, self.title, self.level)
+
+
+class MenuTree:
+    """
+    All pages of one site in one language in tree order (preorder).
+    The node 'i' has the descendants i+1 ... ends[i]-1
+
+    >>> tree = MenuTree()
+    >>> tree.add(page_id=1, parent=-1, level=0, url="/a/", title="A", visible=True)
+    >>> tree.add(page_id=2, parent=0, level=1, url="/a/b/", title="B", visible=True)
+    >>> tree.add(page_id=3, parent=0, level=1, url="/a/c/", title="C", visible=True)
+    >>> tree.add(page_id=4, parent=-1, level=0, url="/d/", title="D", visible=True)
+    >>> tree.finish()
+    >>> list(tree.ends)
+    [3, 2, 3, 4]
+    >>> tree.get_items(selected_page_id=None, from_level=0, to_level=100, extra_inactive=0, extra_active=1)
+    [<MenuItem 1 'A' level=0>, <MenuItem 4 'D' level=0>]
+    >>> items = tree.get_items(selected_page_id=1, from_level=0, to_level=100, extra_inactive=0, extra_active=1)
+    >>> [(item.title, item.selected, item.open, item.close) for item in items]
+    [('A', True, True, 0), ('B', False, True, 0), ('C', False, False, 1), ('D', False, False, 1)]
+    """
+    def __init__(self):
+        self.page_ids = array("l")
+        self.parents = array("l")
+        self.levels = array("h")
+        self.visible = array("b")
+        self.ends = array("l")
+        self.urls = []
+        self.titles = []
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_index", None)
+        return state
+
+    def __len__(self):
+        return len(self.page_ids)
+
+    def add(self, page_id, parent, level, url, title, visible):
+        self.page_ids.append(page_id)
+        self.parents.append(parent)
+        self.levels.append(level)
+        self.urls.append(url)
+        self.titles.append(title)
+        self.visible.append(visible)
+
+    def finish(self):
+        """
+        Calculate the end of every subtree. Must be called after all add() calls.
+        """
+        count = len(self.page_ids)
+        self.ends = array("l", [count] * count)
+        stack = []
+        for i, level in enumerate(self.levels):
+            while stack and self.levels[stack[-1]] >= level:
+                self.ends[stack.pop()] = i
+            stack.append(i)
+
+    @property
+    def index(self):
+        try:
+            return self._index
+        except AttributeError:
+            self._index = dict([(page_id, i) for i, page_id in enumerate(self.page_ids)])
+            return self._index
+
+    def get_items(self, selected_page_id, from_level, to_level, extra_inactive, extra_active):
+        """
+        Returns a flat list of MenuItem() instances.
+        The arguments are the same as in django CMS '{% show_menu %}'
+        """
+        selected = self.index.get(selected_page_id)
+
+        ancestors = set()
+        if selected is not None:
+            i = self.parents[selected]
+            while i != -1:
+                ancestors.add(i)
+                i = self.parents[i]
+
+        items = []
+        last_item = None
+
+        # stack entries: (node index, levels allowed below, is descendant of the selected node)
+        stack = [(i, None, False) for i in reversed(self._root_indexes())]
+        while stack:
+            i, limit, is_descendant = stack.pop()
+            level = self.levels[i]
+
+            if level > to_level:
+                continue
+
+            if level >= from_level:
+                if not self.visible[i]:
+                    # Hide the whole subtree
+                    continue
+
+                item = MenuItem(
+                    page_id=self.page_ids[i],
+                    url=self.urls[i],
+                    title=self.titles[i],
+                    level=level,
+                    selected=(i == selected),
+                    ancestor=(i in ancestors),
+                )
+                if last_item is None:
+                    item.open = True
+                elif level > last_item.level:
+                    item.open = True
+                    last_item.has_children = True
+                elif level < last_item.level:
+                    last_item.close = last_item.level - level
+                items.append(item)
+                last_item = item
+
+            # How many levels are shown below this node?
+            if i == selected:
+                own_limit = extra_active
+            elif i in ancestors:
+                own_limit = None
+            elif is_descendant:
+                own_limit = None
+            else:
+                own_limit = extra_inactive
+
+            if limit is None:
+                limit = own_limit
+            elif own_limit is not None:
+                limit = min(limit, own_limit)
+
+            if limit is not None and limit <= 0:
+                continue
+
+            child_limit = None if limit is None else limit - 1
+            child_is_descendant = is_descendant or i == selected
+            stack.extend([(child, child_limit, child_is_descendant) for child in reversed(self._child_indexes(i))])
+
+        if last_item is not None:
+            last_item.close = last_item.level - from_level + 1
+
+        return items
+
+    def _root_indexes(self):
+        return self._sibling_indexes(0, len(self.page_ids))
+
+    def _child_indexes(self, i):
+        return self._sibling_indexes(i + 1, self.ends[i])
+
+    def _sibling_indexes(self, start, end):
+        indexes = []
+        i = start
+        while i < end:
+            indexes.append(i)
+            i = self.ends[i]
+        return indexes
+
+
+def get_page_url(page, title, language):
+    with translation.override(language):
+        if page.is_home:
+            return reverse("pages-root")
+        return reverse("pages-details-by-slug", kwargs={"slug": title.path or title.slug})
+
+
+def build_menu_tree(site_id, language, authenticated, draft=False):
+    """
+    Build the MenuTree() from the database.
+    """
+    if draft:
+        pages = Page.objects.drafts().on_site(site_id)
+    else:
+        pages = Page.objects.public().published(site=site_id)
+
+    if not authenticated:
+        pages = pages.filter(login_required=False)
+
+    pages = pages.order_by("path").only("pk", "parent_id", "depth", "in_navigation", "is_home")
+
+    languages = [language]
+    if not hide_untranslated(language, site_id):
+        languages += get_fallback_languages(language, site_id)
+
+    titles_qs = Title.objects.filter(page__in=pages, language__in=languages)
+    if not draft:
+        titles_qs = titles_qs.filter(published=True)
+
+    titles = {}
+    for title in titles_qs.only("page_id", "language", "title", "menu_title", "path", "slug"):
+        titles.setdefault(title.page_id, {})[title.language] = title
+
+    tree = MenuTree()
+    indexes = {}
+    for page in pages:
+        if page.depth > 1:
+            try:
+                parent = indexes[page.parent_id]
+            except KeyError:
+                # parent not published or without title
+                continue
+        else:
+            parent = -1
+
+        page_titles = titles.get(page.pk, {})
+        for lang in languages:
+            if lang in page_titles:
+                title = page_titles[lang]
+                break
+        else:
+            continue
+
+        indexes[page.pk] = len(tree)
+        tree.add(
+            page_id=page.pk,
+            parent=parent,
+            level=page.depth - 1,
+            url=get_page_url(page, title, language),
+            title=title.menu_title or title.title,
+            visible=page.in_navigation,
+        )
+
+    tree.finish()
+    return tree
+
+
+def get_version_key(site_id):
+    return "%s.version.%s" % (MENU_CACHE_PREFIX, site_id)
+
+
+def _get_version(cache, site_id):
+    version_key = get_version_key(site_id)
+    version = cache.get(version_key)
+    if version is None:
+        cache.add(version_key, uuid.uuid4().hex, None)
+        version = cache.get(version_key)
+    return version
+
+
+def get_menu_tree(site_id, language, authenticated):
+    """
+    Returns the MenuTree() from the cache. Build it, if not exists.
+    """
+    cache = get_cache()
+    version = _get_version(cache, site_id)
+
+    tree_key = "%s.tree.%s.%s.%i.%s" % (MENU_CACHE_PREFIX, site_id, language, authenticated, version)
+    tree = cache.get(tree_key)
+    if tree is None:
+        log.debug("Build menu tree for site %r language %r", site_id, language)
+        tree = build_menu_tree(site_id, language, authenticated)
+        cache.set(tree_key, tree, MENU_CACHE_TIMEOUT)
+
+    return tree
+
+
+def uses_cms_menu_features(site_id):
+    """
+    Returns True, if the site uses menus, that are not in the MenuTree():
+    navigation extenders or the menus of apphooks.
+    """
+    from cms.apphook_pool import apphook_pool
+    from cms.menu import CMSMenu
+    from cms.menu_bases import CMSAttachMenu
+    from menus.menu_pool import menu_pool
+
+    menu_pool.discover_menus()
+    for menu in menu_pool.menus.values():
+        menu_class = menu if isinstance(menu, type) else menu.__class__
+        if menu_class is not CMSMenu and not issubclass(menu_class, CMSAttachMenu):
+            # A menu that adds his nodes to all pages
+            return True
+
+    pages = Page.objects.public().filter(site_id=site_id)
+    if pages.exclude(navigation_extenders__isnull=True).exclude(navigation_extenders="").exists():
+        return True
+
+    application_urls = pages.exclude(application_urls__isnull=True).exclude(application_urls="").values_list(
+        "application_urls", flat=True
+    ).distinct()
+    for app_name in application_urls:
+        apphook = apphook_pool.get_apphook(app_name)
+        if apphook is not None and apphook.get_menus():
+            return True
+
+    return False
+
+
+def needs_cms_menu(site_id):
+    """
+    Returns True, if the menu must be rendered with django CMS '{% show_menu %}'
+    The result is cached and invalidated with the menu trees.
+    """
+    if getattr(settings, "CMS_PERMISSION", False):
+        return True
+
+    cache = get_cache()
+    key = "%s.cms_menu.%s.%s" % (MENU_CACHE_PREFIX, site_id, _get_version(cache, site_id))
+    result = cache.get(key)
+    if result is None:
+        result = uses_cms_menu_features(site_id)
+        if result:
+            log.info("Site %r uses navigation extenders or apphook menus: Use '{%% show_menu %%}'", site_id)
+        cache.set(key, result, MENU_CACHE_TIMEOUT)
+    return result
+
+
+def invalidate_site(site_id):
+    log.debug("Invalidate menu trees for site id: %r", site_id)
+    get_cache().set(get_version_key(site_id), uuid.uuid4().hex, None)
+
+
+def get_menu_items(request, from_level=0, to_level=100, extra_inactive=0, extra_active=1000):
+    """
+    Returns a flat list of MenuItem() for the current request.
+    """
+    site_id = get_current_site(request).pk
+    language = translation.get_language()
+    authenticated = bool(request.user.is_authenticated)
+
+    toolbar = getattr(request, "toolbar", None)
+    draft = toolbar is not None and getattr(toolbar, "edit_mode", False)
+    if draft:
+        tree = build_menu_tree(site_id, language, authenticated, draft=True)
+    else:
+        tree = get_menu_tree(site_id, language, authenticated)
+
+    page = getattr(request, "current_page", None)
+    if not page:
+        selected_page_id = None
+    elif page.publisher_is_draft and not draft:
+        selected_page_id = page.publisher_public_id
+    else:
+        selected_page_id = page.pk
+
+    return tree.get_items(selected_page_id, from_level, to_level, extra_inactive, extra_active)
@@ -0,0 +1,36 @@
+# coding: utf-8
+
+"""
+    PyLucid django-multisite middleware
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Replacement for multisite.middleware.DynamicSiteMiddleware that
+    looks up unknown hosts via the in process cache, see:
+    pylucid.multisite_views.HostResolver
+
+    settings, e.g.:
+
+        MIDDLEWARE = (
+            ...
+            "pylucid.middlewares.multisite.CachedDynamicSiteMiddleware",
+            ...
+        )
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+# https://github.com/ecometrica/django-multisite
+from multisite.middleware import DynamicSiteMiddleware
+
+# PyLucid
+from pylucid.multisite_views import resolver
+
+
+class CachedDynamicSiteMiddleware(DynamicSiteMiddleware):
+    def get_alias(self, netloc):
+        alias = resolver.resolve(netloc)
+        if alias is None:
+            # Running under TestCase or runserver?
+            return self.get_development_alias(netloc)
+        return alias
@@ -0,0 +1,139 @@
+# coding: utf-8
+
+"""
+    PyLucid page cache middlewares
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Replacement for django.middleware.cache.UpdateCacheMiddleware
+    and django.middleware.cache.FetchFromCacheMiddleware
+    that knows about django CMS pages (see: pylucid.page_cache)
+
+    Only anonymous GET/HEAD requests without a session cookie and without
+    a query string (e.g.: '?edit', '?toolbar_off') are cached.
+
+    settings, e.g.:
+
+        MIDDLEWARE = (
+            "pylucid.middlewares.page_cache.UpdatePageCacheMiddleware", # must be the first
+            ...
+            "django.contrib.sessions.middleware.SessionMiddleware",
+            "django.middleware.locale.LocaleMiddleware",
+            ...
+            "cms.middleware.page.CurrentPageMiddleware",
+            ...
+            "pylucid.middlewares.page_cache.FetchFromPageCacheMiddleware", # must be the last
+        )
+        PYLUCID_PAGE_CACHE_TIMEOUT = 6 * 60 * 60 # seconds
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import logging
+
+from django.conf import settings
+from django.contrib.sites.shortcuts import get_current_site
+from django.utils.cache import patch_response_headers
+from django.utils.deprecation import MiddlewareMixin
+
+# PyLucid
+from pylucid import page_cache
+
+
+log = logging.getLogger(__name__)
+
+
+# Response header to see if a page comes from the cache:
+CACHE_HEADER = "X-PyLucid-Page-Cache"
+
+
+def _get_cache_args(request):
+    site_id = get_current_site(request).pk
+    language = getattr(request, "LANGUAGE_CODE", settings.LANGUAGE_CODE)
+    return site_id, language, request.path
+
+
+def is_cacheable_request(request):
+    if request.method not in ("GET", "HEAD"):
+        return False
+
+    if request.META.get("QUERY_STRING"):
+        return False
+
+    # A user without session can't be logged in
+    # and we didn't touch the session/database here ;)
+    if settings.SESSION_COOKIE_NAME in request.COOKIES:
+        return False
+
+    return True
+
+
+def is_cacheable_response(response):
+    if response.streaming or response.status_code != 200:
+        return False
+
+    if response.cookies:
+        return False
+
+    cache_control = response.get("Cache-Control", "")
+    for directive in ("private", "no-cache", "no-store"):
+        if directive in cache_control:
+            return False
+
+    return True
+
+
+class UpdatePageCacheMiddleware(MiddlewareMixin):
+    """
+    Store the response of a CMS page into the page cache.
+    Must be the first middleware.
+    """
+    def _update_cache(self, request, response):
+        page = getattr(request, "current_page", None)
+        if not page:
+            # Not a CMS page, e.g.: a 404
+            return
+
+        if page.application_urls:
+            # e.g.: djangocms_blog: A new blog entry fires no page signal
+            return
+
+        site_id, language, path = _get_cache_args(request)
+        log.debug("Store page %r (%s) in cache: %r", page.pk, language, path)
+        page_cache.set_response(site_id, language, path, response)
+
+    def process_response(self, request, response):
+        if not getattr(request, "_pylucid_page_cache_update", False):
+            return response
+
+        if not is_cacheable_response(response):
+            return response
+
+        patch_response_headers(response, cache_timeout=0)
+
+        if hasattr(response, "render") and callable(response.render) and not response.is_rendered:
+            response.add_post_render_callback(lambda r: self._update_cache(request, r))
+        else:
+            self._update_cache(request, response)
+
+        return response
+
+
+class FetchFromPageCacheMiddleware(MiddlewareMixin):
+    """
+    Returns the cached response, if exists.
+    Must be the last middleware.
+    """
+    def process_request(self, request):
+        if not is_cacheable_request(request):
+            request._pylucid_page_cache_update = False
+            return None
+
+        response = page_cache.get_response(*_get_cache_args(request))
+        if response is None:
+            request._pylucid_page_cache_update = True
+            return None
+
+        request._pylucid_page_cache_update = False
+        response[CACHE_HEADER] = "hit"
+        return response
@@ -0,0 +1,201 @@
+# coding: utf-8
+
+"""
+    PyLucid request statistics middleware
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Low overhead replacement for django_processinfo.middlewares.ProcessInfoMiddleware
+
+    Every request is counted, but only a random sample of requests
+    is measured:
+
+        * total time
+        * database query count and time (on all database connections)
+        * template render time (only for TemplateResponse, e.g.: all CMS pages)
+        * full page cache hit/miss (see: pylucid.middlewares.page_cache)
+
+    The values are aggregated in memory, see: pylucid.request_stats
+
+    The queries are counted with QueryCounter, the query log of the
+    connections (settings.DEBUG) is not used.
+
+    settings, e.g.:
+
+        MIDDLEWARE = (
+            "pylucid.middlewares.request_stats.RequestStatsMiddleware", # should be the first
+            ...
+        )
+        PYLUCID_REQUEST_STATS_SAMPLE_RATE = 0.1 # measure 10% of all requests, 0 == off
+        PYLUCID_REQUEST_STATS_FLUSH_INTERVAL = 60 # seconds
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import logging
+import random
+import time
+
+from django.db import connections
+from django.utils.deprecation import MiddlewareMixin
+
+# PyLucid
+from pylucid import request_stats
+from pylucid.middlewares.page_cache import CACHE_HEADER
+
+
+log = logging.getLogger(__name__)
+
+
+UNRESOLVED_NAME = "(unresolved)"
+
+
+def get_view_path(func):
+    """
+    >>> get_view_path(get_view_path)
+    'pylucid.middlewares.request_stats.get_view_path'
+    >>> get_view_path(RequestStatsMiddleware())
+    'pylucid.middlewares.request_stats.RequestStatsMiddleware'
+    """
+    if not hasattr(func, "__name__"):
+        # A class-based view instance
+        func = func.__class__
+    return "%s.%s" % (func.__module__, getattr(func, "__qualname__", func.__name__))
+
+
+def get_request_name(request):
+    resolver_match = getattr(request, "resolver_match", None)
+    if resolver_match is None:
+        return UNRESOLVED_NAME
+    return resolver_match.view_name or get_view_path(resolver_match.func)
+
+
+class QueryCounter:
+    """
+    Count the queries and the query time of all cursors of a connection.
+    Like connection.execute_wrapper() of django >= 2.0: The connection
+    creates the cursors as before, only the executes are measured.
+    """
+    def __init__(self, connection):
+        self.connection = connection
+        self.queries = 0
+        self.time = 0.0
+
+    def __enter__(self):
+        connection = self.connection
+        make_cursor = connection.make_cursor
+        make_debug_cursor = connection.make_debug_cursor
+
+        # Set as instance attributes, so this thread local connection will be changed only:
+        connection.make_cursor = lambda cursor: CountingCursor(make_cursor(cursor), self)
+        connection.make_debug_cursor = lambda cursor: CountingCursor(make_debug_cursor(cursor), self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        del self.connection.make_cursor
+        del self.connection.make_debug_cursor
+
+    def measure(self, method, *args):
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            self.queries += 1
+            self.time += time.perf_counter() - start
+
+
+class CountingCursor:
+    """
+    Wraps the django cursor wrapper, see: QueryCounter
+    """
+    def __init__(self, cursor, counter):
+        self.cursor = cursor
+        self.counter = counter
+
+    def __getattr__(self, attr):
+        return getattr(self.cursor, attr)
+
+    def __iter__(self):
+        return iter(self.cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self.cursor.__exit__(exc_type, exc_value, traceback)
+
+    def callproc(self, *args):
+        return self.counter.measure(self.cursor.callproc, *args)
+
+    def execute(self, *args):
+        return self.counter.measure(self.cursor.execute, *args)
+
+    def executemany(self, *args):
+        return self.counter.measure(self.cursor.executemany, *args)
+
+
+def get_cache_hit(request, response):
+    if response.get(CACHE_HEADER) == "hit":
+        return True
+    if getattr(request, "_pylucid_page_cache_update", False):
+        return False
+    return None # request is not cacheable
+
+
+class RequestStatsMiddleware(MiddlewareMixin):
+    def process_request(self, request):
+        sample_rate = request_stats.get_sample_rate()
+        if not sample_rate:
+            request._pylucid_stats = None
+            return
+
+        if random.random() >= sample_rate:
+            request._pylucid_stats = False
+            return
+
+        counters = [QueryCounter(connection).__enter__() for connection in connections.all()]
+
+        request._pylucid_stats = {
+            "start": time.perf_counter(),
+            "queries": counters,
+            "template_time": 0.0,
+        }
+
+    def process_template_response(self, request, response):
+        stats = getattr(request, "_pylucid_stats", None)
+        if stats:
+            def post_render(response):
+                stats["template_time"] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            response.add_post_render_callback(post_render)
+        return response
+
+    def process_response(self, request, response):
+        stats = getattr(request, "_pylucid_stats", None)
+        if stats is None:
+            return response
+
+        if stats is False:
+            request_stats.collector.record(get_request_name(request))
+        else:
+            total_time = time.perf_counter() - stats["start"]
+
+            db_queries = 0
+            db_time = 0.0
+            for counter in stats["queries"]:
+                counter.__exit__(None, None, None)
+                db_queries += counter.queries
+                db_time += counter.time
+
+            sample = request_stats.Sample(
+                total_time=total_time,
+                db_queries=db_queries,
+                db_time=db_time,
+                template_time=stats["template_time"],
+                cache_hit=get_cache_hit(request, response),
+            )
+            request_stats.collector.record(get_request_name(request), sample)
+
+        request_stats.collector.ensure_thread()
+        return response
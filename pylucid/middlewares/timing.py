@@ -0,0 +1,179 @@
+# coding: utf-8
+
+"""
+    PyLucid middleware timing
+    ~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Measure the time every middleware adds to a request.
+
+    A TimingMarker will be inserted before every middleware and before
+    the view, see: pylucid.settings_utils.add_middleware_timing()
+    Every marker has his position in the middleware path, e.g.:
+    'pylucid.middlewares.timing.marker:0' is the outermost marker.
+    django imports the path as attribute 'marker:0' of this module,
+    see: TimingModule
+    The time between two markers (on the way in and on the way out)
+    is the cost of the middleware between them.
+
+    Display the report with:
+
+        ./manage.py middleware_timing
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import collections
+import logging
+import math
+import sys
+import time
+import types
+
+from django.conf import settings
+
+
+log = logging.getLogger(__name__)
+
+
+MARKER_NAME = "marker:"
+MARKER_PREFIX = "%s.%s" % (__name__, MARKER_NAME)
+VIEW_NAME = "(view)"
+MAX_SAMPLES = 1000 # per middleware
+
+
+# middleware name -> durations in seconds
+_samples = collections.defaultdict(lambda: collections.deque(maxlen=MAX_SAMPLES))
+
+
+def is_marker(entry):
+    """
+    >>> is_marker("pylucid.middlewares.timing.marker:12")
+    True
+    >>> is_marker("foo.Bar")
+    False
+    """
+    return entry.startswith(MARKER_PREFIX)
+
+
+def get_layer_names():
+    """
+    Returns the middleware names behind every marker from settings.MIDDLEWARE
+    """
+    names = []
+    middleware = list(settings.MIDDLEWARE)
+    for pos, entry in enumerate(middleware):
+        if not is_marker(entry):
+            continue
+        try:
+            names.append(middleware[pos + 1])
+        except IndexError:
+            names.append(VIEW_NAME)
+    return names
+
+
+def percentile(values, percent):
+    """
+    >>> percentile([1, 2, 3, 4], 50)
+    2
+    >>> percentile([1, 2, 3, 4], 99)
+    4
+    >>> percentile([], 50)
+    """
+    if not values:
+        return None
+    values = sorted(values)
+    index = max(0, math.ceil(len(values) * percent / 100.0) - 1)
+    return values[index]
+
+
+def get_report():
+    """
+    Returns a list of (name, count, p50, p99) in middleware order.
+    """
+    report = []
+    for name in get_layer_names():
+        samples = list(_samples[name])
+        report.append((name, len(samples), percentile(samples, 50), percentile(samples, 99)))
+    return report
+
+
+def reset():
+    _samples.clear()
+
+
+def _store_samples(timings, names):
+    count = len(names)
+    for pos, name in enumerate(names):
+        try:
+            start, end = timings[pos]
+        except KeyError:
+            # Not reached: a outer middleware returned a response
+            break
+
+        duration = end - start
+        if pos + 1 < count and pos + 1 in timings:
+            inner_start, inner_end = timings[pos + 1]
+            duration -= inner_end - inner_start
+
+        _samples[name].append(duration)
+
+
+class TimingMarker:
+    """
+    Don't add this manually, use: pylucid.settings_utils.add_middleware_timing()
+    """
+    def __init__(self, get_response, position):
+        self.get_response = get_response
+        self.position = position
+        self.names = get_layer_names()
+
+    def __call__(self, request):
+        if self.position == 0:
+            request._pylucid_timings = {}
+
+        start = time.perf_counter()
+        response = self.get_response(request)
+        end = time.perf_counter()
+
+        timings = request._pylucid_timings
+        timings[self.position] = (start, end)
+
+        if self.position == 0:
+            _store_samples(timings, self.names)
+
+        return response
+
+
+def get_marker(position):
+    """
+    Returns the middleware factory for the marker at the given position.
+    """
+    def marker(get_response):
+        return TimingMarker(get_response, position)
+    return marker
+
+
+class TimingModule(types.ModuleType):
+    """
+    Resolve the marker paths from settings.MIDDLEWARE: django imports
+    'pylucid.middlewares.timing.marker:3' as attribute 'marker:3'
+
+    >>> from django.utils.module_loading import import_string
+    >>> import_string("pylucid.middlewares.timing.marker:3")
+    <function get_marker.<locals>.marker at 0x...>
+    >>> getattr(sys.modules[__name__], "marker:foo")
+    Traceback (most recent call last):
+        ...
+    AttributeError: module 'pylucid.middlewares.timing' has no attribute 'marker:foo'
+    """
+    def __getattr__(self, name):
+        # Only called if the attribute doesn't exist
+        if name.startswith(MARKER_NAME):
+            position = name[len(MARKER_NAME):]
+            if position.isdigit():
+                return get_marker(int(position))
+        raise AttributeError("module %r has no attribute %r" % (self.__name__, name))
+
+
+sys.modules[__name__].__class__ = TimingModule
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestStatistic',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_start', models.DateTimeField()),
+                ('period_end', models.DateTimeField(db_index=True)),
+                ('pid', models.PositiveIntegerField(help_text='Process ID')),
+                ('name', models.CharField(db_index=True, help_text='URL name of the view', max_length=255)),
+                ('sample_rate', models.FloatField()),
+                ('requests', models.PositiveIntegerField(help_text='Count of all requests')),
+                ('sampled', models.PositiveIntegerField(help_text='Count of measured requests')),
+                ('total_time', models.FloatField(help_text='Sum of all sampled request times in seconds')),
+                ('max_time', models.FloatField()),
+                ('db_queries', models.PositiveIntegerField()),
+                ('db_time', models.FloatField()),
+                ('template_time', models.FloatField()),
+                ('cache_hits', models.PositiveIntegerField()),
+                ('cache_misses', models.PositiveIntegerField()),
+            ],
+            options={
+                'verbose_name': 'Request statistic',
+                'verbose_name_plural': 'Request statistics',
+                'ordering': ('-period_end', 'name'),
+            },
+        ),
+    ]
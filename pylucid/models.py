@@ -0,0 +1,63 @@
+# coding: utf-8
+
+"""
+    PyLucid models
+    ~~~~~~~~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from django.db import models
+from django.utils.translation import ugettext_lazy as _
+
+
+class RequestStatistic(models.Model):
+    """
+    Aggregated request timings of one view in one process
+    for one flush period, see: pylucid.request_stats
+    """
+    period_start = models.DateTimeField()
+    period_end = models.DateTimeField(db_index=True)
+    pid = models.PositiveIntegerField(help_text=_("Process ID"))
+    name = models.CharField(max_length=255, db_index=True, help_text=_("URL name of the view"))
+    sample_rate = models.FloatField()
+
+    requests = models.PositiveIntegerField(help_text=_("Count of all requests"))
+    sampled = models.PositiveIntegerField(help_text=_("Count of measured requests"))
+    total_time = models.FloatField(help_text=_("Sum of all sampled request times in seconds"))
+    max_time = models.FloatField()
+    db_queries = models.PositiveIntegerField()
+    db_time = models.FloatField()
+    template_time = models.FloatField()
+    cache_hits = models.PositiveIntegerField()
+    cache_misses = models.PositiveIntegerField()
+
+    def _avg(self, value):
+        if not self.sampled:
+            return None
+        return value / self.sampled
+
+    @property
+    def avg_time(self):
+        return self._avg(self.total_time)
+
+    @property
+    def avg_db_queries(self):
+        return self._avg(self.db_queries)
+
+    @property
+    def avg_db_time(self):
+        return self._avg(self.db_time)
+
+    @property
+    def avg_template_time(self):
+        return self._avg(self.template_time)
+
+    def __str__(self):
+        return "%s %s (pid: %i)" % (self.period_end, self.name, self.pid)
+
+    class Meta:
+        ordering = ("-period_end", "name")
+        verbose_name = _("Request statistic")
+        verbose_name_plural = _("Request statistics")
@@ -1,10 +1,184 @@
+# coding: utf-8
+
+r"""
+    PyLucid django-multisite integration
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    django-multisite looks up the Alias of every unknown host in the
+    database. Bots with random 'Host' headers would hit the database on
+    every request and auto_create_alias() would create a Alias for every
+    random host.
+
+    The HostResolver caches the host -> Alias mapping in process:
+
+        * found aliases for PYLUCID_MULTISITE_RESOLVER_TIMEOUT seconds
+        * unknown hosts for PYLUCID_MULTISITE_NEGATIVE_TIMEOUT seconds
+        * at most PYLUCID_MULTISITE_RESOLVER_SIZE hosts (LRU)
+
+    Changed/deleted Alias or Site entries clear the cache of the current
+    process. Other processes see the change after the timeout.
+
+    settings, e.g.:
+
+        MIDDLEWARE = (
+            ...
+            "pylucid.middlewares.multisite.CachedDynamicSiteMiddleware",
+            ...
+        )
+        MULTISITE_FALLBACK = "pylucid.multisite_views.auto_create_alias"
+
+        # Create Alias entries only for matching hosts (None == all hosts):
+        PYLUCID_MULTISITE_AUTO_ALIAS_HOSTS = r"(.+\.)?example\.tld(:\d+)?"
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import logging
+import re
+import time
 
 from django.conf import settings
 from django.contrib.sites.models import Site
-from django.http import HttpResponseRedirect
+from django.db import IntegrityError, transaction
+from django.db.models.signals import post_delete, post_save
+from django.http import Http404, HttpResponseRedirect
 
+# https://github.com/ecometrica/django-multisite
 from multisite.models import Alias
 
+# PyLucid
+from pylucid.utils import LRUCache
+
+
+log = logging.getLogger(__name__)
+
+
+def netloc_parse(netloc):
+    """
+    Same as multisite.middleware.DynamicSiteMiddleware.netloc_parse()
+
+    >>> netloc_parse("example.tld:8000")
+    ('example.tld', '8000')
+    >>> netloc_parse("example.tld")
+    ('example.tld', None)
+    """
+    if ":" in netloc:
+        host, port = netloc.rsplit(":", 1)
+        return host, port
+    return netloc, None
+
+
+class HostResolver:
+    """
+    In process cache for: host -> multisite.models.Alias
+    """
+    def __init__(self, maxsize=1000, timeout=5 * 60, negative_timeout=60, allowed_hosts=None):
+        self.timeout = timeout
+        self.negative_timeout = negative_timeout
+        if allowed_hosts is None:
+            self.allowed_hosts = None
+        else:
+            self.allowed_hosts = re.compile(allowed_hosts, re.IGNORECASE)
+
+        self._cache = LRUCache(maxsize) # netloc -> (expire time, Alias or None)
+
+    def is_allowed(self, netloc):
+        """
+        >>> resolver = HostResolver(allowed_hosts=r"(.+\\.)?example\\.tld")
+        >>> resolver.is_allowed("www.example.tld"), resolver.is_allowed("Example.TLD")
+        (True, True)
+        >>> resolver.is_allowed("example.tld.evil"), resolver.is_allowed("foo.bar")
+        (False, False)
+        >>> HostResolver().is_allowed("foo.bar")
+        True
+        """
+        if self.allowed_hosts is None:
+            return True
+        return self.allowed_hosts.fullmatch(netloc) is not None
+
+    def _set(self, netloc, alias):
+        timeout = self.negative_timeout if alias is None else self.timeout
+        self._cache.set(netloc, (time.monotonic() + timeout, alias))
+
+    def lookup_alias(self, netloc):
+        host, port = netloc_parse(netloc)
+        try:
+            return Alias.objects.resolve(host=host, port=port)
+        except ValueError:
+            return None
+
+    def resolve(self, netloc):
+        """
+        Returns the Alias for 'netloc' or None.
+        """
+        entry = self._cache.get(netloc)
+        if entry is not None:
+            expire_time, alias = entry
+            if expire_time > time.monotonic():
+                return alias
+
+        alias = self.lookup_alias(netloc)
+        self._set(netloc, alias)
+        return alias
+
+    def create_alias(self, netloc, site):
+        """
+        Race safe: Another process can create the same Alias in the meantime.
+        """
+        try:
+            with transaction.atomic():
+                alias, created = Alias.objects.get_or_create(
+                    domain=netloc,
+                    defaults={"site": site, "redirect_to_canonical": False},
+                )
+        except IntegrityError:
+            alias = Alias.objects.get(domain=netloc)
+            created = False
+
+        if created:
+            log.info("Alias %r to SITE_ID %s created.", netloc, site.pk)
+        return alias
+
+    def get_or_create(self, netloc):
+        """
+        Returns the Alias for 'netloc'. Create it for the default SITE_ID,
+        if the host is allowed. Returns None for not allowed hosts.
+        """
+        alias = self.resolve(netloc)
+        if alias is not None:
+            return alias
+
+        if not self.is_allowed(netloc):
+            log.debug("Don't create Alias for not allowed host %r", netloc)
+            return None
+
+        site = Site.objects.get(pk=settings.SITE_ID.get_default())
+        alias = self.create_alias(netloc, site)
+        self._set(netloc, alias)
+        return alias
+
+    def clear(self):
+        self._cache.clear()
+
+
+resolver = HostResolver(
+    maxsize=getattr(settings, "PYLUCID_MULTISITE_RESOLVER_SIZE", 1000),
+    timeout=getattr(settings, "PYLUCID_MULTISITE_RESOLVER_TIMEOUT", 5 * 60),
+    negative_timeout=getattr(settings, "PYLUCID_MULTISITE_NEGATIVE_TIMEOUT", 60),
+    allowed_hosts=getattr(settings, "PYLUCID_MULTISITE_AUTO_ALIAS_HOSTS", None),
+)
+
+
+def clear_resolver(**kwargs):
+    resolver.clear()
+
+
+post_save.connect(clear_resolver, sender=Alias, dispatch_uid="pylucid_multisite_alias_saved")
+post_delete.connect(clear_resolver, sender=Alias, dispatch_uid="pylucid_multisite_alias_deleted")
+post_save.connect(clear_resolver, sender=Site, dispatch_uid="pylucid_multisite_site_saved")
+post_delete.connect(clear_resolver, sender=Site, dispatch_uid="pylucid_multisite_site_deleted")
+
 
 def auto_create_alias(request):
     """
@@ -15,17 +189,14 @@ def auto_create_alias(request):
 
     MULTISITE_FALLBACK="pylucid.multisite_views.auto_create_alias"
 
+    Only hosts that match settings.PYLUCID_MULTISITE_AUTO_ALIAS_HOSTS
+    will be created, all other hosts get a 404.
+
     see also:
     https://github.com/ecometrica/django-multisite/issues/33
     """
-    host = request.get_host().lower()
-    site_id = settings.SITE_ID.get_default()
-    site = Site.objects.get(pk=site_id)
-
-    # print("Create Alias for %r to SITE_ID %s" % (host, site.pk))
-    Alias.objects.create(
-        domain=host,
-        site=site,
-        redirect_to_canonical=False,
-    )
+    netloc = request.get_host().lower()
+    alias = resolver.get_or_create(netloc)
+    if alias is None:
+        raise Http404("Unknown host")
     return HttpResponseRedirect(request.get_full_path())
@@ -0,0 +1,92 @@
+# coding: utf-8
+
+"""
+    PyLucid page cache
+    ~~~~~~~~~~~~~~~~~~
+
+    Full page cache for anonymous users.
+
+    Cache entries are keyed on site + language + path + site version.
+
+    Every site has a version token in the cache. Changing the token
+    invalidates all cache entries build with the old one.
+    Publish, unpublish, move and delete change the token, because
+    the menus of all pages show the page (see: pylucid.signals)
+
+    Pages with an apphook (e.g. djangocms_blog) are not cached:
+    Their content changes without a page signal.
+
+    Used in pylucid.middlewares.page_cache
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import hashlib
+import logging
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+log = logging.getLogger(__name__)
+
+
+PAGE_CACHE_PREFIX = "pylucid.page_cache"
+
+
+def get_cache():
+    return caches[getattr(settings, "PYLUCID_PAGE_CACHE_ALIAS", "default")]
+
+
+def get_timeout():
+    return getattr(settings, "PYLUCID_PAGE_CACHE_TIMEOUT", 6 * 60 * 60)
+
+
+def get_path_hash(path):
+    return hashlib.md5(path.encode("utf-8")).hexdigest()
+
+
+def get_site_version_key(site_id):
+    return "%s.site_version.%s" % (PAGE_CACHE_PREFIX, site_id)
+
+
+def get_content_key(site_id, language, path, site_version):
+    return "%s.content.%s.%s.%s.%s" % (PAGE_CACHE_PREFIX, site_id, language, get_path_hash(path), site_version)
+
+
+def _new_version():
+    return uuid.uuid4().hex
+
+
+def get_response(site_id, language, path):
+    """
+    Returns the cached response or None
+    """
+    cache = get_cache()
+
+    site_version = cache.get(get_site_version_key(site_id))
+    if site_version is None:
+        return None
+
+    return cache.get(get_content_key(site_id, language, path, site_version))
+
+
+def set_response(site_id, language, path, response):
+    cache = get_cache()
+
+    site_version_key = get_site_version_key(site_id)
+    # Use add(), because a other process may create it at the same time
+    cache.add(site_version_key, _new_version(), None)
+    site_version = cache.get(site_version_key)
+
+    cache.set(get_content_key(site_id, language, path, site_version), response, get_timeout())
+
+
+def invalidate_site(site_id):
+    """
+    Invalidate all cache entries of the given site.
+    """
+    log.debug("Invalidate page cache for site id: %r", site_id)
+    get_cache().set(get_site_version_key(site_id), _new_version(), None)
@@ -36,10 +36,18 @@
     :license: GNU General Public License v3 or later (GPLv3+), see LICENSE for more details.
 """
 
+import asyncio
 import cmd
+import collections
+import concurrent.futures
+import functools
+import hashlib
+import locale
 import logging
 import os
 import pathlib
+import shutil
+import signal
 import subprocess
 import sys
 import time
@@ -96,6 +104,14 @@ SELF_FILE_PATH=Path(__file__).resolve()               # .../src/bootstrap-env/bo
 ROOT_PATH=Path(SELF_FILE_PATH, "..", "..").resolve()  # .../src/bootstrap_env/
 OWN_FILE_NAME=SELF_FILE_PATH.name                     # boot_bootstrap_env.py
 
+# Pinned requirements used by 'boot_cached' and 'boot_offline':
+NORMAL_REQUIREMENTS_PATH=Path(
+    os.environ.get("PYLUCID_REQUIREMENTS", Path(SELF_FILE_PATH.parent, "requirements", "normal_installation.txt"))
+)
+
+# Local wheel cache used by 'boot_cached' and 'boot_offline':
+WHEELHOUSE_PATH=Path(os.environ.get("PYLUCID_WHEELHOUSE", "~/.cache/pylucid/wheelhouse")).expanduser()
+
 # print("SELF_FILE_PATH: %s" % SELF_FILE_PATH)
 # print("ROOT_PATH: %s" % ROOT_PATH)
 # print("OWN_FILE_NAME: %s" % OWN_FILE_NAME)
@@ -112,7 +128,8 @@ else:
     print("We are not in a virtualenv, ok.")
 
 
-SUBPROCESS_TIMEOUT=60  # default timeout for subprocess calls
+SUBPROCESS_TIMEOUT=60  # optional timeout for subprocess calls, e.g.: VerboseSubprocess(..., timeout=SUBPROCESS_TIMEOUT)
+SUBPROCESS_MAX_LINES=10000  # Only the last lines of the output are stored
 
 
 
@@ -214,16 +231,103 @@ colorizer = Colorizer()
 # colorizer.demo()
 
 
+try:
+    import resource
+except ImportError:
+    # e.g.: Windows
+    resource = None
+
+
+ResourceUsage = collections.namedtuple("ResourceUsage", "wall_time, cpu_time, max_rss")
+ResourceUsage.__doc__ = """
+wall_time and cpu_time in seconds, max_rss in bytes.
+cpu_time and max_rss are None, if not available (e.g.: on Windows)
+"""
+
+
+class OutputBuffer:
+    """
+    Ring buffer for the subprocess output: Stores only the last lines.
+
+    >>> buffer = OutputBuffer(max_lines=2)
+    >>> for line in ("one\\n", "two\\n", "three\\n"):
+    ...     buffer.append(line)
+    >>> buffer.dropped
+    1
+    >>> buffer.get_output()
+    'two\\nthree\\n'
+    """
+    def __init__(self, max_lines=SUBPROCESS_MAX_LINES):
+        self.lines = collections.deque(maxlen=max_lines)
+        self.dropped = 0
+
+    def append(self, line):
+        if len(self.lines) == self.lines.maxlen:
+            self.dropped += 1
+        self.lines.append(line)
+
+    def get_output(self):
+        return "".join(self.lines)
+
+
+ProcessResult = collections.namedtuple("ProcessResult", "args_str, exit_code, timed_out, output, usage")
+
+
+def _rusage2usage(wall_time, rusage):
+    if rusage is None:
+        return ResourceUsage(wall_time, None, None)
+
+    max_rss = rusage.ru_maxrss
+    if sys.platform != "darwin":
+        max_rss *= 1024 # Linux returns kilobytes, macOS bytes
+    return ResourceUsage(wall_time, rusage.ru_utime + rusage.ru_stime, max_rss)
+
+
+def run_concurrent(*subprocesses, line_callback=None, max_lines=SUBPROCESS_MAX_LINES):
+    """
+    Run many VerboseSubprocess instances at the same time.
+    line_callback(verbose_subprocess, line) is called for every output line.
+
+    Every process gets his own thread to wait for the process end
+    (and on Windows a second one to read the output), so no process
+    waits for a free thread of the default executor.
+
+    Returns a list of ProcessResult in the same order.
+    """
+    if not subprocesses:
+        return []
+
+    threads_per_process = 2 if sys.platform == "win32" else 1
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(subprocesses) * threads_per_process)
+    loop = asyncio.new_event_loop()
+    tasks = [
+        loop.create_task(verbose_subprocess.run_async(
+            line_callback=None if line_callback is None else functools.partial(line_callback, verbose_subprocess),
+            max_lines=max_lines,
+            executor=executor,
+        ))
+        for verbose_subprocess in subprocesses
+    ]
+    try:
+        return loop.run_until_complete(asyncio.gather(*tasks))
+    finally:
+        # e.g.: KeyboardInterrupt: kill all other processes
+        for task in tasks:
+            task.cancel()
+        loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        loop.close()
+        executor.shutdown(wait=True)
+
 
 class VerboseSubprocess:
     """
     Verbose Subprocess
     """
-    def __init__(self, *popenargs, env_updates=None, timeout=SUBPROCESS_TIMEOUT, universal_newlines=True, stderr=subprocess.STDOUT, **kwargs):
+    def __init__(self, *popenargs, env_updates=None, timeout=None, universal_newlines=True, stderr=subprocess.STDOUT, **kwargs):
         """
         :param popenargs: 'args' for subprocess.Popen()
         :param env_updates: dict to overwrite os.environ.
-        :param timeout: pass to subprocess.Popen()
+        :param timeout: hard timeout in seconds. None (default) waits until the process ends.
         :param kwargs: pass to subprocess.Popen()
         """
 
@@ -306,47 +410,233 @@ class VerboseSubprocess:
 
         return exit_code
 
-    def verbose_output(self, check=True):
+    def _popen(self):
+        kwargs = self.kwargs.copy()
+        del kwargs["timeout"] # handled by run_async()
+        del kwargs["universal_newlines"] # The output will be decoded line by line
+        kwargs["stdout"] = subprocess.PIPE
+        kwargs["bufsize"] = 0
+        if sys.platform != "win32":
+            # Own process group: So the timeout can kill all child processes, too.
+            kwargs["start_new_session"] = True
+        return subprocess.Popen(self.popenargs, **kwargs)
+
+    def _kill(self, proc):
+        try:
+            if sys.platform == "win32":
+                proc.kill()
+            else:
+                os.killpg(proc.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass # terminated in the meantime
+
+    def _wait(self, proc, started):
         """
-        run subprocess.check_output()
+        Wait for the process end and returns (exit code, rusage)
+        Runs in a thread of the executor. started() is called first.
+        """
+        started()
+        if resource is None or not hasattr(os, "wait4"):
+            return proc.wait(), None
 
-        :param check: if True and subprocess exit_code !=0: sys.exit(exit_code) after run.
-        :return: process output
+        pid, status, rusage = os.wait4(proc.pid, 0)
+        if os.WIFSIGNALED(status):
+            exit_code = -os.WTERMSIG(status)
+        else:
+            exit_code = os.WEXITSTATUS(status)
+        proc.returncode = exit_code # The process is reaped: Popen must not wait again.
+        return exit_code, rusage
+
+    async def _read_lines(self, proc, line_callback, executor=None):
         """
-        self.print_call_info()
+        Read the output from the process pipe without blocking the event loop.
+        """
+        loop = asyncio.get_event_loop()
+        encoding = locale.getpreferredencoding(False)
+
+        transport = None
+        if sys.platform == "win32":
+            # pipes can't be added to the event loop here.
+            # Note: The pipe is unbuffered (bufsize=0): It's a raw FileIO without read1()
+            async def read():
+                return await loop.run_in_executor(executor, proc.stdout.read, 65536)
+        else:
+            reader = asyncio.StreamReader()
+            transport, protocol = await loop.connect_read_pipe(
+                lambda: asyncio.StreamReaderProtocol(reader), proc.stdout
+            )
+
+            async def read():
+                return await reader.read(65536)
 
         try:
-            return subprocess.check_output(self.popenargs, **self.kwargs)
-        except subprocess.CalledProcessError as err:
+            rest = b""
+            while True:
+                data = await read()
+                if not data:
+                    break
+                lines = (rest + data).splitlines(keepends=True)
+                if not lines[-1].endswith((b"\n", b"\r")):
+                    rest = lines.pop()
+                else:
+                    rest = b""
+                for line in lines:
+                    await line_callback(line.decode(encoding, errors="replace").rstrip("\r\n") + "\n")
+
+            if rest:
+                await line_callback(rest.decode(encoding, errors="replace"))
+        finally:
+            if transport is not None:
+                transport.close()
+
+    async def run_async(self, line_callback=None, max_lines=SUBPROCESS_MAX_LINES, executor=None):
+        """
+        Run the subprocess in the current event loop.
+
+        The timeout is a hard timeout: The process (and his child processes)
+        will be killed, also if the process hangs without any output.
+        It starts if the thread that waits for the process end runs.
+
+        :param line_callback: called with every output line.
+            Can be a normal function or a coroutine function.
+            Called with (self, line) if used via run_concurrent()
+        :param max_lines: size of the ring buffer for the output
+        :param executor: for the blocking calls, None == default executor of the loop
+        :return: ProcessResult instance
+        """
+        loop = asyncio.get_event_loop()
+        buffer = OutputBuffer(max_lines=max_lines)
+
+        async def handle_line(line):
+            buffer.append(line)
+            if line_callback is not None:
+                result = line_callback(line)
+                if asyncio.iscoroutine(result):
+                    await result
+
+        timeout = self.kwargs["timeout"]
+        proc = self._popen()
+        started = asyncio.Event()
+        wait_future = loop.run_in_executor(
+            executor, self._wait, proc, functools.partial(loop.call_soon_threadsafe, started.set)
+        )
+        timed_out = False
+        try:
+            # All executor threads may be busy: Don't count the time until our thread runs
+            await started.wait()
+            start_time = time.monotonic()
+            try:
+                await asyncio.wait_for(self._read_lines(proc, handle_line, executor), timeout)
+                exit_code, rusage = await asyncio.wait_for(
+                    asyncio.shield(wait_future),
+                    None if timeout is None else max(0, start_time + timeout - time.monotonic())
+                )
+            except asyncio.TimeoutError:
+                timed_out = True
+                self._kill(proc)
+                exit_code, rusage = await wait_future
+        except BaseException:
+            # e.g.: KeyboardInterrupt or task cancelled
+            self._kill(proc)
+            raise
+        finally:
+            proc.stdout.close()
+
+        wall_time = time.monotonic() - start_time
+        return ProcessResult(
+            args_str=self.args_str,
+            exit_code=exit_code,
+            timed_out=timed_out,
+            output=buffer.get_output(),
+            usage=_rusage2usage(wall_time, rusage),
+        )
+
+    def run(self, line_callback=None, max_lines=SUBPROCESS_MAX_LINES):
+        """
+        Run the subprocess in a own event loop, see: run_async()
+        """
+        return run_concurrent(
+            self,
+            line_callback=None if line_callback is None else lambda sp, line: line_callback(line),
+            max_lines=max_lines,
+        )[0]
+
+    def print_usage(self, result):
+        usage = result.usage
+        txt = "(wall: %.1f sec." % usage.wall_time
+        if usage.cpu_time is not None:
+            txt += ", cpu: %.1f sec., max rss: %.1f MB" % (usage.cpu_time, usage.max_rss / 1024 / 1024)
+        print(txt + ")", flush=True)
+
+    def _check_result(self, result, check):
+        if result.timed_out:
+            print("\nTimeout after %s sec. from %r" % (self.kwargs["timeout"], self.args_str), flush=True)
+            raise subprocess.TimeoutExpired(self.popenargs, self.kwargs["timeout"], output=result.output)
+
+        if result.exit_code:
+            err = subprocess.CalledProcessError(result.exit_code, self.popenargs, output=result.output)
             print("\n%s" % err)
             if check:
                 sys.exit(err.returncode)
-            raise
+            raise err
 
-    def iter_output(self, check=True):
+    def verbose_output(self, check=True, max_lines=SUBPROCESS_MAX_LINES):
         """
-        A subprocess with tee ;)
+        Run the subprocess and returns the output.
+        Only the last 'max_lines' lines are stored.
+
+        :param check: if True and subprocess exit_code !=0: sys.exit(exit_code) after run.
+        :return: process output
         """
         self.print_call_info()
 
-        orig_timeout = self.kwargs.pop("timeout")
+        result = self.run(max_lines=max_lines)
+        self.print_usage(result)
+        self._check_result(result, check)
+        return result.output
 
-        self.kwargs.update({
-            "stdout":subprocess.PIPE,
-            "stderr":subprocess.STDOUT,
-        })
+    def iter_output(self, check=True):
+        """
+        A subprocess with tee ;)
+
+        The event loop runs only between the lines. The timeout
+        is checked in the event loop, so it works also if the
+        subprocess doesn't create any output.
+        """
+        self.print_call_info()
 
-        proc=subprocess.Popen(self.popenargs, **self.kwargs)
+        async def start():
+            queue = asyncio.Queue()
 
-        end_time = time.time() + orig_timeout
-        for line in iter(proc.stdout.readline, ''):
-            yield line
+            async def run():
+                try:
+                    return await self.run_async(line_callback=queue.put, max_lines=1)
+                finally:
+                    await queue.put(None)
 
-            if time.time()>end_time:
-                raise subprocess.TimeoutExpired(self.popenargs, orig_timeout)
+            return queue, asyncio.ensure_future(run())
 
-        if check and proc.returncode:
-            sys.exit(proc.returncode)
+        loop = asyncio.new_event_loop()
+        try:
+            queue, task = loop.run_until_complete(start())
+            try:
+                while True:
+                    line = loop.run_until_complete(queue.get())
+                    if line is None:
+                        break
+                    yield line
+            finally:
+                if not task.done():
+                    # e.g.: The generator was closed before the end
+                    task.cancel()
+                    loop.run_until_complete(asyncio.gather(task, return_exceptions=True))
+
+            result = task.result()
+        finally:
+            loop.close()
+
+        if result.timed_out or check:
+            self._check_result(result, check)
 
     def print_output(self, check=True):
         for line in self.iter_output(check=check):
@@ -360,6 +650,97 @@ def get_pip_file_name():
         return "pip3"
 
 
+def get_bin_dir_name():
+    if sys.platform == 'win32':
+        return "Scripts"
+    else:
+        return "bin"
+
+
+def get_wheelhouse_requirements(requirement_string):
+    r"""
+    Returns the requirements for a installation from the wheelhouse:
+    The editable VCS requirements are replaced by the package name,
+    because they are build as normal wheels.
+
+    >>> get_wheelhouse_requirements(
+    ...     "# comment\n"
+    ...     "-e git+https://github.com/foo/bar.git@develop#egg=bar\n"
+    ...     "foo==1.0  # via bar\n"
+    ... )
+    ['bar', 'foo==1.0']
+    """
+    requirements = []
+    for line in requirement_string.splitlines():
+        line = line.split("#egg=", 1)[-1] if line.startswith("-e") else line.split("# ", 1)[0]
+        line = line.strip()
+        if line and not line.startswith("#"):
+            requirements.append(line)
+    return requirements
+
+
+def get_vcs_requirements(requirement_string):
+    r"""
+    Returns the editable VCS requirements as normal requirements.
+    They are not pinned and must be build again on every boot.
+
+    >>> get_vcs_requirements(
+    ...     "-e git+https://github.com/foo/bar.git@develop#egg=bar\n"
+    ...     "foo==1.0  # via bar\n"
+    ... )
+    ['git+https://github.com/foo/bar.git@develop#egg=bar']
+    """
+    requirements = []
+    for line in requirement_string.splitlines():
+        if line.startswith("-e"):
+            requirements.append(line[2:].strip())
+    return requirements
+
+
+def _link_or_copy(src, dst):
+    try:
+        os.link(src, dst)
+    except OSError:
+        # e.g.: other file system
+        shutil.copy2(src, dst)
+
+
+def copy_env(template_path, destination, hardlink=True):
+    """
+    Create a new virtualenv as a copy of a existing one.
+
+    The files are hardlinked, if possible. All scripts that contains
+    the old path are rewritten into new files, so the template
+    virtualenv will be never changed.
+    """
+    template_path = Path(template_path).resolve()
+    destination = Path(destination)
+
+    copy_function = _link_or_copy if hardlink else shutil.copy2
+    shutil.copytree(str(template_path), str(destination), symlinks=True, copy_function=copy_function)
+
+    old_path = str(template_path).encode("utf-8")
+    new_path = str(destination).encode("utf-8")
+
+    def rewrite(file_path):
+        if file_path.is_symlink() or not file_path.is_file():
+            return
+        content = file_path.read_bytes()
+        if old_path not in content:
+            return
+        temp_path = file_path.with_name(file_path.name + ".tmp")
+        temp_path.write_bytes(content.replace(old_path, new_path))
+        shutil.copymode(str(file_path), str(temp_path))
+        os.replace(str(temp_path), str(file_path)) # Don't change the hardlinked template file
+
+    for file_path in Path(destination, get_bin_dir_name()).iterdir():
+        rewrite(file_path)
+
+    for pattern in ("*.pth", "*.egg-link"):
+        for file_path in destination.glob("lib*/python*/site-packages/%s" % pattern):
+            rewrite(file_path)
+
+
 
 class DisplayErrors:
     """
@@ -679,6 +1060,100 @@ class EnvBuilder(venv.EnvBuilder):
         )  # extended timeout for slow Travis ;)
 
 
+class CachedEnvBuilder(EnvBuilder):
+    """
+    * Create new virtualenv
+    * build missing wheels into the local wheelhouse (not in offline mode)
+    * install "pylucid" and all pinned requirements from the wheelhouse in one pip call
+    """
+    def __init__(self, requirements_path=NORMAL_REQUIREMENTS_PATH, wheelhouse_path=WHEELHOUSE_PATH, offline=False):
+        super().__init__(requirements=NORMAL_INSTALL)
+        self.requirements_path = Path(requirements_path)
+        self.wheelhouse_path = Path(wheelhouse_path)
+        self.offline = offline
+
+    def call_pip(self, context, *args, **kwargs):
+        self.call_new_python(context, context.env_exe, "-m", "pip", *args, **kwargs)
+
+    def get_index_args(self):
+        args = ["--find-links", str(self.wheelhouse_path)]
+        if self.offline:
+            args.insert(0, "--no-index")
+        return args
+
+    def _setup_pip(self, context):
+        print(" * Install pip in a virtual environment.")
+        venv.EnvBuilder._setup_pip(self, context)
+
+        context.pip_bin=Path(context.bin_path, get_pip_file_name()) # e.g.: .../bin/pip3
+
+        print(" * Upgrades pip in a virtual environment.")
+        self.call_pip(context, "install", "--upgrade", *self.get_index_args(), "pip",
+            check=False # e.g.: pip not in wheelhouse
+        )
+
+    def get_stamp_path(self):
+        """
+        Marker file in the wheelhouse: All wheels for the current
+        requirements file content are build.
+        Only the pinned requirements are covered, see: fill_wheelhouse()
+        """
+        checksum = hashlib.sha1(self.requirements_path.read_bytes()).hexdigest()
+        return Path(self.wheelhouse_path, ".requirements-%s" % checksum[:16])
+
+    def fill_wheelhouse(self, context):
+        self.wheelhouse_path.mkdir(parents=True, exist_ok=True)
+
+        stamp_path = self.get_stamp_path()
+        if stamp_path.is_file():
+            # "pylucid" and the VCS requirements are not pinned:
+            # Build them again, so a new release or commit will be installed.
+            print(" * All pinned wheels for '%s' exists in: '%s'" % (self.requirements_path, self.wheelhouse_path))
+            print(" * Refresh the not pinned wheels")
+            self.call_pip(context,
+                "wheel",
+                "--wheel-dir", str(self.wheelhouse_path),
+                "--find-links", str(self.wheelhouse_path),
+                "--pre",
+                *get_vcs_requirements(self.requirements_path.read_text()),
+                PACKAGE_NAME,
+                timeout=30*60
+            )
+            return
+
+        print(" * Build missing wheels into: '%s'" % self.wheelhouse_path)
+        self.call_pip(context,
+            "wheel",
+            "--wheel-dir", str(self.wheelhouse_path),
+            "--find-links", str(self.wheelhouse_path),
+            "--pre",
+            "--requirement", str(self.requirements_path),
+            PACKAGE_NAME, "pip",
+            timeout=30*60
+        )
+        stamp_path.touch()
+
+    def post_setup(self, context):
+        print(" * post-setup modification")
+
+        if not self.offline:
+            self.fill_wheelhouse(context)
+
+        requirements = get_wheelhouse_requirements(self.requirements_path.read_text())
+        requirements_path = Path(context.env_dir, "pylucid_requirements.txt")
+        requirements_path.write_text("\n".join(requirements))
+
+        print(" * Install all packages from: '%s'" % self.wheelhouse_path)
+        self.call_pip(context,
+            "install",
+            "--no-index", "--find-links", str(self.wheelhouse_path),
+            "--pre",
+            "--requirement", str(requirements_path),
+            PACKAGE_NAME,
+            timeout=10*60
+        )
+
+
 
 class BootBootstrapEnvShell(Cmd2):
     """
@@ -710,10 +1185,7 @@ class BootBootstrapEnvShell(Cmd2):
                     requirements.append(line)
         return requirements
 
-    def _boot(self, destination, requirements):
-        """
-        Create a pylucid virtualenv and install requirements.
-        """
+    def _check_destination(self, destination):
         if not destination:
             self.stdout.write("\nERROR: No destination path given!\n")
             self.stdout.write("\n(Hint call 'boot' with a path as argument, e.g.: '~/foo/bar')\n\n")
@@ -724,7 +1196,18 @@ class BootBootstrapEnvShell(Cmd2):
             self.stdout.write("\nERROR: Path '%s' already exists!\n\n" % destination)
             sys.exit(1)
 
-        builder = EnvBuilder(requirements)
+        return destination
+
+    def _boot(self, destination, requirements=None, builder=None):
+        """
+        Create a pylucid virtualenv and install requirements.
+        """
+        destination = self._check_destination(destination)
+
+        if builder is None:
+            builder = EnvBuilder(requirements)
+
+        start_time = time.time()
         builder.create(str(destination))
 
         self.stdout.write("\n")
@@ -733,7 +1216,20 @@ class BootBootstrapEnvShell(Cmd2):
             self.stdout.write("ERROR: Creating virtualenv!\n")
             sys.exit(1)
         else:
-            self.stdout.write("virtualenv created at: '%s'\n" % destination)
+            self.stdout.write("virtualenv created at: '%s' in %.1f sec.\n" % (destination, time.time() - start_time))
+
+    def _boot_cached(self, destination, offline):
+        if not NORMAL_REQUIREMENTS_PATH.is_file():
+            self.stdout.write("\nERROR: Requirements file not found here: '%s'\n" % NORMAL_REQUIREMENTS_PATH)
+            self.stdout.write("(Hint: Set the path via environment variable 'PYLUCID_REQUIREMENTS')\n\n")
+            sys.exit(1)
+
+        if offline and not list(WHEELHOUSE_PATH.glob("*.whl")):
+            self.stdout.write("\nERROR: No wheels found in: '%s'\n" % WHEELHOUSE_PATH)
+            self.stdout.write("(Hint: Call 'boot_cached' with network access first)\n\n")
+            sys.exit(1)
+
+        self._boot(destination, builder=CachedEnvBuilder(offline=offline))
 
     def do_boot(self, destination):
         """
@@ -772,6 +1268,74 @@ class BootBootstrapEnvShell(Cmd2):
         self._boot(destination, requirements=DEVELOPER_INSTALL)
     complete_boot_developer = complete_boot
 
+    def do_boot_cached(self, destination):
+        """
+        Bootstrap pylucid virtualenv in "normal" mode via a local wheel cache.
+
+        usage:
+            pylucid_boot> boot_cached [path]
+
+        Build all missing wheels into the wheelhouse and install
+        all packages with one pip call from there.
+
+        wheelhouse: ~/.cache/pylucid/wheelhouse
+        (change via environment variable 'PYLUCID_WHEELHOUSE')
+
+        The destination path must not exist yet!
+
+        (used the requirements/normal_installation.txt)
+        """
+        self._boot_cached(destination, offline=False)
+    complete_boot_cached = complete_boot
+
+    def do_boot_offline(self, destination):
+        """
+        Bootstrap pylucid virtualenv in "normal" mode without network access.
+
+        usage:
+            pylucid_boot> boot_offline [path]
+
+        Same as 'boot_cached', but install only from the wheelhouse.
+        Call 'boot_cached' once with network access to fill the wheelhouse.
+
+        The destination path must not exist yet!
+        """
+        self._boot_cached(destination, offline=True)
+    complete_boot_offline = complete_boot
+
+    def do_boot_from_template(self, arg):
+        """
+        Create a pylucid virtualenv as copy of a existing one.
+
+        usage:
+            pylucid_boot> boot_from_template [template path] [path] [--copy]
+
+        All files will be hardlinked (if possible), so the new
+        virtualenv is ready in seconds. Use '--copy' to copy all files.
+
+        Note: Never update packages in the template virtualenv in place!
+
+        The destination path must not exist yet!
+        """
+        args = arg.split()
+        hardlink = "--copy" not in args
+        args = [item for item in args if item != "--copy"]
+        if len(args) != 2:
+            self.stdout.write("\nERROR: Template and destination path needed!\n\n")
+            sys.exit(1)
+
+        template_path = Path(args[0]).expanduser().resolve()
+        if not Path(template_path, "pyvenv.cfg").is_file():
+            self.stdout.write("\nERROR: '%s' is not a virtualenv!\n\n" % template_path)
+            sys.exit(1)
+
+        destination = self._check_destination(args[1])
+
+        start_time = time.time()
+        copy_env(template_path, destination, hardlink=hardlink)
+        self.stdout.write("virtualenv created at: '%s' in %.1f sec.\n" % (destination, time.time() - start_time))
+    complete_boot_from_template = complete_boot
+
 
 def main():
     """
@@ -0,0 +1,211 @@
+# coding: utf-8
+
+"""
+    PyLucid request statistics
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Collect request timings in memory and write aggregated values
+    in batches from a background thread into the database.
+
+    The request path only updates a few counters. The database
+    will be touched every PYLUCID_REQUEST_STATS_FLUSH_INTERVAL seconds
+    with one bulk insert per process.
+
+    Requests are collected by: pylucid.middlewares.request_stats
+    The results are visible in the django admin: pylucid.models.RequestStatistic
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import atexit
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+
+log = logging.getLogger(__name__)
+
+
+DEFAULT_SAMPLE_RATE = 0.1
+DEFAULT_FLUSH_INTERVAL = 60 # seconds
+
+
+def get_sample_rate():
+    return getattr(settings, "PYLUCID_REQUEST_STATS_SAMPLE_RATE", DEFAULT_SAMPLE_RATE)
+
+
+def get_flush_interval():
+    return getattr(settings, "PYLUCID_REQUEST_STATS_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL)
+
+
+class Aggregate:
+    """
+    The sums of all requests to one view in one period.
+    Only sampled requests have timing values.
+    """
+    __slots__ = (
+        "requests", "sampled", "total_time", "max_time",
+        "db_queries", "db_time", "template_time", "cache_hits", "cache_misses",
+    )
+
+    def __init__(self):
+        self.requests = 0
+        self.sampled = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def add_sample(self, sample):
+        self.sampled += 1
+        self.total_time += sample.total_time
+        self.max_time = max(self.max_time, sample.total_time)
+        self.db_queries += sample.db_queries
+        self.db_time += sample.db_time
+        self.template_time += sample.template_time
+        if sample.cache_hit is True:
+            self.cache_hits += 1
+        elif sample.cache_hit is False:
+            self.cache_misses += 1
+
+
+class Sample:
+    """
+    Timings of one sampled request.
+    'cache_hit' is None, if the request is not cacheable.
+    """
+    __slots__ = ("total_time", "db_queries", "db_time", "template_time", "cache_hit")
+
+    def __init__(self, total_time, db_queries=0, db_time=0.0, template_time=0.0, cache_hit=None):
+        self.total_time = total_time
+        self.db_queries = db_queries
+        self.db_time = db_time
+        self.template_time = template_time
+        self.cache_hit = cache_hit
+
+
+class StatsCollector:
+    """
+    >>> collector = StatsCollector()
+    >>> collector.record("pages-root")
+    >>> collector.record("pages-root", Sample(total_time=0.5, db_queries=3, cache_hit=False))
+    >>> period_start, data = collector.swap()
+    >>> aggregate = data["pages-root"]
+    >>> aggregate.requests, aggregate.sampled, aggregate.db_queries, aggregate.cache_misses
+    (2, 1, 3, 1)
+    >>> collector.swap()[1]
+    {}
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._reset()
+
+    def _reset(self):
+        self.pid = os.getpid()
+        self.period_start = timezone.now()
+        self.data = {}
+
+    def record(self, name, sample=None):
+        with self._lock:
+            try:
+                aggregate = self.data[name]
+            except KeyError:
+                aggregate = self.data[name] = Aggregate()
+
+            aggregate.requests += 1
+            if sample is not None:
+                aggregate.add_sample(sample)
+
+    def swap(self):
+        """
+        Returns the collected data and starts a new period.
+        """
+        with self._lock:
+            period_start, data = self.period_start, self.data
+            self.period_start = timezone.now()
+            self.data = {}
+        return period_start, data
+
+    def flush(self):
+        """
+        Write all collected data into the database.
+        """
+        from pylucid.models import RequestStatistic
+
+        period_start, data = self.swap()
+        if not data:
+            return
+
+        period_end = timezone.now()
+        sample_rate = get_sample_rate()
+        entries = [
+            RequestStatistic(
+                period_start=period_start,
+                period_end=period_end,
+                pid=self.pid,
+                name=name[:RequestStatistic._meta.get_field("name").max_length],
+                sample_rate=sample_rate,
+                requests=aggregate.requests,
+                sampled=aggregate.sampled,
+                total_time=aggregate.total_time,
+                max_time=aggregate.max_time,
+                db_queries=aggregate.db_queries,
+                db_time=aggregate.db_time,
+                template_time=aggregate.template_time,
+                cache_hits=aggregate.cache_hits,
+                cache_misses=aggregate.cache_misses,
+            )
+            for name, aggregate in data.items()
+        ]
+        RequestStatistic.objects.bulk_create(entries)
+        log.debug("Request statistics: %i entries saved.", len(entries))
+
+    def _run(self):
+        interval = get_flush_interval()
+        while not self._stop.wait(interval):
+            try:
+                self.flush()
+            except Exception as err:
+                log.exception("Can't save request statistics: %s", err)
+            finally:
+                # Close the database connections of this thread:
+                connections.close_all()
+
+    def ensure_thread(self):
+        """
+        Start the background flush thread, if not running in this process.
+        """
+        if self.pid != os.getpid():
+            # We are in a forked worker process: Don't save the data of the parent twice.
+            with self._lock:
+                self._reset()
+            self._thread = None
+
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="pylucid_request_stats", daemon=True)
+                    self._thread.start()
+
+
+collector = StatsCollector()
+
+
+@atexit.register
+def _flush_on_exit():
+    if collector._thread is None:
+        return
+    try:
+        collector.flush()
+    except Exception as err:
+        log.exception("Can't save request statistics: %s", err)
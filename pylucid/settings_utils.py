@@ -0,0 +1,557 @@
+# coding: utf-8
+
+"""
+    PyLucid settings utils
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Helpers to build settings for a page instance.
+    Note: Don't import django stuff here, because it's used in settings!
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+
+def running_tests():
+    """
+    Are we called from the test runner?
+    """
+    return sys.argv[0].endswith("test") or "pytest" in sys.argv or "test" in sys.argv
+
+
+#_____________________________________________________________________________
+# CACHES
+
+CACHE_PROFILES = ("database", "local", "redis", "memcached", "locmem")
+
+SHARED_CACHE_BACKENDS = {
+    "redis": "django_redis.cache.RedisCache", # https://github.com/niwinz/django-redis
+    "memcached": "django.core.cache.backends.memcached.MemcachedCache",
+}
+
+LOCAL_CACHE_TIMEOUT = 10 # Max. seconds a entry lives in the process local tier
+
+
+def _two_level_cache(shared, local_timeout):
+    return {
+        "BACKEND": "pylucid.cache_backends.TwoLevelCache",
+        "OPTIONS": {
+            "LOCAL_TIMEOUT": local_timeout,
+            "LOCAL": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "pylucid-local",
+            },
+            "SHARED": shared,
+        },
+    }
+
+
+def build_caches(profile, location=None, local_timeout=LOCAL_CACHE_TIMEOUT):
+    """
+    Returns the CACHES settings for the given profile:
+
+    "database"
+        django DatabaseCache in 'pylucid_cache_table'
+        (The cache tables must be created first with: './manage.py createcachetable')
+    "local"
+        pylucid.cache_backends.TwoLevelCache: process memory + file based cache
+        'location' is the cache directory (default: in temp dir)
+    "redis" or "memcached"
+        pylucid.cache_backends.TwoLevelCache: process memory + cache server
+        'location' is the server address (e.g.: "redis://127.0.0.1:6379/1" or "127.0.0.1:11211")
+        Without a 'location' a file based cache is used as a local stand-in.
+    "locmem"
+        django LocMemCache
+
+    >>> build_caches("database")["default"]["LOCATION"]
+    'pylucid_cache_table'
+    >>> build_caches("memcached", location="127.0.0.1:11211")["default"]["OPTIONS"]["SHARED"]
+    {'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache', 'LOCATION': '127.0.0.1:11211'}
+    >>> build_caches("redis")["default"]["OPTIONS"]["SHARED"]["BACKEND"]
+    'django.core.cache.backends.filebased.FileBasedCache'
+    >>> build_caches("foobar")
+    Traceback (most recent call last):
+        ...
+    AssertionError: Unknown cache profile 'foobar'
+    """
+    assert profile in CACHE_PROFILES, "Unknown cache profile %r" % profile
+
+    if profile == "locmem":
+        return {
+            "default": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "unique-snowflake",
+            }
+        }
+
+    if profile == "database":
+        return {
+            "default": {
+                "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+                "LOCATION": "pylucid_cache_table",
+            },
+        }
+
+    if profile in SHARED_CACHE_BACKENDS and location is not None:
+        shared = {
+            "BACKEND": SHARED_CACHE_BACKENDS[profile],
+            "LOCATION": location,
+        }
+    else:
+        if location is None:
+            location = str(Path(tempfile.gettempdir(), "pylucid_cache"))
+        shared = {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": location,
+        }
+
+    return {
+        "default": _two_level_cache(shared, local_timeout),
+    }
+
+
+def get_caches(profile="database", location=None, local_timeout=LOCAL_CACHE_TIMEOUT):
+    """
+    Returns the CACHES settings for the given profile, see: build_caches()
+
+    In tests, always the "locmem" profile is used, because of:
+    https://github.com/divio/django-cms/issues/5079
+    """
+    if running_tests():
+        print("Use 'LocMemCache' CACHES in tests, because of:")
+        print("https://github.com/divio/django-cms/issues/5079")
+        profile = "locmem"
+
+    return build_caches(profile, location=location, local_timeout=local_timeout)
+
+
+#_____________________________________________________________________________
+# LOGGING
+
+LOGGING_PROFILES = ("development", "production")
+
+LOGGING_FORMAT = "%(levelname)8s %(cut_path)s:%(lineno)-3s %(message)s"
+
+
+def get_logging(profile="development", json_lines=False, level=None):
+    """
+    Returns the LOGGING settings for the given profile:
+
+    "development"
+        Synchronous StreamHandler, everything from 'pylucid' and
+        'django_tools' on DEBUG level
+    "production"
+        pylucid.logging_utils.QueueStreamHandler: Records are formatted
+        and written in a background thread. Default level is WARNING.
+        Use pylucid.logging_utils.WarningCounter for warnings.showwarning
+
+    'json_lines' == True: Write one JSON object per line.
+
+    >>> get_logging()["loggers"]["pylucid"]["level"]
+    'DEBUG'
+    >>> logging = get_logging("production", json_lines=True)
+    >>> logging["handlers"]["console"]["()"], logging["handlers"]["console"]["formatter"]
+    ('pylucid.logging_utils.QueueStreamHandler', 'json')
+    >>> logging["loggers"]["pylucid"]["level"]
+    'WARNING'
+    >>> get_logging("foobar")
+    Traceback (most recent call last):
+        ...
+    AssertionError: Unknown logging profile 'foobar'
+    """
+    assert profile in LOGGING_PROFILES, "Unknown logging profile %r" % profile
+
+    if profile == "production":
+        if level is None:
+            level = "WARNING"
+        handler = {
+            "()": "pylucid.logging_utils.QueueStreamHandler",
+        }
+    else:
+        if level is None:
+            level = "DEBUG"
+        handler = {
+            "class": "logging.StreamHandler",
+        }
+    handler["formatter"] = "json" if json_lines else "verbose"
+
+    return {
+        "version": 1,
+        "disable_existing_loggers": True,
+        "formatters": {
+            "verbose": {
+                "()": "pylucid.logging_utils.CutPathFormatter",
+                "format": LOGGING_FORMAT,
+            },
+            "json": {
+                "()": "pylucid.logging_utils.JsonFormatter",
+            },
+        },
+        "handlers": {
+            "console": handler,
+        },
+        "loggers": {
+            "": {"handlers": ["console"], "level": level, "propagate": False},
+            "django": {"handlers": ["console"], "level": "INFO" if level == "DEBUG" else level, "propagate": False},
+            "django_tools": {"handlers": ["console"], "level": level, "propagate": False},
+            "django_cms_tools": {"handlers": ["console"], "level": level, "propagate": False},
+            "pylucid": {"handlers": ["console"], "level": level, "propagate": False},
+        },
+    }
+
+
+#_____________________________________________________________________________
+# INSTALLED_APPS and MIDDLEWARE
+
+# Only useful for developing/debugging:
+DEBUG_APPS = (
+    "debug_toolbar",
+    "django_processinfo",
+)
+DEBUG_MIDDLEWARE = (
+    "debug_toolbar.middleware.DebugToolbarMiddleware",
+    "django_processinfo.middlewares.ProcessInfoMiddleware",
+)
+
+# Doesn't do anything since django 1.10:
+DEPRECATED_MIDDLEWARE = (
+    "django.contrib.auth.middleware.SessionAuthenticationMiddleware",
+)
+
+
+def production_apps(installed_apps):
+    """
+    Returns INSTALLED_APPS without the debug apps.
+
+    >>> production_apps(("cms", "debug_toolbar", "django_processinfo", "pylucid"))
+    ('cms', 'pylucid')
+    """
+    return tuple([app for app in installed_apps if app not in DEBUG_APPS])
+
+
+def production_middleware(middleware):
+    """
+    Returns a minimal MIDDLEWARE chain without the debug and deprecated middlewares.
+
+    >>> production_middleware((
+    ...     "django_processinfo.middlewares.ProcessInfoMiddleware",
+    ...     "django.contrib.sessions.middleware.SessionMiddleware",
+    ...     "django.contrib.auth.middleware.SessionAuthenticationMiddleware",
+    ... ))
+    ('django.contrib.sessions.middleware.SessionMiddleware',)
+    """
+    unwanted = DEBUG_MIDDLEWARE + DEPRECATED_MIDDLEWARE
+    return tuple([entry for entry in middleware if entry not in unwanted])
+
+
+def add_middleware_timing(middleware):
+    """
+    Insert a timing marker before every middleware and before the view.
+    The marker position is part of the middleware path.
+    Existing markers will be replaced.
+    see: pylucid.middlewares.timing
+
+    >>> add_middleware_timing(("foo.Bar",))
+    ('pylucid.middlewares.timing.marker:0', 'foo.Bar', 'pylucid.middlewares.timing.marker:1')
+    >>> add_middleware_timing(add_middleware_timing(("foo.Bar",)))
+    ('pylucid.middlewares.timing.marker:0', 'foo.Bar', 'pylucid.middlewares.timing.marker:1')
+    """
+    marker_prefix = "pylucid.middlewares.timing.marker:"
+    middleware = [entry for entry in middleware if not entry.startswith(marker_prefix)]
+    result = []
+    for position, entry in enumerate(middleware):
+        result += ["%s%i" % (marker_prefix, position), entry]
+    result.append("%s%i" % (marker_prefix, len(middleware)))
+    return tuple(result)
+
+
+class LazyModule:
+    """
+    Import the module on first attribute access.
+    Used for settings that are a module, but only needed if the app is installed.
+
+    >>> json = LazyModule("json")
+    >>> json
+    <LazyModule 'json'>
+    >>> json.dumps([1])
+    '[1]'
+    """
+    def __init__(self, module_name):
+        self.__dict__["_module_name"] = module_name
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        if self._module is None:
+            from importlib import import_module
+            self.__dict__["_module"] = import_module(self._module_name)
+        return self._module
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._load(), name, value)
+
+    def __repr__(self):
+        return "<LazyModule %r>" % self._module_name
+
+
+#_____________________________________________________________________________
+# Optional app groups
+
+# Apps that a page instance can leave out, if they are not used:
+OPTIONAL_APP_GROUPS = {
+    "blog": (
+        "aldryn_apphooks_config",
+        "parler",
+        "taggit",
+        "taggit_autosuggest",
+        "meta",
+        "djangocms_blog",
+    ),
+    "filer": (
+        "filer",
+        "easy_thumbnails",
+        "cmsplugin_filer_image",
+        "cmsplugin_filer_link",
+        "django_cms_tools.filer_tools",
+    ),
+    "markup": (
+        "cmsplugin_markup",
+    ),
+    "pygments": (
+        "cmsplugin_pygments",
+    ),
+}
+
+APP_GROUP_DEPENDENCIES = {
+    "blog": ("filer",),
+}
+
+
+def select_app_groups(installed_apps, groups):
+    """
+    Returns INSTALLED_APPS with only the given optional app groups,
+    see: OPTIONAL_APP_GROUPS
+
+    >>> apps = ("cms", "cmsplugin_markup", "cmsplugin_pygments", "filer", "djangocms_blog", "pylucid")
+    >>> select_app_groups(apps, groups=("markup",))
+    ('cms', 'cmsplugin_markup', 'pylucid')
+    >>> select_app_groups(apps, groups=("blog",))
+    ('cms', 'filer', 'djangocms_blog', 'pylucid')
+    >>> select_app_groups(apps, groups=("foobar",))
+    Traceback (most recent call last):
+        ...
+    AssertionError: Unknown app group 'foobar'
+    """
+    groups = set(groups)
+    for group in list(groups):
+        assert group in OPTIONAL_APP_GROUPS, "Unknown app group %r" % group
+        groups.update(APP_GROUP_DEPENDENCIES.get(group, ()))
+
+    unwanted = set()
+    for group, apps in OPTIONAL_APP_GROUPS.items():
+        if group not in groups:
+            unwanted.update(apps)
+
+    return tuple([app for app in installed_apps if app not in unwanted])
+
+
+#_____________________________________________________________________________
+# INTERNAL_IPS and ALLOWED_HOSTS
+
+_EXACT = 0 # domain trie flags, can't collide with a label
+_SUBDOMAINS = 1
+
+
+def _wildcard_ipv4_network(pattern):
+    """
+    Returns the network of a IPv4 pattern with trailing wildcards or None.
+
+    >>> _wildcard_ipv4_network("192.168.*.*")
+    '192.168.0.0/16'
+    >>> _wildcard_ipv4_network("10.*")
+    '10.0.0.0/8'
+    >>> _wildcard_ipv4_network("10.*.0.1") is None
+    True
+    """
+    parts = pattern.split(".")
+    if len(parts) > 4 or "*" not in parts:
+        return None
+    prefix_len = parts.index("*")
+    prefix, rest = parts[:prefix_len], parts[prefix_len:]
+    if any(part != "*" for part in rest):
+        return None
+    if not all(part.isdigit() and int(part) <= 255 for part in prefix):
+        return None
+    return "%s/%i" % (".".join(prefix + ["0"] * (4 - prefix_len)), prefix_len * 8)
+
+
+class _MatcherEntry(str):
+    """
+    The only list item of HostMatcher.
+    django.http.request.validate_host() compares every ALLOWED_HOSTS
+    item via: pattern == '*' or pattern.lower() == host
+    """
+    def __new__(cls, matcher):
+        entry = super().__new__(cls, "<%s>" % ", ".join(matcher.patterns))
+        entry.matcher = matcher
+        return entry
+
+    def __eq__(self, other):
+        return isinstance(other, str) and self.matcher.match(other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = str.__hash__
+
+    def lower(self):
+        return self
+
+
+class HostMatcher(list):
+    """
+    Drop-in replacement for django_tools.settings_utils.FnMatchIps
+    for settings.INTERNAL_IPS and settings.ALLOWED_HOSTS
+
+    The patterns are compiled once:
+
+        * IPs, CIDR networks and IPv4 patterns with trailing wildcards
+          (e.g.: "192.168.*.*") -> sorted integer ranges (binary search)
+        * host names, "*.example.tld" and ".example.tld" (domain and
+          subdomains, like django) -> trie of the reversed domain labels
+        * all other wildcard patterns -> one regular expression
+
+    The last results are memoized.
+
+    >>> hosts = HostMatcher(["localhost", "127.0.0.1", "::1", "10.0.*.*", "172.16.0.0/12", "*.example.tld", ".foo.tld", "www?.bar.tld"])
+    >>> "10.0.1.2" in hosts, "10.1.0.1" in hosts, "172.31.255.255" in hosts, "172.32.0.1" in hosts
+    (True, False, True, False)
+    >>> "::1" in hosts, "[::1]" in hosts, "::2" in hosts, "LocalHost" in hosts
+    (True, True, False, True)
+    >>> "www.example.tld" in hosts, "a.b.example.tld" in hosts, "example.tld" in hosts
+    (True, True, False)
+    >>> "foo.tld" in hosts, "www.foo.tld" in hosts, "www1.bar.tld" in hosts, "www12.bar.tld" in hosts
+    (True, True, True, False)
+
+    django.http.request.validate_host() iterates over ALLOWED_HOSTS:
+
+    >>> from django.http.request import validate_host
+    >>> validate_host("www.example.tld", hosts), validate_host("evil.tld", hosts)
+    (True, False)
+    >>> validate_host("evil.tld", list(hosts) + ["evil.tld"])
+    True
+    >>> "evil.tld" in HostMatcher(["*"])
+    True
+    """
+    def __init__(self, patterns, cache_size=1024):
+        # PyLucid
+        from pylucid.utils import LRUCache
+
+        self.patterns = tuple(patterns)
+        self._cache = LRUCache(maxsize=cache_size)
+        self._compile()
+        super().__init__([_MatcherEntry(self)])
+
+    def _compile(self):
+        import fnmatch
+        import ipaddress
+        import re
+
+        self._match_all = False
+        self._hosts = set()
+        self._domains = {}
+        networks = {4: [], 6: []}
+        regexes = []
+        for pattern in self.patterns:
+            pattern = pattern.lower()
+            if pattern == "*":
+                self._match_all = True
+                continue
+
+            network = _wildcard_ipv4_network(pattern) or pattern.strip("[]")
+            try:
+                network = ipaddress.ip_network(network, strict=False)
+            except ValueError:
+                pass
+            else:
+                networks[network.version].append(network)
+                continue
+
+            if pattern.startswith("."):
+                # django style: domain and subdomains
+                self._add_domain(pattern[1:], _EXACT)
+                self._add_domain(pattern[1:], _SUBDOMAINS)
+            elif pattern.startswith("*.") and not any(char in pattern[2:] for char in "*?["):
+                self._add_domain(pattern[2:], _SUBDOMAINS)
+            elif any(char in pattern for char in "*?["):
+                regexes.append(fnmatch.translate(pattern))
+            else:
+                self._hosts.add(pattern)
+
+        self._ranges = {}
+        for version, version_networks in networks.items():
+            collapsed = list(ipaddress.collapse_addresses(version_networks))
+            self._ranges[version] = (
+                [int(network.network_address) for network in collapsed],
+                [int(network.broadcast_address) for network in collapsed],
+            )
+
+        self._regex = re.compile("|".join(regexes)) if regexes else None
+
+    def _add_domain(self, domain, flag):
+        node = self._domains
+        for label in reversed(domain.split(".")):
+            node = node.setdefault(label, {})
+        node[flag] = True
+
+    def _match_domain(self, host):
+        node = self._domains
+        for label in reversed(host.split(".")):
+            if _SUBDOMAINS in node:
+                return True
+            node = node.get(label)
+            if node is None:
+                return False
+        return _EXACT in node
+
+    def _match_ip(self, host):
+        import bisect
+        import ipaddress
+
+        try:
+            ip = ipaddress.ip_address(host.strip("[]"))
+        except ValueError:
+            return False
+
+        starts, ends = self._ranges[ip.version]
+        value = int(ip)
+        index = bisect.bisect_right(starts, value) - 1
+        return index >= 0 and value <= ends[index]
+
+    def _match(self, host):
+        if self._match_all:
+            return True
+        if host in self._hosts or self._match_domain(host) or self._match_ip(host):
+            return True
+        return self._regex is not None and self._regex.match(host) is not None
+
+    def match(self, host):
+        host = host.lower()
+        result = self._cache.get(host)
+        if result is None:
+            result = self._match(host)
+            self._cache.set(host, result)
+        return result
+
+    def __contains__(self, host):
+        # INTERNAL_IPS checks via: "<ip> in INTERNAL_IPS"
+        return isinstance(host, str) and self.match(host)
+
+    def __repr__(self):
+        return "HostMatcher(%r)" % (list(self.patterns),)
@@ -0,0 +1,43 @@
+# coding: utf-8
+
+"""
+    PyLucid signal receivers
+    ~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Connected in pylucid.apps.PyLucidConfig.ready()
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import logging
+
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from cms.models import Page
+from cms.signals import page_moved, post_publish, post_unpublish
+
+# PyLucid
+from pylucid import menu, page_cache
+
+
+log = logging.getLogger(__name__)
+
+
+@receiver(post_publish, sender=Page)
+@receiver(post_unpublish, sender=Page)
+def page_published(sender, instance, language, **kwargs):
+    # The menus of all pages may show the changed title:
+    log.debug("Page %r (%s) (un-)published", instance.pk, language)
+    page_cache.invalidate_site(instance.site_id)
+    menu.invalidate_site(instance.site_id)
+
+
+@receiver(page_moved, sender=Page)
+@receiver(post_delete, sender=Page)
+def page_tree_changed(sender, instance, **kwargs):
+    # The old position in the tree is unknown, so the menus of all pages may be changed:
+    log.debug("Page tree of site %r changed", instance.site_id)
+    page_cache.invalidate_site(instance.site_id)
+    menu.invalidate_site(instance.site_id)
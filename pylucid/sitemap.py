@@ -0,0 +1,279 @@
+# coding: utf-8
+
+r"""
+    PyLucid sitemap files
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    django.contrib.sitemaps builds the complete page list on every
+    request. This creates a sitemap index and sitemap files as static
+    files with '.gz' and '.br' siblings, e.g. for nginx:
+
+        location ~ ^/sitemap(-\d+)?\.xml$ {
+            root /path/to/media/sitemaps/1/;
+            gzip_static on;
+            brotli_static on;
+            try_files $uri @django;
+        }
+
+    The pages are split into chunks by primary key:
+
+        chunk number = page pk // settings.PYLUCID_SITEMAP_CHUNK_SIZE
+
+    So new pages never move existing pages into a other chunk.
+    A fingerprint of every chunk is stored in a manifest file.
+    Only chunks with new, deleted, moved or changed pages
+    (publish/changed timestamps) will be written again.
+
+    Create/update the files, e.g. via cron:
+
+        ./manage.py pylucid_sitemap
+
+    The files are served via pylucid.sitemap_views
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict, namedtuple
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import Q
+from django.urls import reverse
+
+from cms.models import Page, Title
+from cms.utils.i18n import force_language, get_public_languages
+
+# PyLucid
+from pylucid.compress import write_precompressed
+from pylucid.static_export import atomic_write
+
+
+log = logging.getLogger(__name__)
+
+
+INDEX_NAME = "sitemap.xml"
+CHUNK_NAME = "sitemap-%i.xml"
+MANIFEST_NAME = "pylucid_sitemap.json"
+COMPRESSED_SUFFIXES = (".gz", ".br") # see: pylucid.compress.write_precompressed()
+
+# see: https://www.sitemaps.org/protocol.html
+MAX_URLS = 50000
+XML_NAMESPACE = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+SitemapEntry = namedtuple("SitemapEntry", "page_id language path is_home lastmod")
+SitemapResult = namedtuple("SitemapResult", "written unchanged removed url_count duration")
+
+
+def get_sitemap_root(site):
+    sitemap_root = getattr(settings, "PYLUCID_SITEMAP_ROOT", None)
+    if sitemap_root is None:
+        sitemap_root = Path(settings.MEDIA_ROOT, "sitemaps")
+    return Path(sitemap_root, str(site.pk))
+
+
+def get_base_url(site):
+    return "%s://%s" % (getattr(settings, "PYLUCID_SITEMAP_PROTOCOL", "https"), site.domain)
+
+
+def get_sitemap_entries(site):
+    """
+    Returns a list of SitemapEntry() for all published pages in all public languages.
+    Same filter as cms.sitemaps.CMSSitemap, but only one query.
+    """
+    languages = get_public_languages(site_id=site.pk)
+    pages = Page.objects.public().published(site=site).filter(login_required=False)
+    titles = Title.objects.public().filter(
+        Q(redirect='') | Q(redirect__isnull=True),
+        page__in=pages,
+        language__in=languages,
+        published=True,
+    ).values_list(
+        "page_id", "language", "path", "page__is_home", "page__changed_date", "page__publication_date"
+    ).order_by("page_id", "language")
+
+    entries = []
+    for page_id, language, path, is_home, changed_date, publication_date in titles:
+        lastmod = max(date for date in (changed_date, publication_date) if date is not None)
+        entries.append(SitemapEntry(page_id, language, path, is_home, lastmod.isoformat()))
+    return entries
+
+
+def get_location(entry):
+    """
+    Same as cms.models.Page.get_absolute_url() without a query for the title.
+    """
+    with force_language(entry.language):
+        if entry.is_home:
+            return reverse("pages-root")
+        return reverse("pages-details-by-slug", kwargs={"slug": entry.path})
+
+
+def split_chunks(entries, chunk_size):
+    """
+    >>> entries = [SitemapEntry(pk, "en", "", False, "") for pk in (1, 2, 5, 11)]
+    >>> chunks = split_chunks(entries, chunk_size=5)
+    >>> [(chunk_no, [entry.page_id for entry in entries]) for chunk_no, entries in chunks.items()]
+    [(0, [1, 2]), (1, [5]), (2, [11])]
+    """
+    chunks = OrderedDict()
+    for entry in sorted(entries):
+        chunks.setdefault(entry.page_id // chunk_size, []).append(entry)
+    return chunks
+
+
+def get_fingerprint(entries):
+    """
+    >>> entry = SitemapEntry(1, "en", "foo", False, "2019-01-01T00:00:00+00:00")
+    >>> get_fingerprint([entry]) == get_fingerprint([entry])
+    True
+    >>> get_fingerprint([entry]) == get_fingerprint([entry._replace(path="bar")])
+    False
+    """
+    return hashlib.sha1(json.dumps(entries).encode("utf-8")).hexdigest()
+
+
+def render_chunk(entries, base_url):
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<urlset xmlns="%s">' % XML_NAMESPACE]
+    for entry in entries:
+        lines.append("<url><loc>%s%s</loc><lastmod>%s</lastmod></url>" % (
+            escape(base_url), escape(get_location(entry)), entry.lastmod
+        ))
+    lines.append("</urlset>")
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def render_index(chunks, base_url):
+    """
+    >>> print(render_index({0: {"lastmod": "2019-01-01T00:00:00+00:00"}}, base_url="https://example.tld").decode("utf-8"))
+    <?xml version="1.0" encoding="UTF-8"?>
+    <sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+    <sitemap><loc>https://example.tld/sitemap-0.xml</loc><lastmod>2019-01-01T00:00:00+00:00</lastmod></sitemap>
+    </sitemapindex>
+    <BLANKLINE>
+    """
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<sitemapindex xmlns="%s">' % XML_NAMESPACE]
+    for chunk_no in sorted(chunks, key=int):
+        lines.append("<sitemap><loc>%s/%s</loc><lastmod>%s</lastmod></sitemap>" % (
+            escape(base_url), CHUNK_NAME % int(chunk_no), chunks[chunk_no]["lastmod"]
+        ))
+    lines.append("</sitemapindex>")
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def write_sitemap_file(file_path, content):
+    """
+    Write the file and the precompressed siblings.
+    All files are renamed into place, so the web server never serves a partially written file.
+    Old siblings that are not created again (e.g.: 'brotli' uninstalled) are removed,
+    so the web server never serves a outdated precompressed file.
+    """
+    temp_path = file_path.with_name(".%s.%s.tmp" % (file_path.name, os.getpid()))
+    atomic_write(temp_path, content)
+    suffixes = set()
+    for compressed_path in write_precompressed(temp_path):
+        suffix = compressed_path.name[len(temp_path.name):] # e.g.: ".gz"
+        os.replace(str(compressed_path), "%s%s" % (file_path, suffix))
+        suffixes.add(suffix)
+    remove_files(Path("%s%s" % (file_path, suffix)) for suffix in COMPRESSED_SUFFIXES if suffix not in suffixes)
+    os.replace(str(temp_path), str(file_path))
+
+
+def remove_files(paths):
+    for path in paths:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def remove_sitemap_file(file_path):
+    remove_files([file_path] + [Path("%s%s" % (file_path, suffix)) for suffix in COMPRESSED_SUFFIXES])
+
+
+def load_manifest(sitemap_root):
+    try:
+        with Path(sitemap_root, MANIFEST_NAME).open("r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"base_url": None, "chunk_size": None, "chunks": {}}
+
+
+def save_manifest(sitemap_root, manifest):
+    content = json.dumps(manifest, indent=4, sort_keys=True).encode("utf-8")
+    atomic_write(Path(sitemap_root, MANIFEST_NAME), content)
+
+
+def update_sitemap(site, entries=None, force=False):
+    """
+    Write the changed sitemap chunks and the sitemap index.
+    Returns a SitemapResult()
+
+    A chunk will be written if:
+     * a page in the chunk is new, deleted, moved or changed
+     * the file doesn't exist
+     * base url or chunk size are changed
+     * 'force' is True
+    """
+    start_time = time.time()
+
+    if entries is None:
+        entries = get_sitemap_entries(site)
+
+    sitemap_root = get_sitemap_root(site)
+    base_url = get_base_url(site)
+    chunk_size = getattr(settings, "PYLUCID_SITEMAP_CHUNK_SIZE", 5000)
+
+    manifest = load_manifest(sitemap_root)
+    if manifest["base_url"] != base_url or manifest["chunk_size"] != chunk_size:
+        log.info("Base url or chunk size changed: write all sitemap files.")
+        force = True
+
+    old_chunks = manifest["chunks"]
+    new_chunks = {}
+    written = []
+    unchanged = 0
+    for chunk_no, chunk_entries in split_chunks(entries, chunk_size).items():
+        if len(chunk_entries) > MAX_URLS:
+            log.error("Sitemap chunk %i contains %i URLs (max. %i): Please decrease PYLUCID_SITEMAP_CHUNK_SIZE",
+                chunk_no, len(chunk_entries), MAX_URLS
+            )
+
+        key = str(chunk_no) # JSON keys are strings
+        file_path = Path(sitemap_root, CHUNK_NAME % chunk_no)
+        new_chunks[key] = {
+            "fingerprint": get_fingerprint(chunk_entries),
+            "lastmod": max(entry.lastmod for entry in chunk_entries),
+            "urls": len(chunk_entries),
+        }
+        if not force and old_chunks.get(key) == new_chunks[key] and file_path.is_file():
+            unchanged += 1
+            continue
+
+        log.debug("Write %s with %i URLs", file_path, len(chunk_entries))
+        write_sitemap_file(file_path, render_chunk(chunk_entries, base_url))
+        written.append(chunk_no)
+
+    removed = sorted(int(key) for key in old_chunks if key not in new_chunks)
+    for chunk_no in removed:
+        remove_sitemap_file(Path(sitemap_root, CHUNK_NAME % chunk_no))
+
+    index_path = Path(sitemap_root, INDEX_NAME)
+    if written or removed or not index_path.is_file():
+        write_sitemap_file(index_path, render_index(new_chunks, base_url))
+
+    save_manifest(sitemap_root, {"base_url": base_url, "chunk_size": chunk_size, "chunks": new_chunks})
+
+    return SitemapResult(
+        written=written,
+        unchanged=unchanged,
+        removed=removed,
+        url_count=len(entries),
+        duration=time.time() - start_time,
+    )
@@ -0,0 +1,130 @@
+# coding: utf-8
+
+"""
+    PyLucid sitemap views
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    Serve the files created by './manage.py pylucid_sitemap'
+    (see: pylucid.sitemap) with the precompressed siblings.
+    Better: Let the web server serve these files directly.
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import collections
+import logging
+from pathlib import Path
+
+from django.contrib.sites.shortcuts import get_current_site
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+# PyLucid
+from pylucid.sitemap import CHUNK_NAME, INDEX_NAME, get_sitemap_root
+
+
+log = logging.getLogger(__name__)
+
+
+# Accept-Encoding -> file suffix, in order of preference
+ENCODINGS = (
+    ("br", ".br"),
+    ("gzip", ".gz"),
+)
+
+
+def parse_accept_encoding(accept_encoding):
+    """
+    Returns the q-values of a Accept-Encoding header.
+    Invalid q-values are handled as q=0
+
+    >>> parse_accept_encoding("gzip;q=0, BR , *;q=0.5, deflate;q=foo")
+    {'gzip': 0.0, 'br': 1.0, '*': 0.5, 'deflate': 0.0}
+    >>> parse_accept_encoding("")
+    {}
+    """
+    qvalues = {}
+    for part in accept_encoding.split(","):
+        coding, *params = [item.strip() for item in part.split(";")]
+        if not coding:
+            continue
+        qvalue = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    qvalue = float(value)
+                except ValueError:
+                    qvalue = 0.0
+        qvalues[coding.lower()] = qvalue
+    return qvalues
+
+
+def choose_encoding(accept_encoding, encodings):
+    """
+    Returns the encoding with the highest q-value > 0 or None.
+    The order of 'encodings' decides between equal q-values.
+
+    >>> choose_encoding("gzip, br", ("br", "gzip"))
+    'br'
+    >>> choose_encoding("gzip;q=1.0, br;q=0.5", ("br", "gzip"))
+    'gzip'
+    >>> choose_encoding("br;q=0, gzip;q=0", ("br", "gzip")) is None
+    True
+    >>> choose_encoding("*", ("br", "gzip"))
+    'br'
+    >>> choose_encoding("identity, *;q=0", ("br", "gzip")) is None
+    True
+    >>> choose_encoding("x-gzip", ("gzip",)) is None
+    True
+    """
+    qvalues = parse_accept_encoding(accept_encoding)
+    default_qvalue = qvalues.get("*", 0.0)
+
+    best_encoding, best_qvalue = None, 0.0
+    for encoding in encodings:
+        qvalue = qvalues.get(encoding, default_qvalue)
+        if qvalue > best_qvalue:
+            best_encoding, best_qvalue = encoding, qvalue
+    return best_encoding
+
+
+def serve_sitemap_file(request, file_name):
+    file_path = Path(get_sitemap_root(get_current_site(request)), file_name)
+    try:
+        stat = file_path.stat()
+    except FileNotFoundError:
+        log.error("Sitemap file '%s' not found. Please run: './manage.py pylucid_sitemap'", file_path)
+        raise Http404("Sitemap not found")
+
+    if not was_modified_since(request.META.get("HTTP_IF_MODIFIED_SINCE"), stat.st_mtime, stat.st_size):
+        return HttpResponseNotModified()
+
+    compressed_paths = collections.OrderedDict()
+    for encoding, suffix in ENCODINGS:
+        compressed_path = Path("%s%s" % (file_path, suffix))
+        if compressed_path.is_file():
+            compressed_paths[encoding] = compressed_path
+
+    content_encoding = choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""), compressed_paths)
+    if content_encoding is not None:
+        file_path = compressed_paths[content_encoding]
+
+    response = FileResponse(file_path.open("rb"), content_type="application/xml; charset=utf-8")
+    response["Content-Length"] = file_path.stat().st_size
+    response["Last-Modified"] = http_date(stat.st_mtime)
+    if content_encoding is not None:
+        response["Content-Encoding"] = content_encoding
+    patch_vary_headers(response, ("Accept-Encoding",))
+    return response
+
+
+def sitemap_index(request):
+    return serve_sitemap_file(request, INDEX_NAME)
+
+
+def sitemap_chunk(request, chunk_no):
+    return serve_sitemap_file(request, CHUNK_NAME % int(chunk_no))
@@ -0,0 +1,233 @@
+# coding: utf-8
+
+"""
+    PyLucid static export
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    Render published CMS pages into static HTML files.
+    A web server can serve these files directly and use the
+    django app as fallback, e.g. nginx:
+
+        location / {
+            root /path/to/export/;
+            try_files $uri $uri/index.html @django;
+        }
+
+    Used in pylucid.management.commands.export_static_pages
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import time
+from collections import namedtuple
+from pathlib import Path
+
+from django.db import connections
+from django.test import Client
+
+from cms.models import Page, Title
+from cms.utils.i18n import get_public_languages
+
+
+log = logging.getLogger(__name__)
+
+
+MANIFEST_NAME = "pylucid_export.json"
+
+ExportJob = namedtuple("ExportJob", "key language page_id url changed")
+ExportResult = namedtuple("ExportResult", "job status_code duration")
+
+
+def get_export_jobs(site):
+    """
+    Returns a list of ExportJob() for all published pages in all public languages.
+    """
+    jobs = []
+    languages = get_public_languages(site_id=site.pk)
+    pages = Page.objects.public().published(site=site).order_by("path")
+    for page in pages:
+        if page.login_required:
+            continue
+
+        for language in languages:
+            if not page.is_published(language):
+                continue
+
+            jobs.append(ExportJob(
+                key="%s:%s" % (language, page.pk),
+                language=language,
+                page_id=page.pk,
+                url=page.get_absolute_url(language=language),
+                changed=page.changed_date.isoformat(),
+            ))
+    return jobs
+
+
+def get_tree_fingerprint(site):
+    """
+    A hash over the page tree and the titles, used to detect changes that
+    affects the menus and links of all pages.
+    e.g.: page created, deleted, moved, renamed or changed visibility in navigation
+    """
+    languages = get_public_languages(site_id=site.pk)
+    pages = Page.objects.public().published(site=site).order_by("path")
+    tree = list(pages.values_list("pk", "path", "in_navigation"))
+    titles = Title.objects.public().filter(
+        page__in=pages, language__in=languages, published=True,
+    ).order_by("page__path", "language").values_list(
+        "page_id", "language", "title", "menu_title", "page_title", "path", "page__is_home"
+    )
+    data = [tree, list(titles)]
+    return hashlib.sha1(json.dumps(data).encode("utf-8")).hexdigest()
+
+
+def get_file_path(output_path, url):
+    """
+    >>> get_file_path(Path("/foo/"), "/en/bar/")
+    PosixPath('/foo/en/bar/index.html')
+    """
+    return Path(output_path, url.strip("/"), "index.html")
+
+
+def atomic_write(file_path, content):
+    """
+    Write into a temp file and rename it, so the web server never serves a partially written file.
+    """
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = file_path.with_name(".%s.%s.tmp" % (file_path.name, os.getpid()))
+    with temp_path.open("wb") as f:
+        f.write(content)
+    os.replace(str(temp_path), str(file_path))
+
+
+def load_manifest(output_path):
+    manifest_path = Path(output_path, MANIFEST_NAME)
+    try:
+        with manifest_path.open("r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"fingerprint": None, "pages": {}}
+
+
+def save_manifest(output_path, manifest):
+    content = json.dumps(manifest, indent=4, sort_keys=True).encode("utf-8")
+    atomic_write(Path(output_path, MANIFEST_NAME), content)
+
+
+_worker = {}
+
+
+def _init_worker(output_path, host):
+    _worker["output_path"] = output_path
+    _worker["client"] = Client(HTTP_HOST=host)
+
+
+def _render_page(job):
+    start_time = time.time()
+    try:
+        # The test client raises the exceptions of the view
+        response = _worker["client"].get(job.url)
+        status_code = response.status_code
+        if status_code == 200:
+            atomic_write(get_file_path(_worker["output_path"], job.url), response.content)
+    except Exception as err:
+        log.exception("Render %r failed: %s", job.url, err)
+        status_code = 500
+    return ExportResult(job, status_code, time.time() - start_time)
+
+
+def remove_file(output_path, file_path):
+    """
+    Remove the file and all directories, that are empty after that.
+    """
+    log.info("Remove '%s'", file_path)
+    try:
+        file_path.unlink()
+    except FileNotFoundError:
+        pass
+
+    for path in file_path.parents:
+        if path == output_path:
+            break
+        try:
+            path.rmdir()
+        except OSError: # e.g.: not empty
+            break
+
+
+def select_jobs(jobs, old_pages, force=False):
+    """
+    Returns the jobs of new or changed pages, or all jobs if 'force' is True.
+
+    >>> job = ExportJob("en:1", "en", 1, "/en/", "2019-01-01")
+    >>> old_pages = {"en:1": job._asdict()}
+    >>> select_jobs([job], old_pages)
+    []
+    >>> select_jobs([job], old_pages, force=True) == [job]
+    True
+    >>> select_jobs([job._replace(changed="2019-02-01")], old_pages)
+    [ExportJob(key='en:1', language='en', page_id=1, url='/en/', changed='2019-02-01')]
+    """
+    if force:
+        return list(jobs)
+    return [job for job in jobs if old_pages.get(job.key) != job._asdict()]
+
+
+def export_pages(site, output_path, host, processes=None, force=False):
+    """
+    Render all changed pages in parallel worker processes.
+    Yields a ExportResult() for every rendered page.
+
+    A page will be rendered if:
+     * it's new or it's 'changed_date' is newer than in the last export
+     * the page tree was changed since the last export
+     * it was not rendered successfully in the last export
+     * 'force' is True
+    """
+    output_path = Path(output_path)
+    manifest = load_manifest(output_path)
+
+    fingerprint = get_tree_fingerprint(site)
+    if fingerprint != manifest["fingerprint"]:
+        log.info("Page tree changed: export all pages.")
+        force = True
+
+    jobs = get_export_jobs(site)
+    old_pages = manifest["pages"]
+    new_pages = dict([(job.key, job._asdict()) for job in jobs])
+
+    # Remove files from deleted, unpublished or renamed pages:
+    for key, old_page in old_pages.items():
+        if key in new_pages and new_pages[key]["url"] == old_page["url"]:
+            continue
+        remove_file(output_path, get_file_path(output_path, old_page["url"]))
+
+    jobs = select_jobs(jobs, old_pages, force)
+
+    # Only the successfully rendered pages will be stored in the manifest.
+    # So all other pages will be rendered again on the next export,
+    # also if the export is aborted.
+    selected_keys = set(job.key for job in jobs)
+    done_pages = dict([(key, page) for key, page in new_pages.items() if key not in selected_keys])
+    try:
+        if jobs:
+            # Each worker process must open his own database connection:
+            connections.close_all()
+
+            pool = multiprocessing.Pool(processes=processes, initializer=_init_worker, initargs=(output_path, host))
+            try:
+                for result in pool.imap_unordered(_render_page, jobs):
+                    if result.status_code == 200:
+                        done_pages[result.job.key] = new_pages[result.job.key]
+                    yield result
+            finally:
+                pool.close()
+                pool.join()
+    finally:
+        save_manifest(output_path, {"fingerprint": fingerprint, "pages": done_pages})
@@ -0,0 +1,140 @@
+# coding: utf-8
+
+"""
+    PyLucid template compile
+    ~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Compile all templates that are reachable from settings.CMS_TEMPLATES
+    (following {% extends %}, {% include %} and template names in other
+    template tags) into the cached template loader.
+
+    Used in:
+        * ./manage.py pylucid_compile_templates
+        * pylucid.warmup on WSGI startup
+
+    Templates with a variable name, e.g.: {% include foo %}
+    can't be found and will be compiled on first usage.
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import collections
+import logging
+import time
+
+from django.conf import settings
+from django.template import TemplateDoesNotExist, TemplateSyntaxError
+from django.template.base import FilterExpression, Node
+from django.template.loader import get_template
+from django.template.loader_tags import ExtendsNode, IncludeNode
+
+
+log = logging.getLogger(__name__)
+
+
+CompileResult = collections.namedtuple("CompileResult", "name, duration, error, used_by")
+
+
+def get_cms_template_names():
+    return [template_name for template_name, verbose_name in settings.CMS_TEMPLATES]
+
+
+def _iter_constants(value):
+    if isinstance(value, FilterExpression):
+        if not value.filters:
+            yield value.var
+    elif isinstance(value, str):
+        yield value
+    elif hasattr(value, "literal"):
+        # e.g.: classytags.utils.TemplateConstant
+        yield value.literal
+
+
+def _iter_attribute_constants(node):
+    for value in vars(node).values():
+        if isinstance(value, dict):
+            values = value.values()
+        elif isinstance(value, (list, tuple)):
+            values = value
+        else:
+            values = (value,)
+        for value in values:
+            yield from _iter_constants(value)
+
+
+def get_referenced_names(template):
+    """
+    Returns the constant template names as tuple (name, required).
+
+    'required' is True for {% extends %} and {% include %}. Other
+    template tags are searched for constant '.html' arguments,
+    e.g.: {% show_menu 0 100 0 100 "menu/custom.html" %}
+    These are optional, because the argument may not be a template name.
+
+    >>> from django.template import Engine
+    >>> template = Engine().from_string(
+    ...     '{% extends "base.html" %}{% block x %}'
+    ...     '{% include "a.html" %}{% include foo %}{% include "b.html"|lower %}'
+    ...     '{% cycle "c.html" "no template" %}'
+    ...     '{% endblock %}'
+    ... )
+    >>> get_referenced_names(template)
+    [('base.html', True), ('a.html', True), ('c.html', False)]
+    """
+    names = collections.OrderedDict()
+    for node in template.nodelist.get_nodes_by_type(Node):
+        if isinstance(node, ExtendsNode):
+            for name in _iter_constants(node.parent_name):
+                names[name] = True
+        elif isinstance(node, IncludeNode):
+            for name in _iter_constants(node.template):
+                names[name] = True
+        else:
+            for name in _iter_attribute_constants(node):
+                if isinstance(name, str) and name.endswith(".html"):
+                    names.setdefault(name, False)
+
+    return [(name, required) for name, required in names.items() if isinstance(name, str)]
+
+
+def compile_templates(template_names=None):
+    """
+    Compile the templates and all referenced templates.
+    Returns a list of CompileResult, every template only once.
+    'error' is None or the TemplateSyntaxError/TemplateDoesNotExist instance.
+    """
+    if template_names is None:
+        template_names = get_cms_template_names()
+
+    results = []
+    seen = set(template_names)
+    queue = collections.deque([(name, None, True) for name in template_names])
+    while queue:
+        name, used_by, required = queue.popleft()
+
+        start_time = time.time()
+        try:
+            backend_template = get_template(name)
+        except TemplateDoesNotExist as err:
+            if required:
+                results.append(CompileResult(name, time.time() - start_time, err, used_by))
+            else:
+                log.debug("Skip %r from %r: %s", name, used_by, err)
+            continue
+        except TemplateSyntaxError as err:
+            results.append(CompileResult(name, time.time() - start_time, err, used_by))
+            continue
+        results.append(CompileResult(name, time.time() - start_time, None, used_by))
+
+        # The django backend wraps django.template.base.Template:
+        template = getattr(backend_template, "template", None)
+        if template is None:
+            continue
+
+        for referenced_name, referenced_required in get_referenced_names(template):
+            if referenced_name not in seen:
+                seen.add(referenced_name)
+                queue.append((referenced_name, name, referenced_required))
+
+    return results
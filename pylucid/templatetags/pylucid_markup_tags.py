@@ -0,0 +1,42 @@
+# coding: utf-8
+
+"""
+    PyLucid markup template tags
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Replacement for '{% rendermarkup %}' from cmsplugin_markup
+    that used the render cache from pylucid.markup_cache
+
+    If debug is off, a render error is logged and a error marker
+    is shown instead of the plugin content.
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import logging
+
+from django.template import Library
+from django.utils.html import format_html
+
+
+log = logging.getLogger(__name__)
+
+register = Library()
+
+
+@register.simple_tag(takes_context=True)
+def pylucid_rendermarkup(context):
+    # Import here: All template tag libraries are imported on startup,
+    # but 'cmsplugin_markup' is optional, see: settings_utils.select_app_groups()
+    from pylucid.markup_cache import render_plugin
+
+    try:
+        return render_plugin(context["object"], context)
+    except Exception as err:
+        if context.template is not None and context.template.engine.debug:
+            raise
+        log.exception("Can't render markup: %s", err)
+        return format_html(
+            '<div class="alert alert-danger pylucid-markup-error">Markup error: {}</div>', err.__class__.__name__
+        )
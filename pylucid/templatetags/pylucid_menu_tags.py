@@ -0,0 +1,71 @@
+# coding: utf-8
+
+"""
+    PyLucid menu template tags
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    A replacement for django CMS '{% show_menu %}' that used the
+    cached page tree from pylucid.menu and renders the complete menu
+    with one template render call.
+
+    usage, e.g.:
+
+        {% load pylucid_menu_tags %}
+        {# from_level to_level extra_inactive extra_active template show_menu_template #}
+        {% pylucid_menu 0 100 0 1 "pylucid/includes/bootstrap/pylucid_tree_menu.html" "pylucid/includes/bootstrap/tree_menu.html" %}
+
+    The template gets a flat list of pylucid.menu.MenuItem instances as 'items'
+
+    Menus from apphooks/navigation extenders (e.g. djangocms_blog)
+    and CMS_PERMISSION are not supported: If a site used them, the menu
+    is rendered with '{% show_menu %}' and the 'show_menu_template',
+    see: pylucid.menu.needs_cms_menu()
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from django.contrib.sites.shortcuts import get_current_site
+from django.template import Context, Library
+
+# PyLucid
+from pylucid.menu import get_menu_items, needs_cms_menu
+
+
+register = Library()
+
+
+SHOW_MENU = (
+    "{% load menu_tags %}"
+    "{% show_menu from_level to_level extra_inactive extra_active template_name %}"
+)
+
+
+def render_show_menu(context, from_level, to_level, extra_inactive, extra_active, template_name):
+    show_menu = context.template.engine.from_string(SHOW_MENU)
+    values = dict(
+        from_level=from_level, to_level=to_level,
+        extra_inactive=extra_inactive, extra_active=extra_active,
+        template_name=template_name,
+    )
+    with context.push(**values):
+        return show_menu.render(context)
+
+
+@register.simple_tag(takes_context=True)
+def pylucid_menu(context, from_level=0, to_level=100, extra_inactive=0, extra_active=1000,
+                 template_name="pylucid/includes/bootstrap/pylucid_tree_menu.html",
+                 show_menu_template="pylucid/includes/bootstrap/tree_menu.html"):
+    request = context["request"]
+    if needs_cms_menu(get_current_site(request).pk):
+        return render_show_menu(context, from_level, to_level, extra_inactive, extra_active, show_menu_template)
+
+    items = get_menu_items(
+        request,
+        from_level=int(from_level),
+        to_level=int(to_level),
+        extra_inactive=int(extra_inactive),
+        extra_active=int(extra_active),
+    )
+    menu_template = context.template.engine.get_template(template_name)
+    return menu_template.render(Context({"items": items, "from_level": int(from_level), "request": request}, autoescape=context.autoescape))
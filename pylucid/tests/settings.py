@@ -19,6 +19,10 @@ DATABASES = {
         'NAME': ":memory:"
     }
 }
+
+# Don't start the background thread of pylucid.request_stats
+PYLUCID_REQUEST_STATS_SAMPLE_RATE = 0
+
 # CACHES['default']= {
 #     'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
 #     'LOCATION': 'default-cache',
@@ -0,0 +1,82 @@
+"""
+    PyLucid
+    ~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import json
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth.models import Group, User
+from django.core import serializers
+from django.test import TestCase
+
+# PyLucid
+from pylucid import json_stream
+from pylucid.bulk_import import BulkImporter
+
+
+class BulkImportTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        group = Group.objects.create(name="group")
+        for no in range(7):
+            user = User.objects.create(username="user%i" % no)
+            user.groups.add(group)
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def export(self, filename, queryset, fmt, compress=False):
+        content = json_stream.serialize(queryset, fmt)
+        file_path = Path(self.temp_dir.name, filename)
+        if compress:
+            file_path.write_bytes(b"".join(json_stream.gzip_stream(content)))
+        else:
+            file_path.write_text("".join(content), encoding="utf-8")
+        return file_path
+
+    def get_data(self):
+        return (
+            json.loads(serializers.serialize("json", Group.objects.order_by("pk"))),
+            json.loads(serializers.serialize("json", User.objects.order_by("pk"))),
+        )
+
+    def assert_import(self, group_file, user_file):
+        expected = self.get_data()
+        User.objects.all().delete()
+        Group.objects.all().delete()
+
+        importer = BulkImporter(batch_size=2, transaction_size=3)
+        self.assertEqual(importer.load(json_stream.read_objects(group_file)), 1)
+        self.assertEqual(importer.load(json_stream.read_objects(user_file)), 7)
+        importer.finish()
+
+        self.assertEqual(self.get_data(), expected)
+        self.assertEqual(Group.objects.get().user_set.count(), 7)
+
+    def test_json(self):
+        self.assert_import(
+            self.export("groups.json", Group.objects.all(), json_stream.FORMAT_JSON),
+            self.export("users.json", User.objects.all(), json_stream.FORMAT_JSON),
+        )
+
+    def test_jsonl_gzip(self):
+        self.assert_import(
+            self.export("groups.jsonl.gz", Group.objects.all(), json_stream.FORMAT_JSONL, compress=True),
+            self.export("users.jsonl.gz", User.objects.all(), json_stream.FORMAT_JSONL, compress=True),
+        )
+
+    def test_export_as_json(self):
+        # The output of the 'export_as_json' admin action:
+        file_path = Path(self.temp_dir.name, "users.json")
+        file_path.write_text(serializers.serialize("json", User.objects.all(), indent=4), encoding="utf-8")
+        self.assertEqual(len(list(json_stream.read_objects(file_path))), 7)
+
+    def test_create_after_import(self):
+        self.test_jsonl_gzip()
+        max_pk = User.objects.order_by("-pk").values_list("pk", flat=True)[0]
+        self.assertGreater(User.objects.create(username="new").pk, max_pk)
@@ -0,0 +1,97 @@
+"""
+    PyLucid
+    ~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from django.test import SimpleTestCase
+
+# PyLucid
+from pylucid import settings_utils
+from pylucid.cache_backends import TwoLevelCache
+from pylucid.tests.test_utils.doctest_utils import assert_doctests
+
+
+class TwoLevelCacheTest(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = TwoLevelCache("", {
+            "OPTIONS": {
+                "LOCAL_TIMEOUT": 5,
+                "LOCAL": {
+                    "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                    "LOCATION": "test-local",
+                },
+                "SHARED": {
+                    "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                    "LOCATION": "test-shared",
+                },
+            },
+        })
+        self.cache.clear()
+        self.local = self.cache._local
+        self.shared = self.cache._shared
+
+    def test_set_get(self):
+        self.cache.set("foo", "bar")
+        self.assertEqual(self.local.get("foo"), "bar")
+        self.assertEqual(self.shared.get("foo"), "bar")
+        self.assertEqual(self.cache.get("foo"), "bar")
+
+    def test_read_through(self):
+        self.shared.set("foo", "bar")
+        self.assertIsNone(self.local.get("foo"))
+
+        self.assertEqual(self.cache.get("foo"), "bar")
+        self.assertEqual(self.local.get("foo"), "bar")
+
+    def test_local_hit(self):
+        self.local.set("foo", "local")
+        self.shared.set("foo", "shared")
+        self.assertEqual(self.cache.get("foo"), "local")
+
+    def test_cached_none(self):
+        self.cache.set("foo", None)
+        self.assertIsNone(self.cache.get("foo", default="default"))
+        self.assertEqual(self.cache.get("bar", default="default"), "default")
+
+    def test_local_timeout(self):
+        self.assertEqual(self.cache._get_local_timeout(None), 5)
+        self.assertEqual(self.cache._get_local_timeout(60), 5)
+        self.assertEqual(self.cache._get_local_timeout(1), 1)
+
+    def test_delete(self):
+        self.cache.set("foo", "bar")
+        self.cache.delete("foo")
+        self.assertIsNone(self.local.get("foo"))
+        self.assertIsNone(self.shared.get("foo"))
+
+    def test_many(self):
+        self.cache.set_many({"a": 1, "b": 2})
+        self.local.delete("b")
+        self.shared.set("c", 3)
+
+        self.assertEqual(self.cache.get_many(["a", "b", "c", "d"]), {"a": 1, "b": 2, "c": 3})
+        self.assertEqual(self.local.get_many(["a", "b", "c"]), {"a": 1, "b": 2, "c": 3})
+
+        self.cache.delete_many(["a", "b"])
+        self.assertEqual(self.cache.get_many(["a", "b", "c"]), {"c": 3})
+
+    def test_add(self):
+        self.assertTrue(self.cache.add("foo", 1))
+        self.assertFalse(self.cache.add("foo", 2))
+        self.assertEqual(self.cache.get("foo"), 1)
+
+    def test_incr(self):
+        self.cache.set("counter", 1)
+        self.assertEqual(self.cache.incr("counter"), 2)
+        self.assertIsNone(self.local.get("counter"))
+        self.assertEqual(self.cache.get("counter"), 2)
+        self.assertEqual(self.cache.decr("counter"), 1)
+
+
+class DocTestsTest(SimpleTestCase):
+    def test_doctests(self):
+        assert_doctests(self, settings_utils.build_caches)
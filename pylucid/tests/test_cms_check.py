@@ -9,12 +9,11 @@
 """
 
 
-from pylucid.tests.test_utils.test_cases import PageInstanceTestCase
+from pylucid.tests.test_utils.test_cases import ReusablePageInstanceTestCase
 
 
-class CmsCheckTest(PageInstanceTestCase):
+class CmsCheckTest(ReusablePageInstanceTestCase):
     def test_cms_check(self):
-        self.call_manage_py("migrate", "--noinput")
         output = self.call_manage_py("cms", "check")
         print(output)
 
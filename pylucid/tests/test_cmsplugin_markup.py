@@ -10,7 +10,9 @@
     :license: GNU GPL v3 or above, see LICENSE for more details.
 """
 
-from django.test import TestCase
+from unittest import mock
+
+from django.test import TestCase, override_settings
 
 
 class CMSPluginMarkupTest(TestCase):
@@ -51,3 +53,87 @@ class CMSPluginMarkupTest(TestCase):
     def test_creole(self):
         instance = self.MarkupField.objects.create(body="Creole - äöüß", markup="creole")
         self.assertEqual(instance.body_html, "<p>Creole - äöüß</p>")
+
+
+class MarkupCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Can't be imported normally, see above
+        from cmsplugin_markup.models import MarkupField
+        cls.MarkupField = MarkupField
+
+    def setUp(self):
+        super().setUp()
+        from pylucid import markup_cache
+        self.markup_cache = markup_cache
+        markup_cache.get_cache().clear()
+        markup_cache._local_cache.clear()
+        markup_cache._engine_seen.clear()
+
+    def render(self, instance):
+        context = {}
+        html = self.markup_cache.render_plugin(instance, context)
+        return html, context
+
+    def test_render_cache(self):
+        instance = self.MarkupField.objects.create(body="Creole - äöüß", markup="creole", dynamic=True)
+
+        with mock.patch.object(self.markup_cache, "markup_parser", wraps=self.markup_cache.markup_parser) as parser:
+            self.assertEqual(self.render(instance)[0], "<p>Creole - äöüß</p>")
+            self.assertEqual(self.render(instance)[0], "<p>Creole - äöüß</p>")
+            self.assertEqual(parser.call_count, 1)
+
+            # e.g. another process:
+            self.markup_cache._local_cache.clear()
+            self.assertEqual(self.render(instance)[0], "<p>Creole - äöüß</p>")
+            self.assertEqual(parser.call_count, 1)
+
+            instance.body = "Creole - changed"
+            self.assertEqual(self.render(instance)[0], "<p>Creole - changed</p>")
+            self.assertEqual(parser.call_count, 2)
+
+    def test_trust_mode(self):
+        # Mark the engine as seen, before the plugin was saved:
+        self.markup_cache.get_engine_seen("creole")
+
+        instance = self.MarkupField.objects.create(body="Creole - äöüß", markup="creole", dynamic=True)
+        instance.body_html = "<p>stored html</p>"
+
+        with override_settings(PYLUCID_MARKUP_CACHE_MODE="trust"):
+            self.assertEqual(self.render(instance)[0], "<p>stored html</p>")
+
+            # A updated markup engine was seen after the plugin was saved:
+            self.markup_cache._engine_seen.clear()
+            self.markup_cache.get_cache().clear()
+            self.assertEqual(self.render(instance)[0], "<p>Creole - äöüß</p>")
+
+        self.assertEqual(self.render(instance)[0], "<p>Creole - äöüß</p>")
+
+
+class MarkupTagTest(TestCase):
+    def render(self, debug):
+        from django.template import Context, Engine
+
+        engine = Engine(debug=debug, libraries={"pylucid_markup_tags": "pylucid.templatetags.pylucid_markup_tags"})
+        template = engine.from_string("{% load pylucid_markup_tags %}{% pylucid_rendermarkup %}")
+        with mock.patch("pylucid.markup_cache.render_plugin", side_effect=ValueError("broken markup")):
+            return template.render(Context({"object": None}))
+
+    def test_error_marker(self):
+        with self.assertLogs("pylucid.templatetags.pylucid_markup_tags", level="ERROR") as logs:
+            html = self.render(debug=False)
+        self.assertEqual(html, '<div class="alert alert-danger pylucid-markup-error">Markup error: ValueError</div>')
+        self.assertIn("Can't render markup: broken markup", logs.output[0])
+
+    def test_debug_raise_error(self):
+        with self.assertRaisesMessage(ValueError, "broken markup"):
+            self.render(debug=True)
+
+
+class MarkupCacheDocTestsTest(TestCase):
+    def test_doctests(self):
+        # Can't be imported normally, see above
+        from pylucid import markup_cache
+        from pylucid.tests.test_utils.doctest_utils import assert_doctests
+
+        assert_doctests(self, markup_cache)
@@ -0,0 +1,130 @@
+"""
+    PyLucid
+    ~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import gzip
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.apps import apps
+from django.core import checks
+from django.test import SimpleTestCase, override_settings
+
+# PyLucid
+from pylucid import compress
+from pylucid.checks import check_compress_manifest
+from pylucid.tests.test_utils.doctest_utils import assert_doctests
+
+
+CSS_BLOCK = '<link href="/static/foo.css" rel="stylesheet">'
+
+
+class CompressTestCase(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        temp_dir = tempfile.TemporaryDirectory(prefix="pylucid_compress_")
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_path = Path(temp_dir.name)
+
+        patcher = mock.patch.object(compress, "get_manifest_path", return_value=Path(self.temp_path, "manifest.json"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        compress._manifest = None
+        self.addCleanup(setattr, compress, "_manifest", None)
+
+    def save_manifest(self, templates=None, blocks=None):
+        compress.save_manifest({"templates": templates or {}, "blocks": blocks or {}})
+        compress._manifest = None # force reading the file
+
+
+@mock.patch.object(compress, "compressor_compress", return_value="<online>")
+class SekizaiCompressTest(CompressTestCase):
+    @override_settings(PYLUCID_COMPRESS_OFFLINE=False)
+    def test_online(self, compressor_compress):
+        self.assertEqual(compress.sekizai_compress({}, CSS_BLOCK, "css"), "<online>")
+        compressor_compress.assert_called_once_with({}, CSS_BLOCK, "css")
+
+    def test_collect(self, compressor_compress):
+        compress._collector = {}
+        try:
+            self.assertEqual(compress.sekizai_compress({}, CSS_BLOCK, "css"), "<online>")
+            collected = compress._collector
+        finally:
+            compress._collector = None
+        self.assertEqual(collected, {compress.get_block_key(CSS_BLOCK, "css"): "<online>"})
+
+    @override_settings(PYLUCID_COMPRESS_OFFLINE=True)
+    def test_offline(self, compressor_compress):
+        self.save_manifest(blocks={compress.get_block_key(CSS_BLOCK, "css"): "<offline>"})
+        self.assertEqual(compress.sekizai_compress({}, CSS_BLOCK, "css"), "<offline>")
+        self.assertFalse(compressor_compress.called)
+
+    @override_settings(PYLUCID_COMPRESS_OFFLINE=True)
+    def test_block_not_in_manifest(self, compressor_compress):
+        self.save_manifest()
+        with self.assertLogs("pylucid.compress", level="WARNING") as logs:
+            self.assertEqual(compress.sekizai_compress({}, "<script src='/new.js'></script>", "js"), "<online>")
+        self.assertIn("not in offline manifest", logs.output[0])
+
+    @override_settings(PYLUCID_COMPRESS_OFFLINE=True)
+    def test_without_manifest(self, compressor_compress):
+        with self.assertLogs("pylucid.compress", level="WARNING") as logs:
+            self.assertEqual(compress.sekizai_compress({}, CSS_BLOCK, "css"), "<online>")
+        self.assertIn("pylucid_compress", logs.output[0])
+
+
+@override_settings(CMS_TEMPLATES=(("foo.html", "Foo"), ("bar.html", "Bar")))
+class CompressManifestCheckTest(CompressTestCase):
+    @override_settings(PYLUCID_COMPRESS_OFFLINE=False)
+    def test_offline_disabled(self):
+        self.assertEqual(check_compress_manifest(None), [])
+
+    @override_settings(PYLUCID_COMPRESS_OFFLINE=True)
+    def test_without_manifest(self):
+        messages = check_compress_manifest(None)
+        self.assertEqual([message.id for message in messages], ["pylucid.E001"])
+        self.assertTrue(messages[0].is_serious())
+        self.assertIn("not found", messages[0].msg)
+
+    @override_settings(PYLUCID_COMPRESS_OFFLINE=True)
+    def test_missing_template(self):
+        self.save_manifest(templates={"foo.html": []})
+        messages = check_compress_manifest(None)
+        self.assertEqual([message.id for message in messages], ["pylucid.E001"])
+        self.assertIn("'bar.html'", messages[0].msg)
+
+    @override_settings(PYLUCID_COMPRESS_OFFLINE=True)
+    def test_complete_manifest(self):
+        self.save_manifest(templates={"foo.html": [], "bar.html": []})
+        self.assertEqual(check_compress_manifest(None), [])
+
+    @override_settings(PYLUCID_COMPRESS_OFFLINE=True)
+    def test_startup_without_manifest(self):
+        # Management commands like 'pylucid_compress' must be able to start:
+        apps.get_app_config("pylucid").ready()
+        self.assertNotIn(check_compress_manifest, checks.registry.registry.get_checks())
+        self.assertIn(check_compress_manifest, checks.registry.registry.get_checks(include_deployment_checks=True))
+
+
+class WritePrecompressedTest(SimpleTestCase):
+    def test_gzip(self):
+        with tempfile.TemporaryDirectory(prefix="pylucid_compress_") as temp_dir:
+            file_path = Path(temp_dir, "foo.css")
+            file_path.write_text("body { color: red; }")
+
+            created = compress.write_precompressed(file_path)
+
+            gz_path = Path(temp_dir, "foo.css.gz")
+            self.assertIn(gz_path, created)
+            self.assertEqual(gzip.decompress(gz_path.read_bytes()), b"body { color: red; }")
+
+
+class DocTestsTest(SimpleTestCase):
+    def test_doctests(self):
+        assert_doctests(self, compress)
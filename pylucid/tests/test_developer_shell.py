@@ -0,0 +1,133 @@
+"""
+    PyLucid
+    ~~~~~~~
+
+    Tests for pylucid/admin_shell/developer_shell.py
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import doctest
+import io
+import subprocess
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import mock
+
+# PyLucid
+from pylucid.admin_shell import developer_shell
+from pylucid.admin_shell.developer_shell import PyLucidDeveloperShell, compile_requirement, kill_process
+
+
+# Fake 'pip-compile': Write the output file and print the used cache directory
+FAKE_PIP_COMPILE = """
+import sys
+args = sys.argv[1:]
+print("cache: %s" % args[args.index("--cache-dir") + 1])
+with open(args[args.index("-o") + 1], "w") as f:
+    f.write("django==1.11.20\\ndjango-cms==3.4.6\\nfoo==2.0\\n")
+"""
+
+
+class RequirementsTestCase(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        temp_dir = tempfile.TemporaryDirectory(prefix="pylucid_requirements_")
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_path = Path(temp_dir.name)
+
+        self.requirements_path = Path(self.temp_path, "requirements")
+        self.requirements_path.mkdir()
+        Path(self.requirements_path, "foo.in").write_text("django-cms\n")
+        Path(self.requirements_path, "foo.txt").write_text("django==1.11.18\ndjango-cms==3.4.6\nbar==1.0\n")
+
+        patcher = mock.patch.object(developer_shell, "PIP_TOOLS_CACHE_PATH", Path(self.temp_path, "cache"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class CompileRequirementTest(RequirementsTestCase):
+    def compile(self, code, timeout=60):
+        stdout = io.StringIO()
+        with mock.patch.object(developer_shell, "PIP_COMPILE_ARGS", (sys.executable, "-c", code)), \
+                redirect_stdout(stdout):
+            result = compile_requirement((str(self.requirements_path), "foo.in", timeout))
+        return result, stdout.getvalue()
+
+    def test_compile(self):
+        result, output = self.compile(FAKE_PIP_COMPILE)
+        self.assertIsNone(result.error)
+        self.assertEqual(result.changed_pins, ["bar 1.0 -> (removed)", "django 1.11.18 -> 1.11.20", "foo (new) -> 2.0"])
+
+        # Every *.in file has its own cache:
+        cache_path = Path(self.temp_path, "cache", "foo")
+        self.assertIn("[foo.in] cache: %s" % cache_path, output)
+        self.assertTrue(cache_path.is_dir())
+
+    def test_exit_code(self):
+        result, output = self.compile("import sys;sys.exit(3)")
+        self.assertEqual(result.error, "exit code 3")
+        self.assertIn("[foo.in] ERROR: exit code 3", output)
+
+    def test_timeout_without_output(self):
+        result, output = self.compile("import time;time.sleep(30)", timeout=0.5)
+        self.assertEqual(result.error, "timeout after 500.0 ms")
+        self.assertLess(result.duration, 30)
+
+
+class UpgradeRequirementsTest(RequirementsTestCase):
+    def upgrade_requirements(self, argv):
+        Path(self.requirements_path, "developer_installation.txt").touch()
+        shell = PyLucidDeveloperShell.__new__(PyLucidDeveloperShell) # without the Cmd2 setup
+        shell.path_helper = mock.Mock(req_filepath=Path(self.requirements_path, "developer_installation.txt"))
+
+        stdout = io.StringIO()
+        pip_compile_args = (sys.executable, "-c", "import sys;sys.exit(3)")
+        with mock.patch.object(developer_shell, "PIP_COMPILE_ARGS", pip_compile_args), \
+                mock.patch.object(sys, "argv", argv), redirect_stdout(stdout):
+            result = shell.do_upgrade_requirements("1")
+        return result, stdout.getvalue()
+
+    def test_error_in_shell(self):
+        # A return value != None would stop the interactive shell
+        result, output = self.upgrade_requirements(argv=["pylucid_admin"])
+        self.assertIsNone(result)
+        self.assertIn("ERROR: 1 of 1 *.in files failed!", output)
+
+    def test_error_in_direct_start(self):
+        with self.assertRaises(SystemExit) as cm:
+            self.upgrade_requirements(argv=["pylucid_admin", "upgrade_requirements"])
+        self.assertEqual(cm.exception.code, 1)
+
+
+class KillProcessTest(unittest.TestCase):
+    def sleep_process(self):
+        proc = subprocess.Popen((sys.executable, "-c", "import time;time.sleep(30)"), start_new_session=True)
+        self.addCleanup(proc.wait)
+        return proc
+
+    @unittest.skipIf(sys.platform == "win32", "No process groups on Windows")
+    def test_process_group(self):
+        proc = self.sleep_process()
+        kill_process(proc)
+        self.assertNotEqual(proc.wait(timeout=10), 0)
+
+        kill_process(proc) # the process doesn't exist anymore
+
+    def test_without_killpg(self):
+        # e.g.: on Windows
+        proc = self.sleep_process()
+        with mock.patch.object(developer_shell.os, "killpg", None, create=True):
+            kill_process(proc)
+        self.assertNotEqual(proc.wait(timeout=10), 0)
+
+
+class DocTestsTest(unittest.TestCase):
+    def test_doctests(self):
+        results = doctest.testmod(developer_shell)
+        self.assertGreater(results.attempted, 0)
+        self.assertEqual(results.failed, 0)
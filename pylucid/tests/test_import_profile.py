@@ -0,0 +1,18 @@
+"""
+    PyLucid
+    ~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from django.test import SimpleTestCase
+
+# PyLucid
+from pylucid import import_profile, settings_utils
+from pylucid.tests.test_utils.doctest_utils import assert_doctests
+
+
+class DocTestsTest(SimpleTestCase):
+    def test_doctests(self):
+        assert_doctests(self, import_profile, settings_utils.LazyModule, settings_utils.select_app_groups)
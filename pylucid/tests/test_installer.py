@@ -9,15 +9,18 @@
     :license: GNU GPL v3 or above, see LICENSE for more details.
 """
 
+import json
 import os
+import shutil
 import sys
 from pathlib import Path
-from unittest import TestCase
+from unittest import TestCase, mock
 
 from django.utils.version import get_main_version
 
-from pylucid_installer.pylucid_installer import create_instance, get_python3_shebang
-from pylucid.tests.test_utils.test_cases import BaseTestCase, PageInstanceTestCase
+from pylucid_installer import pylucid_installer
+from pylucid_installer.pylucid_installer import create_instance, create_instances, get_python3_shebang, render_file
+from pylucid.tests.test_utils.test_cases import BaseTestCase, PageInstanceTestCase, ReusablePageInstanceTestCase
 
 # https://github.com/jedie/django-tools
 from django_tools.unittest_utils.isolated_filesystem import isolated_filesystem
@@ -79,8 +82,67 @@ class PyLucidInstallerTest(BaseUnittestCase):
                 content
             )
 
+    def test_create_many(self):
+        manifest_path = Path(self.temp_path, "manifest.json")
+        with manifest_path.open("w") as f:
+            json.dump([
+                {"dest": str(Path(self.temp_path, "foo")), "name": "foo"},
+                {"dest": str(Path(self.temp_path, "bar")), "name": "bar"},
+            ], f)
+
+        results = list(create_instances(manifest_path, processes=2, link_mode="hardlink"))
+        self.assertEqual(sorted([result.name for result in results]), ["bar", "foo"])
+        for result in results:
+            self.assertIsNone(result.error)
+            self.assertIn("Page instance created here: '%s'" % result.dest, result.output)
+
+        with Path(self.temp_path, "bar", "bar", "settings.py").open("r") as f:
+            self.assertIn('ROOT_URLCONF = "bar.urls"', f.read())
+
+    def test_hardlink(self):
+        # Hardlinks are only possible on the same file system:
+        # Use a template copy next to the destination.
+        template_path = Path(self.temp_path, "template")
+        shutil.copytree(str(pylucid_installer.TEMPLATE_PATH), str(template_path))
+        try:
+            os.link(str(Path(template_path, "manage.py")), str(Path(self.temp_path, "link_test")))
+        except OSError as err:
+            self.skipTest("Hardlinks not supported: %s" % err)
+
+        destination = Path(self.temp_path, "foo")
+        with mock.patch.object(pylucid_installer, "TEMPLATE_PATH", template_path), StdoutStderrBuffer():
+            create_instance(destination, "foo", remove=False, exist_ok=False, link_mode="hardlink")
+
+        # Patched files are never linked:
+        self.assertEqual(Path(destination, "manage.py").stat().st_nlink, 1)
+        self.assertEqual(Path(destination, "foo", "settings.py").stat().st_nlink, 1)
+
+        self.assertTrue(Path(destination, "foo", "urls.py").samefile(
+            Path(template_path, "example_project", "urls.py")
+        ))
 
-class ManageTest(PageInstanceTestCase):
+
+@isolated_filesystem()
+class RenderFileTest(BaseUnittestCase):
+    def test_single_pass(self):
+        filepath = Path(Path().cwd(), "foo.py")
+        filepath.write_text("#!/usr/bin/env python\nfoo bar foobar")
+        filepath.chmod(0o755)
+
+        not_found = render_file(filepath, {
+            "foo": "bar",
+            "bar": "foo",
+            "foobar": Path("/foo/bar"),
+            "#!/usr/bin/env python": "#!/usr/bin/python3",
+            "not existing": "",
+        })
+        self.assertEqual(not_found, {"not existing"})
+        self.assertEqual(filepath.read_text(), "#!/usr/bin/python3\nbar foo /foo/bar")
+        self.assertEqual(filepath.stat().st_mode & 0o777, 0o755)
+        self.assertEqual([p.name for p in Path().cwd().iterdir()], ["foo.py"])
+
+
+class ManageTest(ReusablePageInstanceTestCase):
     # def test_debug_settings(self):
     #     with open(os.path.join(self.project_path, "settings.py"), "r") as f:
     #         content = f.read()
@@ -115,6 +177,20 @@ class ManageTest(PageInstanceTestCase):
             output
         )
 
+    def test_database_restored(self):
+        self.call_manage_py("createsuperuser", "--noinput", "--username=foo", "--email=foo@bar.tld")
+        self.page_instance.restore()
+        output = self.call_manage_py("shell", "-c", "from django.contrib.auth.models import User;print(User.objects.count())")
+        self.assertEqual(output.strip().splitlines()[-1], "0")
+
+    def test_in_process_output(self):
+        self.assertEqual(
+            self.call_manage_py("diffsettings", in_process=True),
+            self.call_manage_py("diffsettings", in_process=False),
+        )
+
+
+class ManageMigrateTest(PageInstanceTestCase):
     def test_migrate(self):
         output = self.call_manage_py("migrate", "--noinput")
         print(output)
@@ -122,3 +198,9 @@ class ManageTest(PageInstanceTestCase):
         self.assertIn("Applying auth.", output)
         self.assertIn("Applying cms.", output)
         self.assertIn("Applying djangocms_blog.", output)
+
+    def test_call_in_process(self):
+        # A fresh page instance has his own manage.py worker, too:
+        output = self.call_manage_py("check", in_process=True)
+        self.assertIn("System check identified no issues", output)
+        self.assertIsNotNone(self.get_manage_py_worker().proc)
@@ -0,0 +1,66 @@
+"""
+    PyLucid
+    ~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import gzip
+import json
+
+from django.contrib.auth.models import Group, User
+from django.core import serializers
+from django.test import SimpleTestCase, TestCase
+
+# PyLucid
+from pylucid import json_stream
+from pylucid.tests.test_utils.doctest_utils import assert_doctests
+
+
+class JsonStreamTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        group = Group.objects.create(name="group")
+        for no in range(5):
+            user = User.objects.create(username="user%i" % no)
+            user.groups.add(group)
+
+    def get_expected(self):
+        return json.loads(serializers.serialize("json", User.objects.order_by("pk")))
+
+    def test_json(self):
+        content = "".join(json_stream.serialize(User.objects.all(), json_stream.FORMAT_JSON, chunk_size=2))
+        self.assertEqual(json.loads(content), self.get_expected())
+
+    def test_empty_json(self):
+        content = "".join(json_stream.serialize(User.objects.none(), json_stream.FORMAT_JSON))
+        self.assertEqual(json.loads(content), [])
+
+    def test_jsonl(self):
+        content = "".join(json_stream.serialize(User.objects.all(), json_stream.FORMAT_JSONL, chunk_size=2))
+        lines = content.splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertEqual([json.loads(line) for line in lines], self.get_expected())
+
+    def test_queries(self):
+        # 3 chunks: one query for the users + one for 'groups' + one for 'user_permissions'
+        with self.assertNumQueries(9):
+            list(json_stream.iter_objects(User.objects.all(), chunk_size=2))
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            list(json_stream.serialize(User.objects.all(), "xml"))
+
+    def test_gzip_response(self):
+        response = json_stream.streaming_response(User.objects.all(), json_stream.FORMAT_JSONL, compress=True)
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertIn('filename="auth.user.jsonl.gz"', response["Content-Disposition"])
+
+        content = gzip.decompress(b"".join(response.streaming_content)).decode("utf-8")
+        self.assertEqual(len(content.splitlines()), 5)
+
+
+class DocTestsTest(SimpleTestCase):
+    def test_doctests(self):
+        assert_doctests(self, json_stream)
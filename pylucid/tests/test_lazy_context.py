@@ -0,0 +1,92 @@
+"""
+    PyLucid
+    ~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from unittest import mock
+
+from django.template import engines
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+# PyLucid
+from pylucid import lazy_context
+from pylucid.tests.test_utils.doctest_utils import assert_doctests
+
+
+CALLS = []
+
+
+def expensive_processor(request):
+    CALLS.append("expensive")
+    return {"expensive": "Expensive value", "other": "Other value"}
+
+
+def constant_processor(request):
+    CALLS.append("constant")
+    return {"constant": "Constant value"}
+
+
+TEST_PROCESSORS = {
+    "pylucid.tests.test_lazy_context.expensive_processor": ("expensive", "other"),
+    "pylucid.tests.test_lazy_context.constant_processor": ("constant",),
+}
+
+
+@mock.patch.dict(lazy_context.PROCESSOR_KEYS, TEST_PROCESSORS)
+@override_settings(
+    TEMPLATES=[{
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "OPTIONS": {
+            "context_processors": [
+                "pylucid.lazy_context.lazy_processors",
+                "pylucid.lazy_context.constant_processors",
+            ],
+            "loaders": [
+                ("django.template.loaders.locmem.Loader", {
+                    "base.html": "{{ constant }}|{% block content %}{% endblock %}",
+                    "page.html": '{% extends "base.html" %}{% block content %}{% include "inc.html" %}{% endblock %}',
+                    "inc.html": "{% if expensive %}{{ expensive|default:other }}{% endif %}",
+                }),
+            ],
+        },
+    }],
+    PYLUCID_LAZY_CONTEXT_PROCESSORS=("pylucid.tests.test_lazy_context.expensive_processor",),
+    PYLUCID_CONSTANT_CONTEXT_PROCESSORS=("pylucid.tests.test_lazy_context.constant_processor",),
+)
+class LazyContextTest(SimpleTestCase):
+    def setUp(self):
+        CALLS.clear()
+        lazy_context.clear_cache()
+
+    def render(self, template_code):
+        request = RequestFactory().get("/")
+        return engines["django"].from_string(template_code).render(request=request)
+
+    def test_lazy(self):
+        self.assertEqual(self.render("Nothing"), "Nothing")
+        self.assertEqual(CALLS, ["constant"])
+
+        self.assertEqual(self.render("{{ expensive }} {{ other }}"), "Expensive value Other value")
+        self.assertEqual(CALLS, ["constant", "expensive"])
+
+    def test_constant(self):
+        for no in range(3):
+            self.assertEqual(self.render("{{ constant }}"), "Constant value")
+        self.assertEqual(CALLS, ["constant"])
+
+    def test_report(self):
+        report = lazy_context.get_processor_report(["page.html"])
+        self.assertEqual(report["page.html"], [
+            lazy_context.ProcessorUsage(
+                "pylucid.tests.test_lazy_context.expensive_processor", ["expensive", "other"], False
+            ),
+            lazy_context.ProcessorUsage("pylucid.tests.test_lazy_context.constant_processor", ["constant"], False),
+        ])
+
+
+class DocTestsTest(SimpleTestCase):
+    def test_doctests(self):
+        assert_doctests(self, lazy_context)
@@ -0,0 +1,127 @@
+"""
+    PyLucid
+    ~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import io
+import json
+import logging
+import os
+import unittest
+import warnings
+
+# PyLucid
+from pylucid import logging_utils, settings_utils
+from pylucid.logging_utils import JsonFormatter, QueueStreamHandler, WarningCounter
+from pylucid.tests.test_utils.doctest_utils import assert_doctests
+
+
+class QueueStreamHandlerTest(unittest.TestCase):
+    def setUp(self):
+        self.stream = io.StringIO()
+        self.log = logging.getLogger("pylucid.tests.queue_stream_handler")
+        self.log.propagate = False
+        self.log.setLevel(logging.INFO)
+
+    def add_handler(self, handler):
+        self.log.addHandler(handler)
+        self.addCleanup(self.log.removeHandler, handler)
+        self.addCleanup(handler.close)
+
+    def test_json_lines(self):
+        handler = QueueStreamHandler(self.stream)
+        handler.setFormatter(JsonFormatter())
+        self.add_handler(handler)
+
+        self.log.debug("Not logged")
+        self.log.info("Hello %s", "World")
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            self.log.exception("Error")
+        handler.stop()
+
+        lines = [json.loads(line) for line in self.stream.getvalue().splitlines()]
+        self.assertEqual([line["message"] for line in lines], ["Hello World", "Error"])
+        self.assertEqual(lines[0]["logger"], "pylucid.tests.queue_stream_handler")
+        self.assertIn("ZeroDivisionError", lines[1]["exception"])
+
+    def test_queue_full(self):
+        handler = QueueStreamHandler(self.stream, queue_size=1)
+        self.add_handler(handler)
+        handler.stop()
+
+        self.log.info("One")
+        self.log.info("Two")
+        self.assertEqual(handler.dropped, 1)
+
+        handler.start()
+        handler.stop()
+        self.assertEqual(self.stream.getvalue(), "One\n1 log records dropped, because the queue was full (queue size: 1)\n")
+        self.assertEqual(handler.dropped, 1)
+
+        # Reported only once:
+        handler.start()
+        handler.stop()
+        self.assertEqual(self.stream.getvalue().count("dropped"), 1)
+
+    def test_prepare(self):
+        handler = QueueStreamHandler(self.stream)
+        handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+        self.add_handler(handler)
+        handler.stop()
+
+        data = ["before"]
+        try:
+            raise ValueError(data[0])
+        except ValueError:
+            self.log.exception("Data: %s", data)
+        data[0] = "after"
+        del data
+
+        handler.start()
+        handler.stop()
+        output = self.stream.getvalue()
+        self.assertTrue(output.startswith("ERROR Data: ['before']\nTraceback (most recent call last):"), output)
+        self.assertIn("ValueError: before", output)
+
+    def test_restart_after_fork(self):
+        handler = QueueStreamHandler(self.stream)
+        self.add_handler(handler)
+        handler.stop()
+
+        # Simulate a forked child process without the listener thread:
+        handler._pid = os.getpid() + 1
+        handler._thread = object()
+        handler.dropped = 5 # counted in the parent process
+
+        self.log.info("Hello from the child")
+        self.assertEqual(handler._pid, os.getpid())
+        self.assertEqual(handler.dropped, 0)
+
+        handler.stop()
+        self.assertEqual(self.stream.getvalue(), "Hello from the child\n")
+
+
+class WarningCounterTest(unittest.TestCase):
+    def test_repeated_warnings(self):
+        counter = WarningCounter(logger_name="pylucid.tests.warnings")
+        with warnings.catch_warnings():
+            warnings.simplefilter("always")
+            warnings.showwarning = counter
+            with self.assertLogs("pylucid.tests.warnings") as logs:
+                for no in range(12):
+                    warnings.warn("Foo %i" % no, DeprecationWarning)
+
+        self.assertEqual(list(counter.counts.values()), [12])
+        self.assertEqual(len(logs.output), 2)
+        self.assertIn("DeprecationWarning:Foo 0", logs.output[0])
+        self.assertIn("DeprecationWarning:Foo 9 (repeated 10 times)", logs.output[1])
+
+
+class DocTestsTest(unittest.TestCase):
+    def test_doctests(self):
+        assert_doctests(self, logging_utils, settings_utils.get_logging)
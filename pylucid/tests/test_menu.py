@@ -0,0 +1,212 @@
+"""
+    PyLucid
+    ~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.template import engines
+from django.test import RequestFactory, SimpleTestCase, TestCase
+
+# PyLucid
+from pylucid import menu
+from pylucid.menu import MenuItem, MenuTree
+from pylucid.tests.test_utils.doctest_utils import assert_doctests
+
+
+def create_tree():
+    """
+    A
+     +- B
+     |   +- C
+     +- H (not in navigation)
+         +- I
+    D
+    """
+    tree = MenuTree()
+    tree.add(page_id=1, parent=-1, level=0, url="/a/", title="A", visible=True)
+    tree.add(page_id=2, parent=0, level=1, url="/a/b/", title="B", visible=True)
+    tree.add(page_id=3, parent=1, level=2, url="/a/b/c/", title="C", visible=True)
+    tree.add(page_id=5, parent=0, level=1, url="/a/h/", title="H", visible=False)
+    tree.add(page_id=6, parent=3, level=2, url="/a/h/i/", title="I", visible=True)
+    tree.add(page_id=4, parent=-1, level=0, url="/d/", title="D", visible=True)
+    tree.finish()
+    return tree
+
+
+def item_info(items):
+    return [(item.title, item.selected, item.ancestor, item.has_children, item.open, item.close) for item in items]
+
+
+class MenuTreeTest(SimpleTestCase):
+    def test_top_menu(self):
+        items = create_tree().get_items(None, from_level=0, to_level=0, extra_inactive=0, extra_active=0)
+        self.assertEqual(item_info(items), [
+            ("A", False, False, False, True, 0),
+            ("D", False, False, False, False, 1),
+        ])
+
+    def test_tree_menu(self):
+        items = create_tree().get_items(3, from_level=0, to_level=100, extra_inactive=0, extra_active=1)
+        self.assertEqual(item_info(items), [
+            ("A", False, True, True, True, 0),
+            ("B", False, True, True, True, 0),
+            ("C", True, False, False, True, 2),
+            ("D", False, False, False, False, 1),
+        ])
+
+    def test_split_menu(self):
+        items = create_tree().get_items(2, from_level=1, to_level=100, extra_inactive=0, extra_active=1)
+        self.assertEqual(item_info(items), [
+            ("B", True, False, True, True, 0),
+            ("C", False, False, False, True, 2),
+        ])
+
+    def test_extra_inactive(self):
+        # The page 'H' is not in navigation: His sub tree is hidden, too.
+        items = create_tree().get_items(None, from_level=0, to_level=100, extra_inactive=1, extra_active=1)
+        self.assertEqual([item.title for item in items], ["A", "B", "D"])
+
+    def test_pickle(self):
+        import pickle
+
+        tree = create_tree()
+        tree.index # create the index
+        tree = pickle.loads(pickle.dumps(tree))
+        self.assertEqual(tree.index[4], 5)
+
+
+class FakePage:
+    def __init__(self, pk, publisher_is_draft=False, publisher_public_id=None):
+        self.pk = pk
+        self.publisher_is_draft = publisher_is_draft
+        self.publisher_public_id = publisher_public_id
+
+
+class MenuItemsTest(TestCase):
+    def get_request(self, page=None, edit_mode=False):
+        request = RequestFactory().get("/en/")
+        request.user = AnonymousUser()
+        request.current_page = page
+        if edit_mode:
+            request.toolbar = mock.Mock(edit_mode=True)
+        return request
+
+    def test_selected_public_page(self):
+        with mock.patch.object(menu, "get_menu_tree", return_value=create_tree()) as get_menu_tree:
+            items = menu.get_menu_items(self.get_request(page=FakePage(pk=2)))
+        get_menu_tree.assert_called_once_with(settings.SITE_ID, "en", False)
+        self.assertEqual([item.title for item in items if item.selected], ["B"])
+
+    def test_selected_draft_page(self):
+        # The public tree contains the public version of the draft page
+        page = FakePage(pk=102, publisher_is_draft=True, publisher_public_id=2)
+        with mock.patch.object(menu, "get_menu_tree", return_value=create_tree()):
+            items = menu.get_menu_items(self.get_request(page=page))
+        self.assertEqual([item.title for item in items if item.selected], ["B"])
+
+    def test_edit_mode(self):
+        page = FakePage(pk=2, publisher_is_draft=True, publisher_public_id=102)
+        with mock.patch.object(menu, "get_menu_tree") as get_menu_tree, \
+                mock.patch.object(menu, "build_menu_tree", return_value=create_tree()) as build_menu_tree:
+            items = menu.get_menu_items(self.get_request(page=page, edit_mode=True))
+        self.assertFalse(get_menu_tree.called)
+        build_menu_tree.assert_called_once_with(settings.SITE_ID, "en", False, draft=True)
+        self.assertEqual([item.title for item in items if item.selected], ["B"])
+
+    def test_menu_tree_cache(self):
+        with mock.patch.object(menu, "build_menu_tree", return_value=create_tree()) as build_menu_tree:
+            menu.get_menu_tree(settings.SITE_ID, "en", False)
+            menu.get_menu_tree(settings.SITE_ID, "en", False)
+            self.assertEqual(build_menu_tree.call_count, 1)
+
+            menu.invalidate_site(settings.SITE_ID)
+            menu.get_menu_tree(settings.SITE_ID, "en", False)
+            self.assertEqual(build_menu_tree.call_count, 2)
+
+    def test_needs_cms_menu_cache(self):
+        with mock.patch.object(menu, "uses_cms_menu_features", return_value=False) as uses_cms_menu_features:
+            self.assertFalse(menu.needs_cms_menu(settings.SITE_ID))
+            self.assertFalse(menu.needs_cms_menu(settings.SITE_ID))
+            self.assertEqual(uses_cms_menu_features.call_count, 1)
+
+            menu.invalidate_site(settings.SITE_ID)
+            uses_cms_menu_features.return_value = True
+            self.assertTrue(menu.needs_cms_menu(settings.SITE_ID))
+            self.assertEqual(uses_cms_menu_features.call_count, 2)
+
+    def test_needs_cms_menu_with_permissions(self):
+        with self.settings(CMS_PERMISSION=True), \
+                mock.patch.object(menu, "uses_cms_menu_features") as uses_cms_menu_features:
+            self.assertTrue(menu.needs_cms_menu(settings.SITE_ID))
+        self.assertFalse(uses_cms_menu_features.called)
+
+
+class BuildMenuTreeTest(TestCase):
+    def create_page(self, title, parent=None, **kwargs):
+        from cms.api import create_page
+
+        return create_page(title, settings.CMS_TEMPLATES[0][0], "en", parent=parent, published=True, **kwargs)
+
+    def test_build_menu_tree(self):
+        root = self.create_page("Root", menu_title="Root menu")
+        child = self.create_page("Child", parent=root)
+        self.create_page("Hidden", parent=root, in_navigation=False)
+        self.create_page("Draft only", parent=child, published=False)
+
+        tree = menu.build_menu_tree(settings.SITE_ID, "en", authenticated=False)
+        self.assertEqual(tree.titles, ["Root menu", "Child", "Hidden"])
+        self.assertEqual(list(tree.levels), [0, 1, 1])
+        self.assertEqual(list(tree.visible), [1, 1, 0])
+        self.assertEqual(list(tree.page_ids[:2]), [root.publisher_public_id, child.publisher_public_id])
+
+
+class MenuTagTest(SimpleTestCase):
+    def render(self, needs_cms_menu):
+        template = engines["django"].from_string(
+            '{% load pylucid_menu_tags %}'
+            '{% pylucid_menu 0 0 0 0 "pylucid/includes/bootstrap/pylucid_top_menu.html"'
+            ' "pylucid/includes/bootstrap/top_menu.html" %}'
+        )
+        request = RequestFactory().get("/")
+        with mock.patch("pylucid.templatetags.pylucid_menu_tags.get_current_site", return_value=mock.Mock(pk=1)), \
+                mock.patch("pylucid.templatetags.pylucid_menu_tags.needs_cms_menu", return_value=needs_cms_menu):
+            return request, template.render({"request": request})
+
+    def test_render(self):
+        items = [
+            MenuItem(page_id=1, url="/a/", title="A", level=0, selected=True, ancestor=False),
+            MenuItem(page_id=2, url="/d/", title="D & E", level=0, selected=False, ancestor=False),
+        ]
+        items[0].open = True
+        items[1].close = 1
+
+        with mock.patch("pylucid.templatetags.pylucid_menu_tags.get_menu_items", return_value=items) as get_menu_items:
+            request, html = self.render(needs_cms_menu=False)
+
+        get_menu_items.assert_called_once_with(request, from_level=0, to_level=0, extra_inactive=0, extra_active=0)
+        self.assertInHTML('<a class="nav-link" href="/a/">A</a>', html)
+        self.assertIn("active", html)
+        self.assertIn("D &amp; E", html)
+
+    def test_show_menu_fallback(self):
+        # e.g.: navigation extenders, apphook menus or CMS_PERMISSION are used
+        with mock.patch("pylucid.templatetags.pylucid_menu_tags.get_menu_items") as get_menu_items, \
+                mock.patch(
+                    "pylucid.templatetags.pylucid_menu_tags.render_show_menu", return_value="show_menu"
+                ) as render_show_menu:
+            request, html = self.render(needs_cms_menu=True)
+
+        self.assertFalse(get_menu_items.called)
+        self.assertEqual(html, "show_menu")
+        self.assertEqual(render_show_menu.call_args[0][1:], (0, 0, 0, 0, "pylucid/includes/bootstrap/top_menu.html"))
+
+
+class DocTestsTest(SimpleTestCase):
+    def test_doctests(self):
+        assert_doctests(self, menu)
@@ -0,0 +1,145 @@
+"""
+    PyLucid
+    ~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import io
+from unittest import mock
+
+from django.conf.urls import url
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils.module_loading import import_string
+
+# PyLucid
+from pylucid import settings_utils
+from pylucid.middlewares import timing
+from pylucid.settings_utils import add_middleware_timing
+from pylucid.tests.test_utils.doctest_utils import assert_doctests
+
+
+class FakeClock:
+    now = 0.0
+
+
+def fake_perf_counter():
+    return FakeClock.now
+
+
+class SlowMiddleware:
+    # Needs 5 seconds on the way in and 1 second on the way out
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        FakeClock.now += 5
+        response = self.get_response(request)
+        FakeClock.now += 1
+        return response
+
+
+class FastMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+
+def view(request):
+    FakeClock.now += 2
+    return HttpResponse("view")
+
+
+urlpatterns = [
+    url(r'^$', view),
+]
+
+SLOW = "%s.SlowMiddleware" % __name__
+FAST = "%s.FastMiddleware" % __name__
+MIDDLEWARE = add_middleware_timing((FAST, SLOW))
+
+
+def build_chain(middleware):
+    """
+    Create the middleware instances like django: from the inside to the outside.
+    """
+    handler = view
+    for path in reversed(middleware):
+        handler = import_string(path)(handler)
+    return handler
+
+
+@mock.patch.object(timing.time, "perf_counter", fake_perf_counter)
+@override_settings(MIDDLEWARE=MIDDLEWARE)
+class MiddlewareTimingTest(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        timing.reset()
+        self.addCleanup(timing.reset)
+
+    def test_layer_names(self):
+        self.assertEqual(timing.get_layer_names(), [FAST, SLOW, timing.VIEW_NAME])
+
+    def test_durations(self):
+        build_chain(MIDDLEWARE)(RequestFactory().get("/"))
+
+        self.assertEqual(timing.get_report(), [
+            (FAST, 1, 0.0, 0.0),
+            (SLOW, 1, 6.0, 6.0),
+            (timing.VIEW_NAME, 1, 2.0, 2.0),
+        ])
+
+    def test_build_chain_twice(self):
+        # e.g.: settings reload or a second handler in the same process
+        build_chain(MIDDLEWARE)
+        chain = build_chain(MIDDLEWARE)
+        chain(RequestFactory().get("/"))
+        chain(RequestFactory().get("/"))
+
+        report = dict((name, (count, p50)) for name, count, p50, p99 in timing.get_report())
+        self.assertEqual(report, {FAST: (2, 0.0), SLOW: (2, 6.0), timing.VIEW_NAME: (2, 2.0)})
+
+    def test_many_middlewares(self):
+        # The number of markers is not limited
+        middleware = add_middleware_timing([FAST] * 150)
+        self.assertEqual(middleware[-1], "pylucid.middlewares.timing.marker:150")
+        with override_settings(MIDDLEWARE=middleware):
+            build_chain(middleware)(RequestFactory().get("/"))
+            report = timing.get_report()
+        self.assertEqual(len(report), 151)
+        self.assertEqual(report[-1], (timing.VIEW_NAME, 1, 2.0, 2.0))
+
+    def test_outer_middleware_returns_response(self):
+        with mock.patch.object(SlowMiddleware, "__call__", lambda self, request: HttpResponse("short cut")):
+            build_chain(MIDDLEWARE)(RequestFactory().get("/"))
+
+        report = dict((name, count) for name, count, p50, p99 in timing.get_report())
+        self.assertEqual(report, {FAST: 1, SLOW: 1, timing.VIEW_NAME: 0})
+
+
+@mock.patch.object(timing.time, "perf_counter", fake_perf_counter)
+@override_settings(ROOT_URLCONF=__name__, MIDDLEWARE=(FAST, SLOW))
+class MiddlewareTimingCommandTest(TestCase):
+    def test_report(self):
+        stdout = io.StringIO()
+        call_command("middleware_timing", "/", "--count=3", stdout=stdout)
+        output = stdout.getvalue()
+
+        self.assertIn("Request '/' 3 times...", output)
+        lines = dict((line.split()[0], line.split()[1:]) for line in output.splitlines() if line.startswith(__name__))
+        self.assertEqual(lines[SLOW], ["3", "6000.00ms", "6000.00ms"])
+        self.assertEqual(lines[FAST], ["3", "0.00ms", "0.00ms"])
+        self.assertIn(timing.VIEW_NAME, output)
+
+
+class DocTestsTest(SimpleTestCase):
+    def test_doctests(self):
+        assert_doctests(
+            self, timing,
+            settings_utils.add_middleware_timing, settings_utils.production_apps, settings_utils.production_middleware,
+        )
@@ -0,0 +1,98 @@
+"""
+    PyLucid
+    ~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import sys
+import time
+import unittest
+from unittest import mock
+
+from django.apps import apps
+
+# PyLucid
+from pylucid import utils
+from pylucid.tests.test_utils.doctest_utils import assert_doctests
+
+
+if apps.is_installed("multisite"):
+    # PyLucid
+    from pylucid import multisite_views
+else:
+    # Test the HostResolver without django-multisite: Alias is a mock
+    with mock.patch.dict(sys.modules, {"multisite": mock.Mock(), "multisite.models": mock.Mock()}):
+        # PyLucid
+        from pylucid import multisite_views
+
+
+class FakeResolver(multisite_views.HostResolver):
+    def __init__(self, aliases, **kwargs):
+        super().__init__(**kwargs)
+        self.aliases = aliases
+        self.lookups = []
+        self.created = []
+
+    def lookup_alias(self, netloc):
+        self.lookups.append(netloc)
+        return self.aliases.get(netloc)
+
+    def create_alias(self, netloc, site):
+        self.created.append(netloc)
+        self.aliases[netloc] = "alias %s" % netloc
+        return self.aliases[netloc]
+
+
+class HostResolverTest(unittest.TestCase):
+    def test_cached(self):
+        resolver = FakeResolver({"example.tld": "alias"})
+        self.assertEqual(resolver.resolve("example.tld"), "alias")
+        self.assertEqual(resolver.resolve("example.tld"), "alias")
+        self.assertEqual(resolver.lookups, ["example.tld"])
+
+    def test_negative_timeout(self):
+        resolver = FakeResolver({}, negative_timeout=60)
+        self.assertIsNone(resolver.resolve("unknown.tld"))
+        self.assertIsNone(resolver.resolve("unknown.tld"))
+        self.assertEqual(resolver.lookups, ["unknown.tld"])
+
+        with mock.patch.object(multisite_views.time, "monotonic", return_value=time.monotonic() + 61):
+            self.assertIsNone(resolver.resolve("unknown.tld"))
+        self.assertEqual(resolver.lookups, ["unknown.tld", "unknown.tld"])
+
+    def test_lru(self):
+        resolver = FakeResolver({}, maxsize=2)
+        for netloc in ("a.tld", "b.tld", "c.tld", "a.tld"):
+            resolver.resolve(netloc)
+        self.assertEqual(resolver.lookups, ["a.tld", "b.tld", "c.tld", "a.tld"])
+
+    @mock.patch.object(multisite_views, "Site")
+    def test_get_or_create(self, Site):
+        resolver = FakeResolver({}, allowed_hosts=r"(.+\.)?example\.tld")
+        with mock.patch.object(multisite_views, "settings"):
+            self.assertEqual(resolver.get_or_create("www.example.tld"), "alias www.example.tld")
+            self.assertIsNone(resolver.get_or_create("random.bot"))
+            self.assertIsNone(resolver.get_or_create("random.bot"))
+            self.assertEqual(resolver.get_or_create("www.example.tld"), "alias www.example.tld")
+
+        self.assertEqual(resolver.created, ["www.example.tld"])
+        self.assertEqual(resolver.lookups, ["www.example.tld", "random.bot"])
+
+    @mock.patch.object(multisite_views, "Alias")
+    def test_lookup_alias(self, Alias):
+        Alias.objects.resolve.side_effect = lambda host, port: "alias %s %s" % (host, port)
+        resolver = multisite_views.HostResolver()
+        self.assertEqual(resolver.resolve("example.tld:8000"), "alias example.tld 8000")
+        self.assertEqual(resolver.resolve("example.tld:8000"), "alias example.tld 8000")
+        Alias.objects.resolve.assert_called_once_with(host="example.tld", port="8000")
+
+        # e.g.: invalid port
+        Alias.objects.resolve.side_effect = ValueError
+        self.assertIsNone(resolver.resolve("example.tld:foo"))
+
+
+class DocTestsTest(unittest.TestCase):
+    def test_doctests(self):
+        assert_doctests(self, multisite_views, utils.LRUCache)
@@ -0,0 +1,120 @@
+"""
+    PyLucid
+    ~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+
+# PyLucid
+from pylucid import page_cache, signals
+from pylucid.middlewares.page_cache import CACHE_HEADER, FetchFromPageCacheMiddleware, UpdatePageCacheMiddleware
+
+
+class FakePage:
+    def __init__(self, pk, site_id=settings.SITE_ID, application_urls=None):
+        self.pk = pk
+        self.site_id = site_id
+        self.application_urls = application_urls
+
+
+class PageCacheTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        page_cache.get_cache().clear()
+
+        self.factory = RequestFactory()
+        self.fetch_middleware = FetchFromPageCacheMiddleware()
+        self.update_middleware = UpdatePageCacheMiddleware()
+
+    def request(self, path="/en/", page=None, content="page content", **kwargs):
+        """
+        Simulate a request through both middlewares.
+        """
+        request = self.factory.get(path, **kwargs)
+        request.LANGUAGE_CODE = "en"
+
+        response = self.fetch_middleware.process_request(request)
+        if response is not None:
+            return response
+
+        request.current_page = page
+        response = HttpResponse(content)
+        return self.update_middleware.process_response(request, response)
+
+    def assert_cache_hit(self, response, content="page content"):
+        self.assertEqual(response.get(CACHE_HEADER), "hit")
+        self.assertEqual(response.content.decode("utf-8"), content)
+
+    def assert_cache_miss(self, response):
+        self.assertNotIn(CACHE_HEADER, response)
+
+    def test_cache_hit(self):
+        page = FakePage(pk=1)
+        self.assert_cache_miss(self.request(page=page))
+        self.assert_cache_hit(self.request(page=page))
+
+    def test_not_a_cms_page(self):
+        self.assert_cache_miss(self.request(page=None))
+        self.assert_cache_miss(self.request(page=None))
+
+    def test_query_string(self):
+        page = FakePage(pk=1)
+        self.request(page=page)
+        self.assert_cache_miss(self.request(path="/en/?edit", page=page))
+
+    def test_session_cookie(self):
+        page = FakePage(pk=1)
+        self.request(page=page)
+        self.factory.cookies[settings.SESSION_COOKIE_NAME] = "foobar"
+        self.assert_cache_miss(self.request(page=page))
+
+    def test_response_with_cookie(self):
+        page = FakePage(pk=1)
+        request = self.factory.get("/en/")
+        request.LANGUAGE_CODE = "en"
+        self.assertIsNone(self.fetch_middleware.process_request(request))
+
+        request.current_page = page
+        response = HttpResponse("content")
+        response.set_cookie("foo", "bar")
+        self.update_middleware.process_response(request, response)
+
+        self.assert_cache_miss(self.request(page=page))
+
+    def test_invalidate_site(self):
+        page = FakePage(pk=1)
+        self.request(page=page)
+        self.assert_cache_hit(self.request(page=page))
+
+        page_cache.invalidate_site(settings.SITE_ID)
+        self.assert_cache_miss(self.request(page=page))
+
+    def test_paths(self):
+        page = FakePage(pk=1)
+        self.request(path="/en/a/", page=page, content="a")
+        self.request(path="/en/b/", page=page, content="b")
+        self.assert_cache_hit(self.request(path="/en/a/", page=page), content="a")
+        self.assert_cache_hit(self.request(path="/en/b/", page=page), content="b")
+
+    def test_apphook_page(self):
+        # e.g.: djangocms_blog: A new blog post fires no page signal
+        page = FakePage(pk=1, application_urls="BlogApp")
+        self.assert_cache_miss(self.request(path="/en/blog/", page=page))
+        self.assert_cache_miss(self.request(path="/en/blog/", page=page))
+
+    def test_publish_invalidates_sibling(self):
+        page = FakePage(pk=1)
+        sibling = FakePage(pk=2)
+        self.request(path="/en/b/", page=sibling, content="menu: A")
+        self.assert_cache_hit(self.request(path="/en/b/", page=sibling), content="menu: A")
+
+        # Rename and publish the page: The menu of the sibling shows the new title
+        signals.page_published(sender=None, instance=page, language="en")
+
+        self.assert_cache_miss(self.request(path="/en/b/", page=sibling, content="menu: A renamed"))
+        self.assert_cache_hit(self.request(path="/en/b/", page=sibling), content="menu: A renamed")
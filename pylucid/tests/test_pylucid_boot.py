@@ -1,13 +1,20 @@
 
+import asyncio
+import concurrent.futures
 import subprocess
+import sys
+import time
 import unittest
 from pathlib import Path
+from unittest import mock
 
 # https://github.com/jedie/django-tools
 from django_tools.unittest_utils.isolated_filesystem import isolated_filesystem
 
 # PyLucid
-from pylucid.pylucid_boot import VerboseSubprocess
+from pylucid import pylucid_boot
+from pylucid.pylucid_boot import VerboseSubprocess, run_concurrent
+from pylucid.tests.test_utils.doctest_utils import assert_doctests
 
 
 class TestPyLucidBoot(unittest.TestCase):
@@ -54,3 +61,105 @@ class TestPyLucidBoot(unittest.TestCase):
             print(output)
 
             self.assertIn("ERROR: Path '%s' already exists!" % temp_path, output)
+
+
+class TestVerboseSubprocess(unittest.TestCase):
+    def python(self, code, **kwargs):
+        return VerboseSubprocess(sys.executable, "-c", code, **kwargs)
+
+    def test_output(self):
+        output = self.python("import sys;print('out');print('err', file=sys.stderr)").verbose_output(check=False)
+        self.assertEqual(output, "out\nerr\n")
+
+    def test_exit_code(self):
+        with self.assertRaises(subprocess.CalledProcessError) as cm:
+            self.python("print('foo');raise SystemExit(3)").verbose_output(check=False)
+
+        self.assertEqual(cm.exception.returncode, 3)
+        self.assertEqual(cm.exception.output, "foo\n")
+
+    def test_timeout_without_output(self):
+        start_time = time.monotonic()
+        with self.assertRaises(subprocess.TimeoutExpired):
+            self.python("import time;time.sleep(30)", timeout=1).verbose_output(check=False)
+        self.assertLess(time.monotonic() - start_time, 10)
+
+    def test_no_default_timeout(self):
+        sp = self.python("print('foo')")
+        self.assertIsNone(sp.kwargs["timeout"])
+        self.assertEqual(sp.run().output, "foo\n")
+
+    def test_read_without_event_loop_pipe(self):
+        # e.g.: on Windows the pipe is read in a thread
+        with mock.patch.object(pylucid_boot.sys, "platform", "win32"):
+            result = self.python("print(1);print(2, end='')").run()
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(result.output, "1\n2")
+
+    def test_ring_buffer(self):
+        result = self.python("for i in range(1000): print(i)").run(max_lines=2)
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(result.output, "998\n999\n")
+
+    def test_iter_output(self):
+        lines = list(self.python("print(1);print(2)").iter_output())
+        self.assertEqual(lines, ["1\n", "2\n"])
+
+    def test_concurrent(self):
+        lines = []
+        start_time = time.monotonic()
+        results = run_concurrent(
+            *[self.python("import time;time.sleep(1);print(%i)" % no) for no in range(4)],
+            line_callback=lambda verbose_subprocess, line: lines.append(line)
+        )
+        self.assertLess(time.monotonic() - start_time, 3.5)
+
+        self.assertEqual([result.output for result in results], ["0\n", "1\n", "2\n", "3\n"])
+        self.assertEqual(sorted(lines), ["0\n", "1\n", "2\n", "3\n"])
+        for result in results:
+            self.assertEqual(result.exit_code, 0)
+            self.assertGreaterEqual(result.usage.wall_time, 1)
+
+    def test_concurrent_more_processes_than_threads(self):
+        # Every process has his own thread: Not limited by the default executor of the loop
+        def new_event_loop():
+            loop = asyncio_new_event_loop()
+            loop.set_default_executor(concurrent.futures.ThreadPoolExecutor(max_workers=1))
+            return loop
+
+        asyncio_new_event_loop = pylucid_boot.asyncio.new_event_loop
+        with mock.patch.object(pylucid_boot.asyncio, "new_event_loop", new_event_loop):
+            results = run_concurrent(
+                self.python("import time;time.sleep(1.5)"),
+                *[self.python("import time;time.sleep(0.2)", timeout=1) for no in range(2)]
+            )
+        self.assertEqual([(result.timed_out, result.exit_code) for result in results], [(False, 0)] * 3)
+
+    def test_timeout_starts_with_waiting_thread(self):
+        # The process waits for a free executor thread: This time doesn't count to the timeout
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(executor.shutdown)
+
+        blocker = self.python("import time;time.sleep(1.5)")
+        sleeper = self.python("import time;time.sleep(0.2)", timeout=1)
+        results = [
+            loop.run_until_complete(task)
+            for task in (
+                loop.create_task(blocker.run_async(executor=executor)),
+                loop.create_task(sleeper.run_async(executor=executor)),
+            )
+        ]
+        self.assertEqual([(result.timed_out, result.exit_code) for result in results], [(False, 0)] * 2)
+
+    @unittest.skipIf(sys.platform == "win32", "No resource usage on Windows")
+    def test_resource_usage(self):
+        result = self.python("x = bytearray(50 * 1024 * 1024)").run()
+        self.assertGreater(result.usage.max_rss, 50 * 1024 * 1024)
+        self.assertGreater(result.usage.cpu_time, 0)
+
+
+class DocTestsTest(unittest.TestCase):
+    def test_doctests(self):
+        assert_doctests(self, pylucid_boot.OutputBuffer)
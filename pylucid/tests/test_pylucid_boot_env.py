@@ -0,0 +1,157 @@
+"""
+    PyLucid
+    ~~~~~~~
+
+    Tests for the virtualenv creation in pylucid/pylucid_boot.py
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import os
+import tempfile
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# PyLucid
+from pylucid import pylucid_boot
+from pylucid.pylucid_boot import CachedEnvBuilder, copy_env, get_bin_dir_name
+from pylucid.tests.test_utils.doctest_utils import assert_doctests
+
+
+class TempDirTestCase(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        temp_dir = tempfile.TemporaryDirectory(prefix="pylucid_boot_")
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_path = Path(temp_dir.name).resolve()
+
+
+class CopyEnvTest(TempDirTestCase):
+    def create_template(self):
+        template_path = Path(self.temp_path, "template")
+        bin_path = Path(template_path, get_bin_dir_name())
+        bin_path.mkdir(parents=True)
+
+        script_path = Path(bin_path, "pylucid_admin")
+        script_path.write_text("#!%s/bin/python\nprint('foo')\n" % template_path)
+        script_path.chmod(0o755)
+
+        Path(bin_path, "activate").write_text('VIRTUAL_ENV="%s"\n' % template_path)
+        Path(bin_path, "other").write_text("no path in here\n")
+
+        site_packages = Path(template_path, "lib", "python3.6", "site-packages")
+        site_packages.mkdir(parents=True)
+        Path(site_packages, "easy-install.pth").write_text("%s/src/pylucid\n" % template_path)
+        Path(site_packages, "module.py").write_text("# %s\n" % template_path)
+        return template_path
+
+    def assert_copy(self, template_path, destination):
+        bin_path = Path(destination, get_bin_dir_name())
+        self.assertEqual(Path(bin_path, "pylucid_admin").read_text(), "#!%s/bin/python\nprint('foo')\n" % destination)
+        self.assertTrue(os.access(str(Path(bin_path, "pylucid_admin")), os.X_OK))
+        self.assertEqual(Path(bin_path, "activate").read_text(), 'VIRTUAL_ENV="%s"\n' % destination)
+
+        site_packages = Path(destination, "lib", "python3.6", "site-packages")
+        self.assertEqual(Path(site_packages, "easy-install.pth").read_text(), "%s/src/pylucid\n" % destination)
+
+        # Only scripts and path files are rewritten:
+        self.assertEqual(Path(site_packages, "module.py").read_text(), "# %s\n" % template_path)
+
+        # The template is unchanged:
+        self.assertEqual(
+            Path(template_path, get_bin_dir_name(), "pylucid_admin").read_text(),
+            "#!%s/bin/python\nprint('foo')\n" % template_path
+        )
+        self.assertEqual(
+            Path(template_path, "lib", "python3.6", "site-packages", "easy-install.pth").read_text(),
+            "%s/src/pylucid\n" % template_path
+        )
+
+    def test_hardlink(self):
+        template_path = self.create_template()
+        destination = Path(self.temp_path, "copy")
+        copy_env(template_path, destination)
+        self.assert_copy(template_path, destination)
+
+        # Not rewritten files are hardlinked:
+        self.assertTrue(Path(destination, get_bin_dir_name(), "other").samefile(
+            Path(template_path, get_bin_dir_name(), "other")
+        ))
+
+    def test_copy(self):
+        template_path = self.create_template()
+        destination = Path(self.temp_path, "copy")
+        copy_env(template_path, destination, hardlink=False)
+        self.assert_copy(template_path, destination)
+
+        self.assertFalse(Path(destination, get_bin_dir_name(), "other").samefile(
+            Path(template_path, get_bin_dir_name(), "other")
+        ))
+
+
+class CachedEnvBuilderTest(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.requirements_path = Path(self.temp_path, "requirements.txt")
+        self.requirements_path.write_text("-e git+https://github.com/foo/bar.git@master#egg=bar\nfoo==1.0\n")
+        self.wheelhouse_path = Path(self.temp_path, "wheelhouse")
+
+        self.env_dir = Path(self.temp_path, "env")
+        self.env_dir.mkdir()
+        self.context = types.SimpleNamespace(env_dir=str(self.env_dir))
+
+    def post_setup(self, offline=False):
+        builder = CachedEnvBuilder(
+            requirements_path=self.requirements_path,
+            wheelhouse_path=self.wheelhouse_path,
+            offline=offline,
+        )
+        with mock.patch.object(builder, "call_pip") as call_pip:
+            builder.post_setup(self.context)
+        return [call[0][1:] for call in call_pip.call_args_list]
+
+    def test_cache_miss_and_hit(self):
+        (wheel_args, install_args) = self.post_setup()
+        self.assertEqual(wheel_args[0], "wheel")
+        self.assertIn(str(self.requirements_path), wheel_args)
+        self.assertEqual(install_args[0], "install")
+        self.assertEqual(
+            Path(self.env_dir, "pylucid_requirements.txt").read_text(), "bar\nfoo==1.0"
+        )
+
+        # All pinned wheels are build before: Refresh only the not pinned ones
+        (wheel_args, install_args) = self.post_setup()
+        self.assertEqual(wheel_args[-2:], ("git+https://github.com/foo/bar.git@master#egg=bar", "pylucid"))
+        self.assertNotIn("--requirement", wheel_args)
+        self.assertEqual(install_args[0], "install")
+
+        # Changed requirements: Build the missing wheels
+        self.requirements_path.write_text("foo==1.1\n")
+        (wheel_args, install_args) = self.post_setup()
+        self.assertIn(str(self.requirements_path), wheel_args)
+
+    def test_offline(self):
+        self.assertEqual([args[0] for args in self.post_setup(offline=True)], ["install"])
+        self.assertFalse(self.wheelhouse_path.exists())
+
+    def test_install_from_wheelhouse(self):
+        builder = CachedEnvBuilder(
+            requirements_path=self.requirements_path,
+            wheelhouse_path=self.wheelhouse_path,
+            offline=True,
+        )
+        with mock.patch.object(builder, "call_pip") as call_pip:
+            builder.post_setup(self.context)
+
+        args = call_pip.call_args[0][1:]
+        self.assertIn("--no-index", args)
+        self.assertEqual(args[args.index("--find-links") + 1], str(self.wheelhouse_path))
+
+
+class DocTestsTest(unittest.TestCase):
+    def test_doctests(self):
+        # The other DocTests of pylucid_boot depends on the terminal
+        assert_doctests(self, pylucid_boot.get_wheelhouse_requirements, pylucid_boot.get_vcs_requirements)
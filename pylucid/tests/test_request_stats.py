@@ -0,0 +1,117 @@
+"""
+    PyLucid
+    ~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.http import HttpResponse
+from django.template import engines
+from django.template.response import SimpleTemplateResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import ResolverMatch
+
+# PyLucid
+from pylucid import request_stats
+from pylucid.middlewares import request_stats as request_stats_middleware
+from pylucid.middlewares.page_cache import CACHE_HEADER
+from pylucid.middlewares.request_stats import RequestStatsMiddleware
+from pylucid.models import RequestStatistic
+from pylucid.tests.test_utils.doctest_utils import assert_doctests
+
+
+class RequestStatsTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        request_stats.collector.swap()
+        self.factory = RequestFactory()
+        self.middleware = RequestStatsMiddleware()
+
+        patcher = mock.patch.object(request_stats.collector, "ensure_thread")
+        self.ensure_thread = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def request(self, response):
+        request = self.factory.get("/")
+        self.assertIsNone(self.middleware.process_request(request))
+
+        User.objects.count() # one database query
+
+        if isinstance(response, SimpleTemplateResponse):
+            response = self.middleware.process_template_response(request, response)
+            response.render()
+
+        return self.middleware.process_response(request, response)
+
+    @override_settings(PYLUCID_REQUEST_STATS_SAMPLE_RATE=0)
+    def test_off(self):
+        self.request(HttpResponse("foo"))
+        self.assertEqual(request_stats.collector.swap()[1], {})
+        self.assertFalse(self.ensure_thread.called)
+
+    @override_settings(PYLUCID_REQUEST_STATS_SAMPLE_RATE=1)
+    def test_sampled(self):
+        self.request(HttpResponse("foo"))
+        response = HttpResponse("foo")
+        response[CACHE_HEADER] = "hit"
+        self.request(response)
+        self.request(SimpleTemplateResponse(engines["django"].from_string("{{ foo }}"), {"foo": "bar"}))
+        self.assertTrue(self.ensure_thread.called)
+
+        request_stats.collector.flush()
+
+        entry = RequestStatistic.objects.get()
+        self.assertEqual(entry.name, "(unresolved)")
+        self.assertEqual(entry.requests, 3)
+        self.assertEqual(entry.sampled, 3)
+        self.assertEqual(entry.db_queries, 3)
+        self.assertEqual(entry.cache_hits, 1)
+        self.assertEqual(entry.cache_misses, 0)
+        self.assertGreater(entry.template_time, 0)
+        self.assertGreaterEqual(entry.max_time, entry.avg_time)
+
+    @override_settings(PYLUCID_REQUEST_STATS_SAMPLE_RATE=1)
+    def test_full_query_log(self):
+        # The query log is a deque(maxlen=9000): Its length doesn't change anymore
+        connection.queries_log.extend([{"sql": "", "time": "0.0"}] * connection.queries_log.maxlen)
+        self.addCleanup(connection.queries_log.clear)
+
+        with self.settings(DEBUG=True):
+            self.request(HttpResponse("foo"))
+        self.assertFalse(connection.force_debug_cursor)
+
+        aggregate = request_stats.collector.swap()[1]["(unresolved)"]
+        self.assertEqual(aggregate.db_queries, 1)
+
+    @override_settings(PYLUCID_REQUEST_STATS_SAMPLE_RATE=1)
+    def test_view_name(self):
+        request = self.factory.get("/")
+        self.middleware.process_request(request)
+        request.resolver_match = ResolverMatch(func=RequestStatsMiddleware, args=(), kwargs={})
+        self.middleware.process_response(request, HttpResponse("foo"))
+
+        aggregates = request_stats.collector.swap()[1]
+        self.assertEqual(list(aggregates), ["pylucid.middlewares.request_stats.RequestStatsMiddleware"])
+
+    @override_settings(PYLUCID_REQUEST_STATS_SAMPLE_RATE=0.5)
+    def test_not_sampled(self):
+        with mock.patch("random.random", return_value=0.9):
+            self.request(HttpResponse("foo"))
+
+        aggregate = request_stats.collector.swap()[1]["(unresolved)"]
+        self.assertEqual(aggregate.requests, 1)
+        self.assertEqual(aggregate.sampled, 0)
+
+    def test_flush_empty(self):
+        request_stats.collector.flush()
+        self.assertFalse(RequestStatistic.objects.exists())
+
+
+class DocTestsTest(SimpleTestCase):
+    def test_doctests(self):
+        assert_doctests(self, request_stats, request_stats_middleware)
@@ -1,4 +1,12 @@
 
+from django.core.exceptions import DisallowedHost
+from django.test import RequestFactory, SimpleTestCase
+
+# PyLucid
+from pylucid import settings_utils
+from pylucid.settings_utils import HostMatcher
+from pylucid.tests.test_utils.doctest_utils import assert_doctests
+
 from .test_utils.test_cases import BaseTestCase, PageInstanceTestCase
 
 
@@ -42,3 +50,25 @@ class PageInstanceSettingsTest(PageInstanceTestCase):
 
         # DATABASE
         self.assertIn("test_settings/test_settings.db", output)
+
+
+class HostMatcherTest(SimpleTestCase):
+    def test_allowed_hosts(self):
+        allowed_hosts = HostMatcher(["127.0.0.1", "10.0.0.0/8", ".example.tld"])
+        factory = RequestFactory()
+        with self.settings(ALLOWED_HOSTS=allowed_hosts):
+            self.assertEqual(factory.get("/", HTTP_HOST="www.example.tld").get_host(), "www.example.tld")
+            self.assertEqual(factory.get("/", HTTP_HOST="10.1.2.3:8000").get_host(), "10.1.2.3:8000")
+            with self.assertRaises(DisallowedHost):
+                factory.get("/", HTTP_HOST="evil.tld").get_host()
+
+    def test_internal_ips(self):
+        internal_ips = HostMatcher(["127.0.0.1", "::1", "192.168.*.*"])
+        self.assertIn("192.168.1.1", internal_ips)
+        self.assertNotIn("192.169.1.1", internal_ips)
+        self.assertNotIn(None, internal_ips)
+
+
+class DocTestsTest(SimpleTestCase):
+    def test_doctests(self):
+        assert_doctests(self, settings_utils.HostMatcher, settings_utils._wildcard_ipv4_network)
@@ -0,0 +1,149 @@
+"""
+    PyLucid
+    ~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import gzip
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+# PyLucid
+from pylucid import sitemap, sitemap_views
+from pylucid.sitemap import SitemapEntry
+from pylucid.sitemap_views import sitemap_chunk, sitemap_index
+from pylucid.tests.test_utils.doctest_utils import assert_doctests
+
+
+class FakeSite:
+    pk = 1
+    domain = "example.tld"
+
+
+def fake_location(entry):
+    return "/%s/%s/" % (entry.language, entry.path)
+
+
+def create_entries(page_ids, lastmod="2019-01-01T00:00:00+00:00"):
+    return [
+        SitemapEntry(page_id, language, "page%i" % page_id, False, lastmod)
+        for page_id in page_ids
+        for language in ("de", "en")
+    ]
+
+
+@mock.patch("pylucid.sitemap.get_location", fake_location)
+class SitemapTest(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        temp_dir = tempfile.TemporaryDirectory(prefix="pylucid_sitemap_")
+        self.addCleanup(temp_dir.cleanup)
+
+        override = override_settings(
+            PYLUCID_SITEMAP_ROOT=temp_dir.name,
+            PYLUCID_SITEMAP_CHUNK_SIZE=10,
+            PYLUCID_SITEMAP_PROTOCOL="https",
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.site = FakeSite()
+        self.sitemap_root = Path(temp_dir.name, "1")
+
+    def test_incremental_update(self):
+        entries = create_entries(range(1, 25))
+
+        result = sitemap.update_sitemap(self.site, entries=entries)
+        self.assertEqual(result.written, [0, 1, 2])
+        self.assertEqual(result.url_count, 48)
+
+        self.assertEqual(
+            sorted(path.name for path in self.sitemap_root.iterdir() if path.suffix == ".xml"),
+            ["sitemap-0.xml", "sitemap-1.xml", "sitemap-2.xml", "sitemap.xml"]
+        )
+        index = Path(self.sitemap_root, "sitemap.xml").read_text()
+        self.assertIn("<loc>https://example.tld/sitemap-2.xml</loc>", index)
+
+        chunk = Path(self.sitemap_root, "sitemap-1.xml").read_bytes()
+        self.assertIn(b"<loc>https://example.tld/en/page10/</loc>", chunk)
+        self.assertNotIn(b"/page9/", chunk)
+        self.assertEqual(gzip.decompress(Path(self.sitemap_root, "sitemap-1.xml.gz").read_bytes()), chunk)
+
+        # Nothing changed:
+        result = sitemap.update_sitemap(self.site, entries=entries)
+        self.assertEqual(result.written, [])
+        self.assertEqual(result.unchanged, 3)
+
+        # Only the chunk of the changed page will be written:
+        entries[30] = entries[30]._replace(lastmod="2019-02-01T00:00:00+00:00")
+        result = sitemap.update_sitemap(self.site, entries=entries)
+        self.assertEqual(result.written, [1])
+        index = Path(self.sitemap_root, "sitemap.xml").read_text()
+        self.assertIn("sitemap-1.xml</loc><lastmod>2019-02-01T00:00:00+00:00</lastmod>", index)
+
+        # All pages of the last chunk deleted:
+        result = sitemap.update_sitemap(self.site, entries=entries[:38])
+        self.assertEqual(result.written, [])
+        self.assertEqual(result.removed, [2])
+        self.assertFalse(Path(self.sitemap_root, "sitemap-2.xml").exists())
+        self.assertFalse(Path(self.sitemap_root, "sitemap-2.xml.gz").exists())
+        self.assertNotIn("sitemap-2.xml", Path(self.sitemap_root, "sitemap.xml").read_text())
+
+    def test_force(self):
+        entries = create_entries(range(1, 15))
+        sitemap.update_sitemap(self.site, entries=entries)
+        result = sitemap.update_sitemap(self.site, entries=entries, force=True)
+        self.assertEqual(result.written, [0, 1])
+
+        with override_settings(PYLUCID_SITEMAP_CHUNK_SIZE=100):
+            result = sitemap.update_sitemap(self.site, entries=entries)
+        self.assertEqual(result.written, [0])
+        self.assertEqual(result.removed, [1])
+
+    def test_stale_compressed_file(self):
+        file_path = Path(self.sitemap_root, "sitemap.xml")
+        self.sitemap_root.mkdir()
+        Path(self.sitemap_root, "sitemap.xml.br").write_bytes(b"old")
+
+        with mock.patch("pylucid.compress.brotli", None), self.assertLogs("pylucid.compress", level="WARNING"):
+            sitemap.write_sitemap_file(file_path, b"<new/>")
+
+        # The old '.br' file is removed: The web server would serve it instead of the new content
+        self.assertEqual(sorted(path.name for path in self.sitemap_root.iterdir()), ["sitemap.xml", "sitemap.xml.gz"])
+        self.assertEqual(gzip.decompress(Path(self.sitemap_root, "sitemap.xml.gz").read_bytes()), b"<new/>")
+
+    @mock.patch("pylucid.sitemap_views.get_current_site", lambda request: FakeSite())
+    def test_views(self):
+        sitemap.update_sitemap(self.site, entries=create_entries(range(1, 5)))
+        factory = RequestFactory()
+
+        response = sitemap_index(factory.get("/sitemap.xml"))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Content-Encoding", response)
+        self.assertIn(b"<sitemapindex", b"".join(response.streaming_content))
+
+        response = sitemap_chunk(factory.get("/sitemap-0.xml", HTTP_ACCEPT_ENCODING="gzip, deflate"), chunk_no="0")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        content = gzip.decompress(b"".join(response.streaming_content))
+        self.assertIn(b"<loc>https://example.tld/de/page1/</loc>", content)
+
+        # q=0 means: "not acceptable"
+        response = sitemap_chunk(factory.get("/sitemap-0.xml", HTTP_ACCEPT_ENCODING="gzip;q=0, deflate"), chunk_no="0")
+        self.assertNotIn("Content-Encoding", response)
+        self.assertIn(b"<loc>https://example.tld/de/page1/</loc>", b"".join(response.streaming_content))
+
+        with self.assertLogs("pylucid.sitemap_views", level="ERROR"):
+            with self.assertRaises(Http404):
+                sitemap_chunk(factory.get("/sitemap-99.xml"), chunk_no="99")
+
+
+class DocTestsTest(SimpleTestCase):
+    def test_doctests(self):
+        assert_doctests(self, sitemap, sitemap_views)
@@ -0,0 +1,192 @@
+"""
+    PyLucid
+    ~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import io
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+# PyLucid
+from pylucid import static_export
+from pylucid.static_export import ExportJob
+from pylucid.tests.test_utils.doctest_utils import assert_doctests
+
+
+class FakeResponse:
+    def __init__(self, status_code, content):
+        self.status_code = status_code
+        self.content = content
+
+
+class FakeClient:
+    status_codes = {} # url -> status code
+    exceptions = {} # url -> exception raised by the view
+
+    def __init__(self, **defaults):
+        pass
+
+    def get(self, url):
+        if url in self.exceptions:
+            raise self.exceptions[url]
+        return FakeResponse(self.status_codes.get(url, 200), ("content of %s" % url).encode("utf-8"))
+
+
+class FakePool:
+    """
+    Render the pages in the test process.
+    """
+    def __init__(self, processes, initializer, initargs):
+        initializer(*initargs)
+
+    def imap_unordered(self, func, iterable):
+        return map(func, iterable)
+
+    def close(self):
+        pass
+
+    def join(self):
+        pass
+
+
+def create_job(page_id, language="en", changed="2019-01-01T00:00:00+00:00"):
+    return ExportJob(
+        key="%s:%s" % (language, page_id),
+        language=language,
+        page_id=page_id,
+        url="/%s/page%i/" % (language, page_id),
+        changed=changed,
+    )
+
+
+@mock.patch.object(static_export.multiprocessing, "Pool", FakePool)
+@mock.patch.object(static_export, "Client", FakeClient)
+@mock.patch.object(static_export, "connections", mock.Mock())
+class ExportPagesTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        temp_dir = tempfile.TemporaryDirectory(prefix="pylucid_export_")
+        self.addCleanup(temp_dir.cleanup)
+        self.output_path = Path(temp_dir.name)
+        self.site = Site.objects.get_current()
+        FakeClient.status_codes = {}
+        FakeClient.exceptions = {}
+
+    def export(self, jobs, fingerprint="tree", force=False):
+        with mock.patch.object(static_export, "get_export_jobs", return_value=jobs), \
+                mock.patch.object(static_export, "get_tree_fingerprint", return_value=fingerprint):
+            results = static_export.export_pages(
+                site=self.site, output_path=self.output_path, host="example.tld", force=force
+            )
+            return sorted(result.job.url for result in results)
+
+    def test_incremental(self):
+        jobs = [create_job(1), create_job(2)]
+        self.assertEqual(self.export(jobs), ["/en/page1/", "/en/page2/"])
+        self.assertEqual(
+            Path(self.output_path, "en", "page1", "index.html").read_text(), "content of /en/page1/"
+        )
+
+        # Nothing changed:
+        self.assertEqual(self.export(jobs), [])
+
+        # Only the changed page:
+        jobs[1] = create_job(2, changed="2019-02-01T00:00:00+00:00")
+        self.assertEqual(self.export(jobs), ["/en/page2/"])
+
+        # Force all:
+        self.assertEqual(self.export(jobs, force=True), ["/en/page1/", "/en/page2/"])
+
+    def test_tree_changed(self):
+        jobs = [create_job(1), create_job(2)]
+        self.export(jobs)
+        # e.g.: a title changed, that is shown in the menu of all pages:
+        self.assertEqual(self.export(jobs, fingerprint="new tree"), ["/en/page1/", "/en/page2/"])
+
+    def test_removed_page(self):
+        self.export([create_job(1), create_job(2)])
+        self.assertTrue(Path(self.output_path, "en", "page2", "index.html").is_file())
+
+        self.assertEqual(self.export([create_job(1)]), [])
+        self.assertFalse(Path(self.output_path, "en", "page2").exists()) # empty directory removed
+        self.assertTrue(Path(self.output_path, "en", "page1", "index.html").is_file())
+
+    def test_error_will_be_rendered_again(self):
+        FakeClient.status_codes = {"/en/page2/": 500}
+        self.assertEqual(self.export([create_job(1), create_job(2)]), ["/en/page1/", "/en/page2/"])
+        self.assertFalse(Path(self.output_path, "en", "page2", "index.html").exists())
+
+        FakeClient.status_codes = {}
+        self.assertEqual(self.export([create_job(1), create_job(2)]), ["/en/page2/"])
+
+    def test_exception_in_view(self):
+        FakeClient.exceptions = {"/en/page1/": RuntimeError("Boom")}
+        with self.assertLogs("pylucid.static_export", level="ERROR") as logs:
+            results = self.export([create_job(1), create_job(2)])
+        self.assertEqual(results, ["/en/page1/", "/en/page2/"])
+        self.assertIn("Render '/en/page1/' failed: Boom", logs.output[0])
+        self.assertFalse(Path(self.output_path, "en", "page1", "index.html").exists())
+
+        FakeClient.exceptions = {}
+        self.assertEqual(self.export([create_job(1), create_job(2)]), ["/en/page1/"])
+
+    def test_aborted_export(self):
+        jobs = [create_job(1), create_job(2), create_job(3)]
+        with mock.patch.object(static_export, "get_export_jobs", return_value=jobs), \
+                mock.patch.object(static_export, "get_tree_fingerprint", return_value="tree"):
+            results = static_export.export_pages(site=self.site, output_path=self.output_path, host="example.tld")
+            first = next(results)
+            results.close() # e.g.: KeyboardInterrupt
+
+        # The manifest contains only the rendered page:
+        self.assertEqual(
+            self.export(jobs), sorted(job.url for job in jobs if job.url != first.job.url)
+        )
+
+    def test_command(self):
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        FakeClient.status_codes = {"/en/page2/": 404}
+        with mock.patch.object(static_export, "get_export_jobs", return_value=[create_job(1), create_job(2)]), \
+                mock.patch.object(static_export, "get_tree_fingerprint", return_value="tree"):
+            call_command("export_static_pages", str(self.output_path), "--processes=1", stdout=stdout, stderr=stderr)
+
+        output = stdout.getvalue()
+        self.assertIn("en /en/page1/", output)
+        self.assertIn("2 pages rendered, 1 errors.", output)
+        self.assertIn("ERROR: /en/page2/ returned status code 404", stderr.getvalue())
+
+
+class TreeFingerprintTest(TestCase):
+    def create_page(self, title):
+        from cms.api import create_page
+
+        return create_page(title, settings.CMS_TEMPLATES[0][0], "en", published=True)
+
+    def test_title_changed(self):
+        site = Site.objects.get_current()
+        page = self.create_page("Foo")
+        self.create_page("Bar")
+        fingerprint = static_export.get_tree_fingerprint(site)
+        self.assertEqual(static_export.get_tree_fingerprint(site), fingerprint)
+
+        title = page.get_title_obj("en")
+        title.menu_title = "New menu title"
+        title.save()
+        page.publish("en")
+
+        self.assertNotEqual(static_export.get_tree_fingerprint(site), fingerprint)
+
+
+class DocTestsTest(SimpleTestCase):
+    def test_doctests(self):
+        assert_doctests(self, static_export)
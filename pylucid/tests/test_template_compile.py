@@ -0,0 +1,68 @@
+"""
+    PyLucid
+    ~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+# PyLucid
+from pylucid import template_compile
+from pylucid.template_compile import compile_templates, get_cms_template_names
+from pylucid.tests.test_utils.doctest_utils import assert_doctests
+
+
+LOCMEM_TEMPLATES = [{
+    "BACKEND": "django.template.backends.django.DjangoTemplates",
+    "OPTIONS": {
+        "loaders": [
+            ("django.template.loaders.locmem.Loader", {
+                "base.html": "{% block content %}{% endblock %}",
+                "page.html": '{% extends "base.html" %}{% block content %}{% include "missing.html" %}{% endblock %}',
+                "broken.html": "{% if %}",
+            }),
+        ],
+    },
+}]
+
+
+class TemplateCompileTest(TestCase):
+    def test_cms_templates(self):
+        results = compile_templates()
+        names = [result.name for result in results]
+
+        self.assertEqual(names[:len(get_cms_template_names())], get_cms_template_names())
+        self.assertIn("pylucid/bootstrap/base.html", names)
+        self.assertEqual(len(names), len(set(names)))
+        self.assertEqual([result for result in results if result.error is not None], [])
+
+    @override_settings(TEMPLATES=LOCMEM_TEMPLATES)
+    def test_missing_include(self):
+        results = compile_templates(["page.html"])
+        self.assertEqual([(result.name, result.used_by) for result in results], [
+            ("page.html", None),
+            ("base.html", "page.html"),
+            ("missing.html", "page.html"),
+        ])
+        self.assertEqual([result.error is None for result in results], [True, True, False])
+
+    @override_settings(TEMPLATES=LOCMEM_TEMPLATES)
+    def test_command(self):
+        stdout = StringIO()
+        call_command("pylucid_compile_templates", "base.html", stdout=stdout)
+        self.assertIn("1 templates compiled in", stdout.getvalue())
+
+        stderr = StringIO()
+        with self.assertRaisesMessage(CommandError, "1 broken templates"):
+            call_command("pylucid_compile_templates", "base.html", "broken.html", stdout=StringIO(), stderr=stderr)
+        self.assertIn("ERROR  broken.html", stderr.getvalue())
+
+
+class DocTestsTest(SimpleTestCase):
+    def test_doctests(self):
+        assert_doctests(self, template_compile)
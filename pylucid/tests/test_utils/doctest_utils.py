@@ -0,0 +1,32 @@
+# coding: utf-8
+
+"""
+    PyLucid
+    ~~~~~~~
+
+    Run DocTests from unittests.
+
+    'pytest --doctest-modules' collects only the modules below
+    'testpaths' and that's only the tests directory.
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import doctest
+
+
+def assert_doctests(test_case, *objects):
+    """
+    Run the DocTests of the given modules, classes or functions.
+    Fails also, if a object contains no DocTests.
+    """
+    finder = doctest.DocTestFinder()
+    runner = doctest.DocTestRunner(optionflags=doctest.ELLIPSIS)
+    for obj in objects:
+        with test_case.subTest(obj.__name__):
+            tests = finder.find(obj)
+            test_case.assertTrue(any(test.examples for test in tests), "No DocTests found in %r" % obj)
+            for test in tests:
+                result = runner.run(test)
+                test_case.assertEqual(result.failed, 0, "DocTest %r failed" % test.name)
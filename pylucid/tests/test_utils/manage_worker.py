@@ -0,0 +1,242 @@
+# coding: utf-8
+
+"""
+    PyLucid
+    ~~~~~~~
+
+    Run manage.py commands of a page instance without starting
+    a new Python process for every call.
+
+    The worker process imports Django + django-cms and the settings of
+    the page instance only once. Every command runs in a fork of this
+    warmed up process, so commands can't change the state of the worker
+    (e.g.: settings, database connections, caches).
+
+    The output of stdout and stderr is captured on file descriptor level,
+    like a subprocess call of './manage.py' would do it.
+
+    Use ManagePyWorker from the tests, e.g.:
+
+        worker = ManagePyWorker(manage_file_path, project_name)
+        output = worker.verbose_output("check")
+        worker.close()
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import json
+import os
+import selectors
+import signal
+import subprocess
+import sys
+import time
+import traceback
+from pathlib import Path
+
+# PyLucid
+from pylucid.pylucid_boot import SUBPROCESS_TIMEOUT
+
+
+RESPONSE_FD_ENV = "PYLUCID_MANAGE_WORKER_FD"
+
+
+class ManagePyWorker:
+    """
+    Client for the worker process, see: serve()
+    """
+    def __init__(self, manage_file_path, project_name):
+        self.manage_file_path = Path(manage_file_path)
+        self.project_name = project_name
+        self.proc = None
+
+    def start(self):
+        # The responses are send via a own pipe:
+        # Every output of the worker process goes to stderr.
+        read_fd, write_fd = os.pipe()
+
+        env = os.environ.copy()
+        env["DJANGO_SETTINGS_MODULE"] = "%s.settings" % self.project_name
+        env["PYTHONUNBUFFERED"] = "1"
+        env[RESPONSE_FD_ENV] = str(write_fd)
+        try:
+            self.proc = subprocess.Popen(
+                [sys.executable, "-m", __name__],
+                cwd=str(self.manage_file_path.parent),
+                env=env,
+                stdin=subprocess.PIPE,
+                stdout=sys.stderr,
+                pass_fds=(write_fd,),
+                universal_newlines=True,
+            )
+        finally:
+            os.close(write_fd)
+        self.response_file = os.fdopen(read_fd, "r")
+
+        response = self._read_response()
+        if response.get("ready") is not True:
+            raise RuntimeError("manage.py worker not started: %s" % response.get("output"))
+
+    def _read_response(self):
+        line = self.response_file.readline()
+        if not line:
+            self.close()
+            raise RuntimeError("manage.py worker died!")
+        return json.loads(line)
+
+    def call(self, *args, timeout=SUBPROCESS_TIMEOUT):
+        """
+        Run './manage.py *args' in the worker.
+        Returns the exit code and the output of stdout + stderr.
+        """
+        if self.proc is None:
+            self.start()
+
+        self.proc.stdin.write(json.dumps({"args": args, "timeout": timeout}) + "\n")
+        self.proc.stdin.flush()
+        response = self._read_response()
+        return response["exit_code"], response["output"]
+
+    def verbose_output(self, *args, check=True, timeout=SUBPROCESS_TIMEOUT):
+        """
+        Same behavior as: VerboseSubprocess("./manage.py", *args).verbose_output(check)
+        """
+        popenargs = ("./manage.py",) + args
+        print("\nCall in process: %r" % " ".join(popenargs))
+
+        exit_code, output = self.call(*args, timeout=timeout)
+        if exit_code is None:
+            raise subprocess.TimeoutExpired(popenargs, timeout, output=output)
+
+        if exit_code:
+            err = subprocess.CalledProcessError(exit_code, popenargs, output=output)
+            print("\n%s" % err)
+            if check:
+                sys.exit(err.returncode)
+            raise err
+
+        return output
+
+    def close(self):
+        if self.proc is not None:
+            self.proc.stdin.close()
+            try:
+                self.proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+                self.proc.wait()
+            self.response_file.close()
+            self.proc = None
+
+
+def _run_command(args):
+    """
+    Called in the forked child process
+    """
+    from django.core.management import ManagementUtility
+
+    try:
+        ManagementUtility(["manage.py"] + list(args)).execute()
+    except SystemExit as err:
+        if err.code is None:
+            return 0
+        if isinstance(err.code, int):
+            return err.code
+        print(err.code, file=sys.stderr)
+        return 1
+    except BaseException:
+        traceback.print_exc()
+        return 1
+    return 0
+
+
+def _read_output(fd, pid, timeout):
+    """
+    Read the output pipe of the forked child until EOF or timeout.
+    Returns the exit code (None on timeout) and the output.
+    """
+    output = []
+    end_time = time.monotonic() + timeout
+    with selectors.DefaultSelector() as selector:
+        selector.register(fd, selectors.EVENT_READ)
+        while True:
+            remaining = end_time - time.monotonic()
+            if remaining <= 0 or not selector.select(timeout=remaining):
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+                return None, b"".join(output)
+
+            data = os.read(fd, 65536)
+            if not data:
+                break
+            output.append(data)
+
+    pid, status = os.waitpid(pid, 0)
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status), b"".join(output)
+    return os.WEXITSTATUS(status), b"".join(output)
+
+
+def serve():
+    """
+    The worker process: Reads JSON requests from stdin, one per line.
+    """
+    # Use a own file descriptor for the responses. Output from
+    # django.setup() and forked commands must not disturb them.
+    response_file = os.fdopen(int(os.environ[RESPONSE_FD_ENV]), "w")
+
+    def send(**response):
+        response_file.write(json.dumps(response) + "\n")
+        response_file.flush()
+
+    try:
+        import django
+        django.setup()
+    except BaseException:
+        send(ready=False, output=traceback.format_exc())
+        return
+
+    from django.db import connections
+
+    send(ready=True)
+
+    for line in sys.stdin:
+        request = json.loads(line)
+
+        # The child must not share the database connections with the worker.
+        # Important, because the tests replace the SQLite file between calls.
+        connections.close_all()
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            # The forked child
+            exit_code = 1
+            try:
+                os.close(read_fd)
+                response_file.close()
+                os.dup2(write_fd, 1)
+                os.dup2(write_fd, 2)
+                os.close(write_fd)
+                # A interactive command must not read the next requests:
+                os.dup2(os.open(os.devnull, os.O_RDONLY), 0)
+                exit_code = _run_command(request["args"])
+                sys.stdout.flush()
+                sys.stderr.flush()
+            finally:
+                os._exit(exit_code)
+
+        os.close(write_fd)
+        try:
+            exit_code, output = _read_output(read_fd, pid, request["timeout"])
+        finally:
+            os.close(read_fd)
+
+        send(exit_code=exit_code, output=output.decode("utf-8", errors="replace"))
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,153 @@
+# coding: utf-8
+
+"""
+    PyLucid
+    ~~~~~~~
+
+    A page instance that will be created and migrated only once per
+    test process and restored from a snapshot of the SQLite database
+    before every test.
+
+    Every pytest-xdist worker is a own process, so every worker
+    creates his own instance in his own temp directory.
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from pylucid_installer.pylucid_installer import create_instance
+
+# https://github.com/jedie/django-tools
+from django_tools.unittest_utils.stdout_redirect import StdoutStderrBuffer
+
+# PyLucid
+from pylucid.pylucid_boot import VerboseSubprocess
+from pylucid.tests.test_utils.manage_worker import ManagePyWorker
+from pylucid.utils import human_duration
+
+
+SESSION_PROJECT_NAME = "session_instance"
+
+
+class PageInstanceError(Exception):
+    pass
+
+
+def call_manage_py(manage_file_path, *args, check=False, **kwargs):
+    """
+    Call manage.py from a page instance in a subprocess.
+    """
+    args = ("./manage.py",) + args
+
+    # pylucid_page_instance/manage.py use os.environ.setdefault
+    # We must remove "DJANGO_SETTINGS_MODULE" from environ!
+    env = os.environ.copy()
+    env.pop("DJANGO_SETTINGS_MODULE", None)
+
+    kwargs.update({
+        "cwd": str(Path(manage_file_path).parent),
+        "env": env,
+    })
+    return VerboseSubprocess(*args, **kwargs).verbose_output(check=check)
+
+
+class SessionPageInstance:
+    def __init__(self, instance_root, project_name=SESSION_PROJECT_NAME):
+        self.instance_root = Path(instance_root)
+        self.project_name = project_name
+        self.instance_path = Path(self.instance_root, self.project_name)
+        self.manage_file_path = Path(self.instance_root, "manage.py")
+
+        # see DATABASES in: pylucid_installer/page_instance_template/example_project/settings.py
+        self.db_path = Path(self.instance_path, "%s.db" % self.project_name)
+        self.snapshot_path = self.db_path.with_suffix(".db.snapshot")
+
+        self._worker = None
+
+    def get_worker(self):
+        """
+        Returns the ManagePyWorker to run manage.py commands in process.
+        """
+        if self._worker is None:
+            self._worker = ManagePyWorker(self.manage_file_path, self.project_name)
+        return self._worker
+
+    def call_manage_py(self, *args, check=False, **kwargs):
+        return call_manage_py(self.manage_file_path, *args, check=check, **kwargs)
+
+    def create(self):
+        start_time = time.time()
+
+        with StdoutStderrBuffer() as buffer:
+            create_instance(
+                dest=self.instance_root,
+                name=self.project_name,
+                remove=False,
+                exist_ok=False,
+            )
+        output = buffer.get_output()
+        if "ERROR" in output or not self.manage_file_path.is_file():
+            raise PageInstanceError("Create page instance failed:\n%s" % output)
+
+        # Needed until https://github.com/divio/django-cms/issues/5079 is fixed:
+        self.call_manage_py("createcachetable", check=True)
+        self.call_manage_py("migrate", "--noinput", check=True)
+        self.snapshot()
+
+        print("Session page instance created in %s here: %s" % (
+            human_duration(time.time() - start_time), self.instance_root
+        ))
+
+    def snapshot(self):
+        shutil.copy2(str(self.db_path), str(self.snapshot_path))
+
+    def restore(self):
+        """
+        Reset the database to the state after create()
+        """
+        for suffix in ("-journal", "-wal", "-shm"):
+            journal_path = Path("%s%s" % (self.db_path, suffix))
+            if journal_path.exists():
+                journal_path.unlink()
+
+        # Copy into a temp file and rename: a test that is killed in the middle
+        # must not leave a half-written database behind.
+        temp_path = self.db_path.with_suffix(".db.restore")
+        shutil.copy2(str(self.snapshot_path), str(temp_path))
+        os.replace(str(temp_path), str(self.db_path))
+
+    def remove(self):
+        if self._worker is not None:
+            self._worker.close()
+        shutil.rmtree(str(self.instance_root.parent), ignore_errors=True)
+
+
+_session_instance = None
+
+
+def get_session_instance():
+    """
+    Returns the SessionPageInstance of this process. Create it on first call.
+    """
+    global _session_instance
+    if _session_instance is None:
+        # e.g.: "gw0" if the tests runs via pytest-xdist
+        worker_id = os.environ.get("PYTEST_XDIST_WORKER", "master")
+
+        temp_path = tempfile.mkdtemp(prefix="pylucid_%s_" % worker_id)
+        instance = SessionPageInstance(
+            # create_instance() will only use a not existing directory:
+            instance_root=Path(temp_path, "instance"),
+        )
+        atexit.register(instance.remove)
+        instance.create()
+        _session_instance = instance
+
+    return _session_instance
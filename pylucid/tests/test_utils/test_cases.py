@@ -25,6 +25,8 @@ from django_tools.unittest_utils.stdout_redirect import StdoutStderrBuffer
 
 # PyLucid
 from pylucid.pylucid_boot import VerboseSubprocess
+from pylucid.tests.test_utils.manage_worker import ManagePyWorker
+from pylucid.tests.test_utils.page_instance import call_manage_py, get_session_instance
 from pylucid.utils import clean_string
 
 
@@ -36,13 +38,7 @@ class BaseTestCase(TestCase):
         similar to subprocess.getstatusoutput but pass though kwargs
         """
 
-        # TODO: Use pylucid.pylucid_boot.VerboseSubprocess !
-
-        kwargs.update({
-            "shell": True,
-            "universal_newlines": True,
-            "stderr": subprocess.STDOUT,
-        })
+        kwargs["shell"] = True
         if "cwd" in kwargs:
             cwd = kwargs["cwd"]
             self.assertTrue(os.path.isdir(cwd), "cwd %r doesn't exists!" % cwd)
@@ -59,12 +55,9 @@ class BaseTestCase(TestCase):
         kwargs["env"] = env
 
         cmd=" ".join(cmd) # FIXME: Why?!?
-        try:
-            output = subprocess.check_output(cmd, **kwargs)
-            status = 0
-        except subprocess.CalledProcessError as ex:
-            output = ex.output
-            status = ex.returncode
+        result = VerboseSubprocess(cmd, **kwargs).run()
+        output = result.output
+        status = result.exit_code
 
         if output[-1:] == '\n':
             output = output[:-1]
@@ -106,8 +99,44 @@ class BaseTestCase(TestCase):
 
 
 
+class BasePageInstanceTestCase(BaseTestCase):
+    # Run manage.py commands in a warmed up worker process, see: manage_worker.py
+    # The subprocess call of './manage.py' is used, if False.
+    manage_py_in_process = False
+
+    def get_manage_py_worker(self):
+        """
+        Returns the ManagePyWorker of the page instance.
+        None == call manage.py as subprocess
+        """
+        return None
+
+    def createcachetable(self):
+        output = self.call_manage_py("createcachetable", "--verbosity", "3")
+        print(output)
+        self.assertIn("Cache table 'pylucid_cache_table' created.", output)
+
+    def call_manage_py(self, *args, check=False, in_process=None, **kwargs):
+        """
+        Call manage.py from created page instance in temp dir.
+
+        :param in_process: Overwrite 'manage_py_in_process'. Only supported on
+            platforms with os.fork(), otherwise manage.py is called as subprocess.
+        """
+        if in_process is None:
+            in_process = self.manage_py_in_process
+        try:
+            worker = self.get_manage_py_worker() if in_process and hasattr(os, "fork") else None
+            if worker is not None:
+                return worker.verbose_output(*args, check=check, **kwargs)
+            return call_manage_py(self.manage_file_path, *args, check=check, **kwargs)
+        except subprocess.CalledProcessError as err:
+            print(err.output)
+            self.fail(err)
+
+
 @isolated_filesystem()
-class PageInstanceTestCase(BaseTestCase):
+class PageInstanceTestCase(BasePageInstanceTestCase):
     """
     -Create a page instance with the pylucid_installer cli
     -run the test in the created page instance
@@ -166,35 +195,43 @@ class PageInstanceTestCase(BaseTestCase):
             print(manage_content)
             raise
 
+        self._manage_py_worker = None
+
         # Needed until https://github.com/divio/django-cms/issues/5079 is fixed:
         self.createcachetable()
 
-    def createcachetable(self):
-        output = self.call_manage_py("createcachetable", "--verbosity", "3")
-        print(output)
-        self.assertIn("Cache table 'pylucid_cache_table' created.", output)
-
-    def call_manage_py(self, *args, check=False, **kwargs):
+    def get_manage_py_worker(self):
         """
-        Call manage.py from created page instance in temp dir.
+        A worker for the page instance of this test, used if manage_py_in_process == True
         """
-        args = ("./manage.py",) + args
+        if self._manage_py_worker is None:
+            self._manage_py_worker = ManagePyWorker(self.manage_file_path, self.project_name)
+            self.addCleanup(self._manage_py_worker.close)
+        return self._manage_py_worker
 
-        # pylucid_page_instance/manage.py use os.environ.setdefault
-        # We must remove "DJANGO_SETTINGS_MODULE" from environ!
-        env=os.environ.copy()
-        del(env["DJANGO_SETTINGS_MODULE"])
 
-        kwargs.update({
-            "cwd": str(self.manage_file_path.parent),
-            "env": env,
-        })
-        try:
-            return VerboseSubprocess(*args, **kwargs).verbose_output(check=check)
-        except subprocess.CalledProcessError as err:
-            print(err.output)
-            self.fail(err)
+class ReusablePageInstanceTestCase(BasePageInstanceTestCase):
+    """
+    Use the page instance that is created and migrated only once per test process.
+    The database will be restored before every test.
+
+    Use PageInstanceTestCase, if a test needs a fresh, not migrated instance.
+    """
+    manage_py_in_process = True
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.page_instance = get_session_instance()
+
+        cls.instance_root = cls.page_instance.instance_root
+        cls.project_name = cls.page_instance.project_name
+        cls.instance_path = cls.page_instance.instance_path
+        cls.manage_file_path = cls.page_instance.manage_file_path
+
+    def setUp(self):
+        super().setUp()
+        self.page_instance.restore()
 
-        # self.subprocess_getstatusoutput(["cat %s" % os.path.join(self.project_path, "settings.py")], **kwargs)
-        # self.subprocess_getstatusoutput(["cat %s" % os.path.join(self.temp_path, "manage.py")], **kwargs)
-        # self.subprocess_getstatusoutput(['python -c "import sys,pprint;pprint.pprint(sys.path)"'], **kwargs)
+    def get_manage_py_worker(self):
+        return self.page_instance.get_worker()
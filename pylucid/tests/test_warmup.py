@@ -0,0 +1,76 @@
+"""
+    PyLucid
+    ~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+
+# PyLucid
+from pylucid import compress, warmup
+
+
+class WarmUpTest(TestCase):
+    def test_warm_up(self):
+        close = mock.Mock()
+        durations = warmup.warm_up(close=close)
+        self.assertEqual(list(durations), ["urls", "templates", "cms", "caches"])
+        close.assert_called_once_with()
+
+    def test_error_in_step(self):
+        def broken():
+            raise RuntimeError("Boom")
+
+        with self.assertLogs("pylucid.warmup", level="ERROR") as logs:
+            durations = warmup.warm_up(steps=(("broken", broken), ("urls", warmup.warm_up_urls)), close=None)
+
+        self.assertEqual(sorted(durations), ["broken", "urls"])
+        self.assertIn("Warm up 'broken' failed: Boom", logs.output[0])
+
+    @override_settings(PYLUCID_WSGI_WARMUP=False)
+    def test_disabled(self):
+        close = mock.Mock()
+        self.assertEqual(warmup.warm_up(close=close), {})
+        self.assertFalse(close.called)
+
+    @override_settings(PYLUCID_COMPRESS_OFFLINE=True, PYLUCID_WSGI_WARMUP=False)
+    def test_without_compress_manifest(self):
+        close = mock.Mock()
+        with mock.patch.object(compress, "check_manifest", side_effect=ImproperlyConfigured("No manifest")):
+            with self.assertRaisesMessage(ImproperlyConfigured, "No manifest"):
+                warmup.warm_up(close=close)
+        self.assertFalse(close.called)
+
+    @override_settings(PYLUCID_COMPRESS_OFFLINE=True, PYLUCID_WSGI_WARMUP=False)
+    def test_with_compress_manifest(self):
+        with mock.patch.object(compress, "check_manifest") as check_manifest:
+            self.assertEqual(warmup.warm_up(close=None), {})
+        check_manifest.assert_called_once_with()
+
+    def broken_templates(self):
+        broken = mock.Mock(error="Boom", used_by=["foo.html"])
+        broken.name = "broken.html" # 'name' is a argument of Mock()
+        return [broken, mock.Mock(error=None)]
+
+    def test_broken_template(self):
+        broken = self.broken_templates()
+        with mock.patch("pylucid.template_compile.compile_templates", return_value=broken), \
+                self.assertLogs("pylucid.warmup", level="ERROR") as logs:
+            durations = warmup.warm_up(steps=(("templates", warmup.warm_up_templates),), close=None)
+        self.assertEqual(list(durations), ["templates"])
+        self.assertIn("Broken template 'broken.html'", logs.output[0])
+
+    @override_settings(PYLUCID_WARMUP_STRICT=True)
+    def test_broken_template_strict(self):
+        broken = self.broken_templates()
+        close = mock.Mock()
+        with mock.patch("pylucid.template_compile.compile_templates", return_value=broken), \
+                self.assertLogs("pylucid.warmup", level="ERROR"):
+            with self.assertRaisesMessage(ImproperlyConfigured, "Broken templates: broken.html"):
+                warmup.warm_up(steps=(("templates", warmup.warm_up_templates),), close=close)
+        close.assert_called_once_with()
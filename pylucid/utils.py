@@ -9,7 +9,9 @@
     :license: GNU GPL v3 or above, see LICENSE for more details.
 """
 
+import collections
 import re
+import threading
 import unicodedata
 
 
@@ -75,3 +77,49 @@ def human_duration(t):
             count = round(count, 1)
             break
     return u"%(number).1f %(type)s" % {'number': count, 'type': name}
+
+
+class LRUCache:
+    """
+    >>> cache = LRUCache(maxsize=2)
+    >>> cache.set("a", 1)
+    >>> cache.set("b", 2)
+    >>> cache.get("a")
+    1
+    >>> cache.set("c", 3)
+    >>> cache.get("b") is None
+    True
+    >>> cache.get("a"), cache.get("c")
+    (1, 3)
+    >>> cache.pop("a")
+    1
+    >>> cache.get("a") is None
+    True
+    """
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return None
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            return self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
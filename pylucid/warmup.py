@@ -0,0 +1,148 @@
+# coding: utf-8
+
+"""
+    PyLucid warm up
+    ~~~~~~~~~~~~~~~
+
+    Do the work of the first request before the WSGI workers are forked:
+
+        * compile the URL patterns of all languages
+        * compile the CMS_TEMPLATES and their extends/include templates
+          into the cached template loader (see: pylucid.template_compile)
+        * discover the django CMS plugins and menus
+        * fill the site and menu caches
+
+    Called from the wsgi.py of the page instance. If the WSGI server
+    imports the application in the master process (e.g.: 'gunicorn --preload'
+    or 'uwsgi' without 'lazy-apps') the forked workers share this memory
+    copy-on-write. Otherwise every worker warms up itself on startup.
+
+    Every step is optional: Errors are logged and never stop the startup.
+    Except with settings.PYLUCID_WARMUP_STRICT = True: Broken templates
+    raise ImproperlyConfigured and the startup fails.
+
+    Deactivate it with: settings.PYLUCID_WSGI_WARMUP = False
+
+    With settings.PYLUCID_COMPRESS_OFFLINE = True the startup fails with
+    ImproperlyConfigured, if the offline manifest of 'pylucid_compress'
+    is missing or incomplete. (Also if the warm up is deactivated)
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.urls import Resolver404, get_resolver
+from django.utils import translation
+
+
+log = logging.getLogger(__name__)
+
+
+def warm_up_urls():
+    resolver = get_resolver()
+    for language_code, language_name in settings.LANGUAGES:
+        with translation.override(language_code):
+            # The reverse dict and the compiled regexes are cached per language:
+            resolver.reverse_dict
+            try:
+                resolver.resolve("/%s/" % language_code)
+            except Resolver404:
+                pass
+
+
+def warm_up_templates():
+    # PyLucid
+    from pylucid.template_compile import compile_templates
+
+    errors = []
+    for result in compile_templates():
+        if result.error is not None:
+            log.error("Broken template %r (used in %r): %s", result.name, result.used_by, result.error)
+            errors.append(result.name)
+
+    if errors and getattr(settings, "PYLUCID_WARMUP_STRICT", False):
+        raise ImproperlyConfigured("Broken templates: %s" % ", ".join(errors))
+
+
+def warm_up_cms():
+    from cms.plugin_pool import plugin_pool
+    from menus.menu_pool import menu_pool
+
+    plugin_pool.discover_plugins()
+    plugin_pool.get_all_plugins()
+    menu_pool.discover_menus()
+
+
+def warm_up_caches():
+    from django.contrib.sites.models import Site
+
+    # PyLucid
+    from pylucid.menu import get_menu_tree
+
+    site = Site.objects.get_current()
+    for language_code, language_name in settings.LANGUAGES:
+        get_menu_tree(site.pk, language_code, authenticated=False)
+
+
+WARM_UP_STEPS = (
+    ("urls", warm_up_urls),
+    ("templates", warm_up_templates),
+    ("cms", warm_up_cms),
+    ("caches", warm_up_caches),
+)
+
+
+def close_connections():
+    """
+    The forked workers must not share the database and cache connections.
+    """
+    connections.close_all()
+    for cache in caches.all():
+        cache.close()
+
+
+def warm_up(steps=WARM_UP_STEPS, close=close_connections):
+    """
+    Run all warm up steps. Returns a dict with the duration of every step.
+
+    :param close: called after all steps, e.g.: None in tests,
+        because a TestCase must keep the database connection.
+    """
+    if getattr(settings, "PYLUCID_COMPRESS_OFFLINE", False):
+        # PyLucid
+        from pylucid.compress import check_manifest
+
+        check_manifest() # raise ImproperlyConfigured
+
+    durations = {}
+    if not getattr(settings, "PYLUCID_WSGI_WARMUP", True):
+        return durations
+
+    total_start = time.time()
+    try:
+        for name, func in steps:
+            start_time = time.time()
+            try:
+                func()
+            except ImproperlyConfigured:
+                if getattr(settings, "PYLUCID_WARMUP_STRICT", False):
+                    raise
+                log.exception("Warm up %r failed", name)
+            except Exception as err:
+                log.exception("Warm up %r failed: %s", name, err)
+            durations[name] = time.time() - start_time
+    finally:
+        if close is not None:
+            close()
+
+    log.info("Warm up done in %.1f ms: %s", (time.time() - total_start) * 1000, ", ".join(
+        "%s: %.1f ms" % (name, duration * 1000) for name, duration in durations.items()
+    ))
+    return durations
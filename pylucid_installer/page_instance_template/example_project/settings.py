@@ -17,11 +17,10 @@ from pathlib import Path
 
 from django.utils.translation import ugettext_lazy as _
 
-# https://github.com/jedie/django-tools
-from django_tools.settings_utils import InternalIps
-
 # PyLucid
 from pylucid.base_settings import *
+from pylucid.logging_utils import WarningCounter
+from pylucid.settings_utils import HostMatcher, get_logging, production_apps, production_middleware
 
 DOC_ROOT = "/path/to/page_instance/" # Point this to web server root directory
 
@@ -71,6 +70,34 @@ DATABASES = {
     },
 }
 
+#____________________________________________________________________
+# Cache
+# https://docs.djangoproject.com/en/1.11/topics/cache/
+#
+# Available profiles, see: pylucid.settings_utils.build_caches()
+#   "database"  - DatabaseCache (default, needs: ./manage.py createcachetable)
+#   "local"     - process memory + file based cache (no database access on cache hits)
+#   "redis"     - process memory + redis server (needs 'django-redis')
+#   "memcached" - process memory + memcached server (needs 'python-memcached')
+#
+# from pylucid.settings_utils import get_caches
+# CACHES = get_caches(profile="local", location=str(Path(DOC_ROOT, "cache")))
+# CACHES = get_caches(profile="redis", location="redis://127.0.0.1:6379/1")
+# CACHES = get_caches(profile="memcached", location="127.0.0.1:11211")
+
+#____________________________________________________________________
+# Compress css/js offline
+#
+# Create all css/js bundles and gzip/brotli files with:
+#   ./manage.py pylucid_compress
+# This must be done after every change of the css/js or the templates.
+# The server will not start, if the bundles for a template are missing.
+#
+# PYLUCID_COMPRESS_OFFLINE = True
+
+# Refuse to start the server, if a template can't be compiled:
+# PYLUCID_WARMUP_STRICT = True
+
 #____________________________________________________________________
 # Please change email-/SMTP-Settings:
 
@@ -113,8 +140,8 @@ ALLOWED_HOSTS = [
 DEBUG = True
 
 
-# https://github.com/jedie/django-tools#internalips---unix-shell-style-wildcards-in-internal_ips
-INTERNAL_IPS = InternalIps(["127.0.0.1", "::1", "192.168.*.*", "10.0.*.*"])
+# IPs, CIDR networks and wildcards, see: pylucid.settings_utils.HostMatcher
+INTERNAL_IPS = HostMatcher(["127.0.0.1", "::1", "192.168.*.*", "10.0.0.0/16"])
 
 
 if DEBUG:
@@ -122,6 +149,35 @@ if DEBUG:
     warnings.simplefilter("always")
 
 
+#____________________________________________________________________
+# PRODUCTION
+
+# Use a minimal middleware chain and app list (without debug toolbar and processinfo):
+PRODUCTION_MODE = not DEBUG
+
+if PRODUCTION_MODE:
+    INSTALLED_APPS = production_apps(INSTALLED_APPS)
+    MIDDLEWARE = production_middleware(MIDDLEWARE)
+
+    # Format and write log records in a background thread, log repeated warnings only once.
+    # Use json_lines=True to write one JSON object per line.
+    # Compare the overhead with: ./manage.py pylucid_logging_overhead
+    LOGGING = get_logging("production", json_lines=False)
+    warnings.showwarning = WarningCounter()
+
+# Enable only the optional app groups this page instance needs.
+# Less imports == faster startup of every WSGI worker.
+# Available groups: "blog", "filer", "markup" and "pygments", see: pylucid.settings_utils.OPTIONAL_APP_GROUPS
+# Don't remove apps that have data in the database!
+# Display the import times with: ./manage.py pylucid_import_time
+# from pylucid.settings_utils import select_app_groups
+# INSTALLED_APPS = select_app_groups(INSTALLED_APPS, groups=("markup", "pygments"))
+
+# Measure the time every middleware needs, display it with: ./manage.py middleware_timing
+# from pylucid.settings_utils import add_middleware_timing
+# MIDDLEWARE = add_middleware_timing(MIDDLEWARE)
+
+
 #____________________________________________________________________
 # extra DEBUG
 #
@@ -13,3 +13,7 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "example_project.settings")
 
 from django.core.wsgi import get_wsgi_application
 application = get_wsgi_application()
+
+# Do the work of the first request before the workers are forked, see: pylucid.warmup
+from pylucid.warmup import warm_up
+warm_up()
@@ -12,11 +12,18 @@
     :license: GNU GPL v3 or above, see LICENSE for more details.
 """
 
+import contextlib
+import io
+import json
+import multiprocessing
 import os
+import re
 import sys
 import shutil
 import random
 import string
+import time
+from collections import namedtuple
 from pathlib import Path
 
 from pylucid.utils import clean_string
@@ -24,6 +31,25 @@ from pylucid.utils import clean_string
 
 SRC_PROJECT_NAME="example_project"
 
+TEMPLATE_PATH = Path(Path(__file__).parent, "page_instance_template")
+
+# Template files that will be changed in every page instance.
+# They are always copied. All other files can be linked.
+PATCHED_FILES = (
+    "manage.py",
+    os.path.join(SRC_PROJECT_NAME, "settings.py"),
+    os.path.join(SRC_PROJECT_NAME, "wsgi.py"),
+)
+
+LINK_MODE_COPY = "copy"
+LINK_MODE_REFLINK = "reflink" # copy-on-write clone, if the file system supports it (e.g.: btrfs, XFS)
+LINK_MODE_HARDLINK = "hardlink" # Warning: Changing a file in place will change the template file!
+LINK_MODES = (LINK_MODE_COPY, LINK_MODE_REFLINK, LINK_MODE_HARDLINK)
+
+FICLONE = 0x40049409 # from linux/fs.h
+
+InstanceResult = namedtuple("InstanceResult", "dest name duration error output")
+
 def confirm(txt=None):
     if txt is not None:
         print("\n%s" % txt)
@@ -51,7 +77,51 @@ def _check_destination(dest, remove, exist_ok):
     return dest
 
 
-def copytree2(src, dst, ignore, exist_ok=False):
+def reflink(src, dst):
+    """
+    Create a copy-on-write clone of the file. Fall back to a normal copy.
+    """
+    try:
+        import fcntl
+        with open(src, "rb") as src_file, open(dst, "wb") as dst_file:
+            fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+    except (ImportError, OSError):
+        shutil.copy2(src, dst)
+    else:
+        shutil.copystat(src, dst)
+
+
+def hardlink(src, dst):
+    try:
+        os.link(src, dst)
+    except OSError:
+        # e.g.: other file system
+        shutil.copy2(src, dst)
+
+
+def get_copy_function(src_base, link_mode):
+    """
+    Returns a copy function for copytree2(), that never links the PATCHED_FILES
+    """
+    if link_mode == LINK_MODE_COPY:
+        return shutil.copy2
+    elif link_mode == LINK_MODE_REFLINK:
+        link_function = reflink
+    elif link_mode == LINK_MODE_HARDLINK:
+        link_function = hardlink
+    else:
+        raise RuntimeError("Unknown link mode %r, choose one of: %s" % (link_mode, ", ".join(LINK_MODES)))
+
+    def copy_function(src, dst):
+        if os.path.relpath(src, str(src_base)) in PATCHED_FILES:
+            shutil.copy2(src, dst)
+        else:
+            link_function(src, dst)
+
+    return copy_function
+
+
+def copytree2(src, dst, ignore, exist_ok=False, copy_function=shutil.copy2):
     """
     Similar to shutil.copytree, but has 'exist_ok'
     """
@@ -67,10 +137,10 @@ def copytree2(src, dst, ignore, exist_ok=False):
         dstname = os.path.join(dst, name)
         try:
             if os.path.isdir(srcname):
-                copytree2(srcname, dstname, ignore, exist_ok=exist_ok)
+                copytree2(srcname, dstname, ignore, exist_ok=exist_ok, copy_function=copy_function)
             else:
                 # Will raise a SpecialFileError for unsupported file types
-                shutil.copy2(srcname, dstname)
+                copy_function(srcname, dstname)
         # catch the Error from the recursive copytree so that we can
         # continue with other files
         except OSError as why:
@@ -87,14 +157,14 @@ def copytree2(src, dst, ignore, exist_ok=False):
     return dst
 
 
-def _copytree(dest, exist_ok):
-    src_base = Path(__file__).parent
-    src = Path(src_base, "page_instance_template")
-    print("copytree '%s' to '%s'" % (src, dest))
+def _copytree(dest, exist_ok, link_mode=LINK_MODE_COPY):
+    src = TEMPLATE_PATH
+    print("copytree '%s' to '%s' (%s)" % (src, dest, link_mode))
     copytree2(
         src, dest,
         ignore=shutil.ignore_patterns("*.pyc", "__pycache__"),
-        exist_ok=exist_ok
+        exist_ok=exist_ok,
+        copy_function=get_copy_function(src, link_mode),
     )
 
 
@@ -107,42 +177,66 @@ def get_python3_shebang():
     return shebang
 
 
-def _patch_shebang(filepath):
-    new_shebang=get_python3_shebang()
-    print("Update shebang in '%s' to %r" % (filepath, new_shebang))
-    with filepath.open("r+") as f:
+SRC_SHEBANG = "#!/usr/bin/env python"
+
+
+def atomic_write(filepath, content):
+    """
+    Write into a temp file and rename it, so a file is never partially written.
+    """
+    filepath = Path(filepath)
+    temp_path = filepath.with_name(".%s.%s.tmp" % (filepath.name, os.getpid()))
+    with temp_path.open("w") as f:
+        f.write(content)
+    shutil.copymode(str(filepath), str(temp_path))
+    os.replace(str(temp_path), str(filepath))
+
+
+def render_file(filepath, replace_dict):
+    """
+    Replace all strings in one pass and write the file atomically.
+    Returns a set of all not found strings.
+    """
+    replace_dict = dict([
+        (str(old), str(new)) # use str() for pathlib.Path() instance
+        for old, new in replace_dict.items()
+    ])
+    # The longest string first, if one is a part of another one:
+    pattern = re.compile("|".join([re.escape(old) for old in sorted(replace_dict, key=len, reverse=True)]))
+
+    with Path(filepath).open("r") as f:
         content = f.read()
-        f.seek(0)
 
-        new_content=content.replace("#!/usr/bin/env python", new_shebang)
+    found = set()
 
-        if new_content == content:
-            print("WARNING: Shebang not updated in '%s'!" % filepath)
-        else:
-            f.write(new_content)
-
-
-def _mass_replace(replace_dict, files):
-    for filepath in files:
-        print("Update filecontent '%s'" % filepath)
-        with open(filepath, "r+") as f:
-            content = f.read()
-
-            old_content = content
-            for old, new in replace_dict.items():
-                if old not in content:
-                    print("WARNING: String %r not found!" % old)
-                else:
-                    content=content.replace(
-                        str(old), str(new)  # use str() for pathlib.Path() instance
-                    )
-
-            if content == old_content:
-                print("WARNING: File content not changed?!?")
+    def replace(match):
+        old = match.group(0)
+        found.add(old)
+        return replace_dict[old]
+
+    new_content = pattern.sub(replace, content)
+    if new_content != content:
+        atomic_write(filepath, new_content)
+
+    return set(replace_dict) - found
+
+
+def render_files(files):
+    """
+    Patch all files. 'files' is a dict of: file path -> replace dict
+    """
+    for filepath, replace_dict in files.items():
+        if SRC_SHEBANG in replace_dict:
+            print("Update shebang in '%s' to %r" % (filepath, replace_dict[SRC_SHEBANG]))
+        if set(replace_dict) - {SRC_SHEBANG}:
+            print("Update filecontent '%s'" % filepath)
+
+        for old in sorted(render_file(filepath, replace_dict)):
+            if old == SRC_SHEBANG:
+                print("WARNING: Shebang not updated in '%s'!" % filepath)
             else:
-                f.seek(0)
-                f.truncate()
-                f.write(content)
+                print("WARNING: String %r not found in '%s'!" % (old, filepath))
+
 
 def _clean_project_name(name):
     clean_name = clean_string(name)
@@ -164,7 +258,7 @@ def _rename_project(dest, name):
 
 
 
-def create_instance(dest, name, remove, exist_ok):
+def create_instance(dest, name, remove, exist_ok, link_mode=LINK_MODE_COPY):
     """
     create a page instance.
     """
@@ -173,37 +267,85 @@ def create_instance(dest, name, remove, exist_ok):
 
     print("Create instance with name %r at: %s..." % (name, dest))
 
-    _copytree(dest, exist_ok)
+    _copytree(dest, exist_ok, link_mode=link_mode)
 
     _rename_project(dest, name)
 
-    # _mass_replace(
-    #     {SRC_PROJECT_NAME: name},
-    #     [
-    #         Path(dest, name, "templates", "includes", "header.html"),
-    #         Path(dest, name, "templates", "includes", "footer.html"),
-    #     ]
-    # )
-
-    manage_file_path = Path(dest, "manage.py")
-
-    _patch_shebang(filepath=manage_file_path)
-    _patch_shebang(filepath=Path(dest, name, "wsgi.py"))
-
+    # Use SystemRandom: forked processes in create_instances() have the same random state
+    system_random = random.SystemRandom()
     secret_key = ''.join(
-        [random.choice(string.ascii_letters+string.digits+"!@#$%^&*(-_=+)") for i in range(64)]
+        [system_random.choice(string.ascii_letters+string.digits+"!@#$%^&*(-_=+)") for i in range(64)]
     )
-    _mass_replace(
-        {
+    shebang = get_python3_shebang()
+
+    render_files({
+        Path(dest, "manage.py"): {
+            SRC_SHEBANG: shebang,
+            SRC_PROJECT_NAME: name,
+        },
+        Path(dest, name, "wsgi.py"): {
+            SRC_SHEBANG: shebang,
+            SRC_PROJECT_NAME: name,
+        },
+        Path(dest, name, "settings.py"): {
             "/path/to/page_instance/": dest,
             SRC_PROJECT_NAME: name,
             'SECRET_KEY = "CHANGE ME!!!"': 'SECRET_KEY = "%s"' % secret_key,
         },
-        [
-            Path(dest, name, "settings.py"),
-            manage_file_path
-        ]
-    )
+    })
 
     print("Page instance created here: '%s'" % dest)
     print("Please change settings,templates etc. for you needs!")
+
+
+def load_manifest(manifest_path):
+    """
+    Returns a list of (dest, name) from a JSON file, e.g.:
+        [
+            {"dest": "/srv/pylucid/foo", "name": "foo"},
+            {"dest": "/srv/pylucid/bar", "name": "bar"}
+        ]
+    """
+    with Path(manifest_path).expanduser().open("r") as f:
+        manifest = json.load(f)
+
+    instances = []
+    seen = set()
+    for entry in manifest:
+        dest = Path(entry["dest"]).expanduser().resolve()
+        name = entry["name"]
+        if dest in seen:
+            raise RuntimeError("ERROR: Destination %r used twice!" % str(dest))
+        seen.add(dest)
+        if clean_string(name) != name:
+            raise RuntimeError("ERROR: Project name %r is not useable, e.g.: %r" % (name, clean_string(name)))
+        if dest.exists():
+            raise RuntimeError("ERROR: Destination %r exist!" % str(dest))
+        instances.append((dest, name))
+    return instances
+
+
+def _create_instance_worker(args):
+    dest, name, link_mode = args
+    start_time = time.time()
+    output = io.StringIO()
+    error = None
+    with contextlib.redirect_stdout(output):
+        try:
+            create_instance(dest=dest, name=name, remove=False, exist_ok=False, link_mode=link_mode)
+        except Exception as err:
+            error = "%s: %s" % (err.__class__.__name__, err)
+    return InstanceResult(dest, name, time.time() - start_time, error, output.getvalue())
+
+
+def create_instances(manifest_path, processes=None, link_mode=LINK_MODE_REFLINK):
+    """
+    Create many page instances from a manifest file in parallel.
+    Yields a InstanceResult() for every created instance.
+    """
+    instances = load_manifest(manifest_path)
+    jobs = [(dest, name, link_mode) for dest, name in instances]
+
+    with multiprocessing.Pool(processes=processes) as pool:
+        for result in pool.imap_unordered(_create_instance_worker, jobs):
+            yield result
@@ -6,6 +6,7 @@
     Here should be only set stuff depend on page instance (e.g.: project path)
 """
 
+import os
 from pathlib import Path
 
 # PyLucid
@@ -20,16 +21,20 @@ BASE_DIR = Path(__file__).resolve().parent
 SECRET_KEY = 'Only for the tests ;)'
 
 
-DEBUG = True
+# *** SECURITY WARNING: don't run with debug turned on in production!
+# Start with PYLUCID_DEBUG=0 to use the cached template loader.
+DEBUG = os.environ.get("PYLUCID_DEBUG", "1") != "0"
 
 TEMPLATES[0]["DIRS"] = [str(Path(BASE_DIR, "templates/"))]
 TEMPLATES[0]["OPTIONS"]["debug"] = DEBUG
 
-# Don't cache template loading:
-TEMPLATES[0]["OPTIONS"]['loaders']= [
-    'django.template.loaders.filesystem.Loader',
-    'django.template.loaders.app_directories.Loader',
-]
+if DEBUG:
+    # Don't cache template loading while developing.
+    # The cached loader is filled on startup, see: pylucid.warmup
+    TEMPLATES[0]["OPTIONS"]['loaders']= [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]
 
 
 STATIC_ROOT = str(Path(BASE_DIR, 'static'))
@@ -5,10 +5,19 @@ from django.conf.urls import include, static, url
 from django.conf.urls.i18n import i18n_patterns
 from django.contrib import admin
 
+# PyLucid
+from pylucid.sitemap_views import sitemap_chunk, sitemap_index
+
 admin.autodiscover()
 
 
-urlpatterns = i18n_patterns(
+# Sitemap files created by './manage.py pylucid_sitemap', see: pylucid.sitemap
+urlpatterns = [
+    url(r'^sitemap\.xml$', sitemap_index, name='pylucid_sitemap_index'),
+    url(r'^sitemap-(?P<chunk_no>\d+)\.xml$', sitemap_chunk, name='pylucid_sitemap_chunk'),
+]
+
+urlpatterns += i18n_patterns(
     url(r'^admin/', include(admin.site.urls)),
     url(r'^', include('cms.urls')),
 )
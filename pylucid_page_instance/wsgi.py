@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "pylucid_page_instance.settings")
 
 application = get_wsgi_application()
+
+# Do the work of the first request before the workers are forked, see: pylucid.warmup
+from pylucid.warmup import warm_up  # isort:skip
+warm_up()